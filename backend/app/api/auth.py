@@ -1,9 +1,5 @@
 """Auth: signup, login, me, logout (session-based, no JWT)."""
-import base64
-import hashlib
-import hmac
 import logging
-import os
 import sys
 import traceback
 from uuid import UUID
@@ -13,8 +9,11 @@ from fastapi.responses import JSONResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.database import get_db
-from app.core.auth import get_current_user
+from app.core.auth import get_current_user, session_user_cache
+from app.core.passwords import PasswordHasherBusy, needs_rehash, password_hasher
+from app.core.tokens import decode_session_token, issue_session_token, looks_like_token, revocation_list
 from app.models.user import User, AuthSession
 from app.models.chat import ChatSession
 from app.schemas.auth import SignupRequest, LoginRequest, AuthResponse, UserResponse
@@ -22,39 +21,27 @@ from app.schemas.auth import SignupRequest, LoginRequest, AuthResponse, UserResp
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-PBKDF2_ITERATIONS = 100_000
-PBKDF2_SALT_BYTES = 16
-STORED_FORMAT = "pbkdf2_sha256${}${}${}"
 
-
-def _hash_password(password: str) -> str:
-    """Hash password with PBKDF2-HMAC-SHA256; safe for any length."""
-    salt = os.urandom(PBKDF2_SALT_BYTES)
-    key = hashlib.pbkdf2_hmac(
-        "sha256",
-        password.encode("utf-8"),
-        salt,
-        PBKDF2_ITERATIONS,
-    )
-    return STORED_FORMAT.format(
-        PBKDF2_ITERATIONS,
-        base64.b64encode(salt).decode("ascii"),
-        base64.b64encode(key).decode("ascii"),
-    )
+async def _hash_or_503(op, *args):
+    """Run a password hasher call; a full hashing queue becomes 503 with Retry-After."""
+    try:
+        return await op(*args)
+    except PasswordHasherBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry shortly",
+            headers={"Retry-After": str(e.retry_after)},
+        )
 
 
-def _verify_password(password: str, stored: str) -> bool:
-    """Verify password against stored PBKDF2 hash."""
-    try:
-        prefix, iters, salt_b64, key_b64 = stored.split("$")
-        if prefix != "pbkdf2_sha256":
-            return False
-        salt = base64.b64decode(salt_b64)
-        key = base64.b64decode(key_b64)
-        expected = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, int(iters))
-        return hmac.compare_digest(expected, key)
-    except Exception:
-        return False
+async def _start_session(db: AsyncSession, user: User) -> UUID | str:
+    """New X-Session-Id for the user: a signed token in stateless mode, else an AuthSession row id."""
+    if settings.auth_stateless_tokens:
+        return issue_session_token(user.id)
+    auth_session = AuthSession(user_id=user.id)
+    db.add(auth_session)
+    await db.flush()
+    return auth_session.id
 
 
 def _user_response(user: User) -> UserResponse:
@@ -77,7 +64,7 @@ async def signup(
         if result.scalar_one_or_none():
             logger.warning("Signup failed: email already exists", extra={"email": body.email})
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
-        hashed = _hash_password(body.password)
+        hashed = await _hash_or_503(password_hasher.hash, body.password)
         user = User(
             email=body.email,
             hashed_password=hashed,
@@ -87,13 +74,11 @@ async def signup(
         )
         db.add(user)
         await db.flush()
-        auth_session = AuthSession(user_id=user.id)
-        db.add(auth_session)
-        await db.flush()
-        logger.info("User signed up", extra={"user_id": str(user.id), "session_id": str(auth_session.id)})
+        session_id = await _start_session(db, user)
+        logger.info("User signed up", extra={"user_id": str(user.id)})
         return AuthResponse(
             user_id=user.id,
-            session_id=auth_session.id,
+            session_id=session_id,
             user=_user_response(user),
         )
     except HTTPException:
@@ -115,20 +100,31 @@ async def login(
     if not user:
         logger.warning("Login failed: invalid credentials", extra={"email": body.email})
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
-    if not _verify_password(body.password, user.hashed_password):
+    if not await _hash_or_503(password_hasher.verify, body.password, user.hashed_password):
         logger.warning("Login failed: invalid credentials", extra={"email": body.email})
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
-    auth_session = AuthSession(user_id=user.id)
-    db.add(auth_session)
-    await db.flush()
-    logger.info("User logged in", extra={"user_id": str(user.id), "session_id": str(auth_session.id)})
+    if needs_rehash(user.hashed_password):
+        # Stored with an older KDF / cost: upgrade now that we have the plaintext (skipped if hashing is busy)
+        try:
+            user.hashed_password = await password_hasher.hash(body.password)
+            logger.info("Password rehashed with current parameters", extra={"user_id": str(user.id)})
+        except PasswordHasherBusy:
+            pass
+    session_id = await _start_session(db, user)
+    logger.info("User logged in", extra={"user_id": str(user.id)})
     return AuthResponse(
         user_id=user.id,
-        session_id=auth_session.id,
+        session_id=session_id,
         user=_user_response(user),
     )
 
 
+@router.get("/hash-stats")
+async def hash_stats():
+    """Password hashing pool load and latency (no auth), like /api/chat/llm-status."""
+    return password_hasher.stats()
+
+
 @router.get("/me", response_model=UserResponse)
 async def me(user: User = Depends(get_current_user)):
     return _user_response(user)
@@ -152,9 +148,14 @@ async def logout(
         chat_session.completed = True
         await db.flush()
         logger.info("Closed chat session on logout for fresh schema next time", extra={"user_id": str(user.id), "chat_session_id": str(chat_session.id)})
-    if x_session_id:
+    if x_session_id and looks_like_token(x_session_id):
+        claims = decode_session_token(x_session_id)
+        if claims:
+            await revocation_list.revoke(claims)
+    elif x_session_id:
         try:
             session_uuid = UUID(x_session_id)
+            session_user_cache.invalidate_session(str(session_uuid))
             result = await db.execute(select(AuthSession).where(AuthSession.id == session_uuid))
             auth_session = result.scalar_one_or_none()
             if auth_session:
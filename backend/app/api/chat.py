@@ -4,20 +4,35 @@ import logging
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy import select, delete, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import AsyncSessionLocal, get_db
 from app.core.auth import get_current_user
+from app.core.conditional import ConditionalRequest, conditional_request
 from app.models.user import User
 from app.models.chat import ChatSession, ChatTurn
 from app.models.intake import IntakeResult
-from app.models.group import GroupMember, MEMBERSHIP_STATUS_ACTIVE, MEMBERSHIP_STATUS_WITHDRAWN
-from app.schemas.chat import ChatSendRequest, ChatSendResponse, ChatTurnResponse, ChatHistoryResponse
+from app.models.group import Group, GroupMember, MEMBERSHIP_STATUS_ACTIVE, MEMBERSHIP_STATUS_WITHDRAWN
+from app.schemas.chat import (
+    ChatSendRequest,
+    ChatSendResponse,
+    ChatTurnResponse,
+    ChatHistoryResponse,
+    ChatIntakeStatusResponse,
+)
 from app.services.crisis import crisis_service
 from app.services.llm import llm_service
-from app.services.extraction import extraction_service, is_intake_complete
+from app.services.llm_providers import provider_registry
+from app.services.intake_completion import (
+    intake_completion_service,
+    extract_for_session,
+    GROUP_PLACEMENT_PENDING_MESSAGE,
+    INTAKE_COMPLETE_REPLY,
+)
+from app.services.turn_cache import turn_cache
+from app.services.turn_writer import turn_writer
 from app.config import settings
 from app.services.matching import matching_service
 
@@ -40,6 +55,9 @@ async def llm_status():
         "groq_configured": groq_ok,
         "openai_configured": openai_ok,
         "message": message,
+        "hedging": settings.llm_hedge_enabled,
+        "providers": provider_registry.stats(),
+        "cache": llm_service.cache_stats(),
     }
 
 
@@ -60,6 +78,17 @@ async def get_or_create_chat_session(db: AsyncSession, user_id: UUID) -> ChatSes
     return session
 
 
+async def save_turns(db: AsyncSession, session_id: UUID, turns: list[ChatTurn]) -> None:
+    """Persist turns per CHAT_TURN_WRITE_MODE: in db's transaction ("sync") or through the batching turn writer."""
+    if turn_writer.enabled:
+        await db.commit()  # the writer inserts in its own transaction, so a just-created session must exist
+        await turn_writer.submit(session_id, turns)
+        return
+    db.add_all(turns)
+    await db.flush()
+    turn_cache.stage_append(db, session_id, turns)
+
+
 @router.post("/send", response_model=ChatSendResponse)
 async def send_message(
     body: ChatSendRequest,
@@ -75,95 +104,49 @@ async def send_message(
         session = await get_or_create_chat_session(db, user.id)
         user_turn = ChatTurn(chat_session_id=session.id, role="user", content=message)
         assistant_turn = ChatTurn(chat_session_id=session.id, role="assistant", content=reply)
-        db.add(user_turn)
-        db.add(assistant_turn)
-        await db.flush()
+        await save_turns(db, session.id, [user_turn, assistant_turn])
         logger.info("Crisis response returned", extra={"user_id": str(user.id)})
         return ChatSendResponse(reply=reply, turn_id=assistant_turn.id)
     session = await get_or_create_chat_session(db, user.id)
-    result = await db.execute(
-        select(ChatTurn).where(ChatTurn.chat_session_id == session.id).order_by(ChatTurn.created_at)
-    )
-    turns = result.scalars().all()
-    history = [{"role": t.role, "content": t.content} for t in turns]
-    reply, source, openai_error = await llm_service.chat(message, history)
+    history = await turn_cache.load(db, session.id)
+    # Release the pooled connection while waiting on the LLM (the next query checks one out again)
+    await db.commit()
+    extracted = None
+    if settings.chat_combined_extraction and not session.completed:
+        reply, extracted, source, openai_error = await llm_service.chat_with_intake(
+            message, history, session.extraction_state
+        )
+    else:
+        reply, source, openai_error = await llm_service.chat(message, history)
     user_turn = ChatTurn(chat_session_id=session.id, role="user", content=message)
     assistant_turn = ChatTurn(chat_session_id=session.id, role="assistant", content=reply)
-    db.add(user_turn)
-    db.add(assistant_turn)
-    await db.flush()
+    await save_turns(db, session.id, [user_turn, assistant_turn])
     logger.info("Chat turn saved", extra={"user_id": str(user.id), "session_id": str(session.id)})
 
-    # Auto-complete: after each turn, use LLM extraction and check if intake is complete
-    intake_complete = False
-    group_id = None
-    group_name = None
-    group_focus = None
-    match_reason = None
-    MIN_USER_TURNS_BEFORE_COMPLETE = 3
+    # Auto-complete: after each turn, use LLM extraction and check if intake is complete.
+    # The combined call already extracted, so completion runs inline without another LLM call.
+    # In background mode the reply goes out now; poll /intake-status for the completion result.
+    completion = None
+    intake_pending = False
     if not session.completed:
-        turn_result = await db.execute(
-            select(ChatTurn).where(ChatTurn.chat_session_id == session.id).order_by(ChatTurn.created_at)
-        )
-        all_turns = [{"role": t.role, "content": t.content} for t in turn_result.scalars().all()]
-        user_turn_count = sum(1 for t in all_turns if t.get("role") == "user")
-        extracted = await extraction_service.extract(all_turns)
-        # Don't trust emotional_intensity until enough turns (avoid LLM default e.g. 5 on new chat)
-        if user_turn_count < MIN_USER_TURNS_BEFORE_COMPLETE:
-            extracted["emotional_intensity"] = None
-        # Log extracted schema so far for evaluation (server console)
-        logger.info(
-            "Extracted intake schema so far (user_turns=%s, complete=%s):\n%s",
-            user_turn_count,
-            is_intake_complete(extracted),
-            json.dumps(extracted, indent=2, default=str),
-        )
-        if user_turn_count >= MIN_USER_TURNS_BEFORE_COMPLETE and is_intake_complete(extracted):
-            session.completed = True
-            intake = IntakeResult(
-                user_id=user.id,
-                chat_session_id=session.id,
-                primary_concern=extracted.get("primary_concern"),
-                contextual_background=extracted.get("contextual_background"),
-                emotional_intensity=extracted.get("emotional_intensity"),
-                life_impact_areas=extracted.get("life_impact_areas"),
-                support_goals=extracted.get("support_goals"),
-                availability=extracted.get("availability"),
-            )
-            db.add(intake)
-            await db.flush()
-            group = await matching_service.assign(db, user.id, extracted)
-            intake.group_id = group.id
-            await db.flush()
-            member_result = await db.execute(
-                select(GroupMember)
-                .where(
-                    GroupMember.group_id == group.id,
-                    GroupMember.user_id == user.id,
-                    GroupMember.status == MEMBERSHIP_STATUS_ACTIVE,
-                )
-                .limit(1)
-            )
-            member = member_result.scalar_one_or_none()
-            intake_complete = True
-            group_id = group.id
-            group_name = group.name
-            group_focus = group.focus
-            match_reason = member.match_reason if member else None
-            logger.info(
-                "Intake auto-completed and user assigned to group",
-                extra={"user_id": str(user.id), "group_id": str(group.id)},
-            )
-            reply = "We have enough information. We're finding a support group for you…"
+        if extracted is not None:
+            completion = await intake_completion_service.complete(db, user.id, session, extracted)
+            if completion:
+                reply = INTAKE_COMPLETE_REPLY
+        elif settings.chat_background_extraction:
+            await db.commit()
+            intake_completion_service.schedule(user.id, session.id)
+            intake_pending = True
+        else:
+            completion = await intake_completion_service.complete(db, user.id, session)
+            if completion:
+                reply = INTAKE_COMPLETE_REPLY
 
     response = ChatSendResponse(
         reply=reply,
         turn_id=assistant_turn.id,
-        intake_complete=intake_complete,
-        group_id=group_id,
-        group_name=group_name,
-        group_focus=group_focus,
-        match_reason=match_reason,
+        intake_pending=intake_pending,
+        **(completion or {}),
     )
     headers = {"X-Chat-Source": source}
     if openai_error:
@@ -174,11 +157,93 @@ async def send_message(
     )
 
 
-@router.get("/history", response_model=ChatHistoryResponse)
-async def get_history(
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post("/stream")
+async def stream_message(
+    body: ChatSendRequest,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    """
+    Streaming variant of /send (Server-Sent Events). Events: "token" {text}, "replace" {text} when the
+    output guard trips (client replaces the partial reply), then "done" with the ChatSendResponse fields.
+    Turns are saved only once the stream finishes; a client that disconnects mid-stream saves nothing.
+    """
+    message = (body.message or "").strip()
+    logger.info("Chat /stream received message (user_id=%s)", user.id)
+    if not message:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Message cannot be empty")
+    session = await get_or_create_chat_session(db, user.id)
+    session_id = session.id
+    user_id = user.id
+    history: list[dict] = []
+    crisis = crisis_service.check(message)
+    if not crisis:
+        history = await turn_cache.load(db, session_id)
+    # Commit now: the stream saves turns in its own DB session, after this request's session is gone.
+    await db.commit()
+
+    async def events():
+        if crisis:
+            reply = crisis_service.response()
+            source = "crisis"
+            yield _sse("token", {"text": reply})
+        else:
+            reply, source = "", "mock"
+            async for event in llm_service.chat_stream(message, history):
+                if event["type"] == "token":
+                    yield _sse("token", {"text": event["text"]})
+                elif event["type"] == "replace":
+                    yield _sse("replace", {"text": event["text"]})
+                elif event["type"] == "end":
+                    reply, source = event["reply"], event["source"]
+        async with AsyncSessionLocal() as stream_db:
+            try:
+                chat_session = await stream_db.get(ChatSession, session_id)
+                user_turn = ChatTurn(chat_session_id=session_id, role="user", content=message)
+                assistant_turn = ChatTurn(chat_session_id=session_id, role="assistant", content=reply)
+                await save_turns(stream_db, session_id, [user_turn, assistant_turn])
+                logger.info("Chat turn saved (stream)", extra={"user_id": str(user_id), "session_id": str(session_id)})
+                completion = None
+                intake_pending = False
+                if not crisis and chat_session is not None and not chat_session.completed:
+                    if settings.chat_background_extraction:
+                        intake_pending = True
+                    else:
+                        completion = await intake_completion_service.complete(stream_db, user_id, chat_session)
+                await stream_db.commit()
+                if intake_pending:
+                    intake_completion_service.schedule(user_id, session_id)
+            except Exception:
+                await stream_db.rollback()
+                logger.exception("Chat stream: failed to save turn")
+                yield _sse("error", {"detail": "Failed to save message"})
+                return
+        response = ChatSendResponse(
+            reply=INTAKE_COMPLETE_REPLY if completion else reply,
+            turn_id=assistant_turn.id,
+            intake_pending=intake_pending,
+            **(completion or {}),
+        )
+        yield _sse("done", {**response.model_dump(mode="json"), "source": source})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/intake-status", response_model=ChatIntakeStatusResponse)
+async def intake_status(
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Poll after /send returned intake_pending: whether background extraction finished and the group match."""
     result = await db.execute(
         select(ChatSession)
         .where(ChatSession.user_id == user.id)
@@ -187,14 +252,52 @@ async def get_history(
     )
     session = result.scalars().first()
     if not session:
-        return ChatHistoryResponse(turns=[])
+        return ChatIntakeStatusResponse()
+    pending = intake_completion_service.is_pending(session.id)
+    if not session.completed:
+        return ChatIntakeStatusResponse(intake_pending=pending)
     result = await db.execute(
-        select(ChatTurn).where(ChatTurn.chat_session_id == session.id).order_by(ChatTurn.created_at)
+        select(GroupMember, Group)
+        .join(Group, Group.id == GroupMember.group_id)
+        .where(GroupMember.user_id == user.id, GroupMember.status == MEMBERSHIP_STATUS_ACTIVE)
+        .limit(1)
+    )
+    row = result.one_or_none()
+    if not row and settings.group_assignment == "batch":
+        return ChatIntakeStatusResponse(intake_complete=True, message=GROUP_PLACEMENT_PENDING_MESSAGE)
+    if not row:
+        return ChatIntakeStatusResponse(intake_pending=pending)
+    member, group = row
+    return ChatIntakeStatusResponse(
+        intake_complete=True,
+        group_id=group.id,
+        group_name=group.name,
+        group_focus=group.focus,
+        match_reason=member.match_reason,
+        message=INTAKE_COMPLETE_REPLY,
     )
-    turns = result.scalars().all()
-    return ChatHistoryResponse(
-        turns=[ChatTurnResponse(id=t.id, role=t.role, content=t.content, created_at=t.created_at) for t in turns]
+
+
+@router.get("/history", response_model=ChatHistoryResponse)
+async def get_history(
+    cond: ConditionalRequest = Depends(conditional_request),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    result = await db.execute(
+        select(ChatSession)
+        .where(ChatSession.user_id == user.id)
+        .order_by(ChatSession.created_at.desc())
+        .limit(1)
     )
+    session = result.scalars().first()
+    if not session:
+        return ChatHistoryResponse(turns=[])
+    turns = await turn_cache.load(db, session.id)
+    # Turns are append-only within a session (restart clears them), so count + last id identify the list
+    if cond.matches(session.id, len(turns), turns[-1]["id"] if turns else None):
+        return cond.not_modified()
+    return ChatHistoryResponse(turns=[ChatTurnResponse(**t) for t in turns])
 
 
 @router.post("/complete")
@@ -214,11 +317,8 @@ async def complete_intake(
     if session.completed:
         return {"status": "already_completed", "session_id": str(session.id)}
     session.completed = True
-    turn_result = await db.execute(
-        select(ChatTurn).where(ChatTurn.chat_session_id == session.id).order_by(ChatTurn.created_at)
-    )
-    turns = [{"role": t.role, "content": t.content} for t in turn_result.scalars().all()]
-    extracted = await extraction_service.extract(turns)
+    turns = await turn_cache.load(db, session.id)
+    extracted = await extract_for_session(session, turns)
     intake = IntakeResult(
         user_id=user.id,
         chat_session_id=session.id,
@@ -231,6 +331,9 @@ async def complete_intake(
     )
     db.add(intake)
     await db.flush()
+    if settings.group_assignment == "batch":
+        logger.info("Intake completed; group placement queued for batch assignment", extra={"user_id": str(user.id)})
+        return {"status": "completed", "session_id": str(session.id), "group_id": None}
     group = await matching_service.assign(db, user.id, extracted)
     intake.group_id = group.id
     await db.flush()
@@ -271,8 +374,12 @@ async def restart_chat(
         )
     if intake:
         await db.delete(intake)
+    await turn_writer.flush()  # buffered turns must not be inserted after the delete
     await db.execute(delete(ChatTurn).where(ChatTurn.chat_session_id == session.id))
+    turn_cache.stage_clear(db, session.id)
     session.completed = False
+    session.extraction_state = None
+    session.extracted_turn_count = 0
     await db.flush()
     logger.info(
         "Chat restarted: session set incomplete, turns and intake cleared",
@@ -8,10 +8,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.core.auth import get_current_user
+from app.core.conditional import ConditionalRequest, conditional_request
 from app.models.user import User
 from app.models.group import Group, GroupMember, MEMBERSHIP_STATUS_ACTIVE
 from app.models.intake import IntakeResult
 from app.schemas.group import GroupResponse, GroupListResponse
+from app.services.group_registry import group_registry
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -19,6 +21,7 @@ logger = logging.getLogger(__name__)
 
 @router.get("/my", response_model=GroupResponse)
 async def my_group(
+    cond: ConditionalRequest = Depends(conditional_request),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -39,6 +42,9 @@ async def my_group(
         .limit(1)
     )
     intake = intake_result.scalar_one_or_none()
+    membership_version = (member.id, member.match_reason, group.id, group.name, group.focus)
+    if cond.matches(membership_version, (intake.id, intake.updated_at) if intake else None):
+        return cond.not_modified()
     life_impact = list(intake.life_impact_areas) if intake and intake.life_impact_areas else None
     primary_concern = intake.primary_concern if intake else None
     return GroupResponse(
@@ -49,12 +55,14 @@ async def my_group(
 
 @router.get("", response_model=GroupListResponse)
 async def list_groups(
+    cond: ConditionalRequest = Depends(conditional_request),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Group).order_by(Group.name))
-    groups = result.scalars().all()
-    return GroupListResponse(groups=[GroupResponse(id=g.id, name=g.name, focus=g.focus) for g in groups])
+    snapshot = await group_registry.snapshot(db)
+    if cond.matches(snapshot.key):
+        return cond.not_modified()
+    return GroupListResponse(groups=[GroupResponse(id=g.id, name=g.name, focus=g.focus) for g in snapshot.by_name()])
 
 
 @router.get("/{group_id}", response_model=GroupResponse)
@@ -63,8 +71,7 @@ async def get_group(
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Group).where(Group.id == group_id))
-    group = result.scalar_one_or_none()
+    group = await group_registry.get(db, group_id)
     if not group:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
     result = await db.execute(
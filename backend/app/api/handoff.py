@@ -1,24 +1,31 @@
 """Handoff: list groups, get handoff for group, document."""
+import json
 import logging
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.core.auth import get_current_user
+from app.core.cache import content_key
+from app.core.conditional import ConditionalRequest, conditional_request
 from app.models.user import User
-from app.models.group import Group, GroupMember, MEMBERSHIP_STATUS_ACTIVE
+from app.models.group import GroupMember, MEMBERSHIP_STATUS_ACTIVE
 from app.models.intake import IntakeResult
 from app.models.handoff import HandoffDocument
 from app.schemas.handoff import HandoffResponse, HandoffListResponse, HandoffGroupSummary
+from app.services.group_registry import GroupInfo, group_registry
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Bump when _build_handoff_content changes shape, so stored documents are rebuilt on next read
+HANDOFF_CONTENT_REVISION = 1
 
-def _build_handoff_content(group: Group, members: list, intakes: dict) -> dict:
+
+def _build_handoff_content(group: GroupInfo, members: list, intakes: dict) -> dict:
     participant_summaries = []
     for m in members:
         intake = intakes.get(str(m.user_id), {})
@@ -39,36 +46,59 @@ def _build_handoff_content(group: Group, members: list, intakes: dict) -> dict:
 
 @router.get("/groups", response_model=HandoffListResponse)
 async def handoff_groups(
+    focus: str | None = Query(None, description="Only groups with this focus key"),
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    cond: ConditionalRequest = Depends(conditional_request),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Group).order_by(Group.name)
-    )
-    groups = result.scalars().all()
-    out = []
-    for g in groups:
-        count_result = await db.execute(
-            select(func.count(GroupMember.id)).where(
-                GroupMember.group_id == g.id,
+    """Groups (from the group registry) by name, paginated, with active participant counts (one grouped query)."""
+    snapshot = await group_registry.snapshot(db)
+    groups = [g for g in snapshot.by_name() if not focus or g.focus == focus]
+    page = groups[offset:offset + limit]
+    counts: dict = {}
+    if page:
+        result = await db.execute(
+            select(GroupMember.group_id, func.count(GroupMember.id))
+            .where(
+                GroupMember.group_id.in_([g.id for g in page]),
                 GroupMember.status == MEMBERSHIP_STATUS_ACTIVE,
             )
+            .group_by(GroupMember.group_id)
         )
-        count = count_result.scalar() or 0
-        out.append(HandoffGroupSummary(group_id=str(g.id), name=g.name, focus=g.focus, participant_count=count))
-    return HandoffListResponse(groups=out)
+        counts = dict(result.all())
+    if cond.matches(snapshot.key, focus, limit, offset, sorted((str(k), v) for k, v in counts.items())):
+        return cond.not_modified()
+    out = [
+        HandoffGroupSummary(group_id=str(g.id), name=g.name, focus=g.focus, participant_count=counts.get(g.id, 0))
+        for g in page
+    ]
+    return HandoffListResponse(groups=out, total=len(groups), limit=limit, offset=offset)
 
 
-@router.get("/group/{group_id}", response_model=HandoffResponse)
-async def get_handoff(
-    group_id: UUID,
-    user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
-):
-    result = await db.execute(select(Group).where(Group.id == group_id))
-    group = result.scalar_one_or_none()
-    if not group:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
+async def _handoff_version(db: AsyncSession, group_id: UUID) -> str | None:
+    """
+    Version of a group's handoff inputs: hash of the group's name/focus (group registry), its active memberships
+    and their intake rows (ids and updated_at), from one small joined query. None if the group does not exist.
+    """
+    group = await group_registry.get(db, group_id)
+    if group is None:
+        return None
+    result = await db.execute(
+        select(
+            GroupMember.id, GroupMember.user_id, GroupMember.match_reason,
+            IntakeResult.id, IntakeResult.updated_at,
+        )
+        .outerjoin(IntakeResult, IntakeResult.user_id == GroupMember.user_id)
+        .where(GroupMember.group_id == group_id, GroupMember.status == MEMBERSHIP_STATUS_ACTIVE)
+    )
+    rows = sorted((tuple(str(v) for v in row) for row in result.all()))
+    return content_key(HANDOFF_CONTENT_REVISION, group.name, group.focus, rows)
+
+
+async def _regenerate_handoff(db: AsyncSession, group_id: UUID) -> dict:
+    group = await group_registry.get(db, group_id)
     result = await db.execute(
         select(GroupMember).where(
             GroupMember.group_id == group_id,
@@ -77,45 +107,70 @@ async def get_handoff(
     )
     members = result.scalars().all()
     user_ids = [m.user_id for m in members]
-    result = await db.execute(select(IntakeResult).where(IntakeResult.user_id.in_(user_ids)))
+    result = await db.execute(
+        select(IntakeResult).where(IntakeResult.user_id.in_(user_ids)).order_by(IntakeResult.updated_at)
+    )
     intakes = {}
-    for row in result.scalars().all():
+    for row in result.scalars().all():  # latest intake per user wins
         intakes[str(row.user_id)] = {
             "primary_concern": row.primary_concern,
             "emotional_intensity": row.emotional_intensity,
             "support_goals": row.support_goals,
         }
-    content = _build_handoff_content(group, members, intakes)
-    handoff = await db.execute(select(HandoffDocument).where(HandoffDocument.group_id == group_id))
-    doc = handoff.scalar_one_or_none()
-    if not doc:
-        doc = HandoffDocument(group_id=group_id, content=content)
-        db.add(doc)
-        await db.flush()
-    else:
+    return _build_handoff_content(group, members, intakes)
+
+
+@router.get("/group/{group_id}", response_model=HandoffResponse)
+async def get_handoff(
+    group_id: UUID,
+    cond: ConditionalRequest = Depends(conditional_request),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Stored handoff document for the group, rebuilt and saved only when its version (membership and intake
+    changes) has moved. Sent with an ETag; a matching If-None-Match gets 304 without loading the document.
+    """
+    version = await _handoff_version(db, group_id)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
+    if cond.matches(version):
+        return cond.not_modified()
+    result = await db.execute(select(HandoffDocument).where(HandoffDocument.group_id == group_id))
+    doc = result.scalar_one_or_none()
+    if doc is None or doc.version != version or not doc.content:
+        content = await _regenerate_handoff(db, group_id)
+        if doc is None:
+            doc = HandoffDocument(group_id=group_id)
+            db.add(doc)
         doc.content = content
+        doc.version = version
         await db.flush()
-    return HandoffResponse(group_id=group_id, content=doc.content or content, created_at=doc.created_at)
+        logger.info("Handoff regenerated", extra={"group_id": str(group_id), "version": version[:12]})
+    return HandoffResponse(group_id=group_id, content=doc.content, created_at=doc.created_at, version=doc.version)
 
 
 @router.get("/group/{group_id}/document")
 async def get_handoff_document(
     group_id: UUID,
+    cond: ConditionalRequest = Depends(conditional_request),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Group).where(Group.id == group_id))
-    group = result.scalar_one_or_none()
-    if not group:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
+    """Download the stored handoff document as generated by the last GET /group/{id}; ETag is its version."""
     result = await db.execute(select(HandoffDocument).where(HandoffDocument.group_id == group_id))
     doc = result.scalar_one_or_none()
     if not doc or not doc.content:
+        if await group_registry.get(db, group_id) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Handoff not generated yet")
-    import json
-    from fastapi.responses import Response
+    headers = {"Content-Disposition": f"attachment; filename=handoff-{group_id}.json"}
+    if doc.version:
+        if cond.matches(doc.version):
+            return cond.not_modified()
+        headers.update(cond.headers())
     return Response(
         content=json.dumps(doc.content, indent=2),
         media_type="application/json",
-        headers={"Content-Disposition": f"attachment; filename=handoff-{group_id}.json"},
+        headers=headers,
     )
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.core.auth import get_current_user
+from app.core.conditional import ConditionalRequest, conditional_request
 from app.models.user import User
 from app.models.intake import IntakeResult
 from app.schemas.intake import IntakeResponse
@@ -18,6 +19,7 @@ logger = logging.getLogger(__name__)
 
 @router.get("", response_model=IntakeResponse)
 async def get_intake(
+    cond: ConditionalRequest = Depends(conditional_request),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -28,6 +30,8 @@ async def get_intake(
         .limit(1)
     )
     row = result.scalar_one_or_none()
+    if cond.matches((row.id, row.updated_at) if row else None):
+        return cond.not_modified()
     if not row:
         return IntakeResponse()
     return IntakeResponse(
@@ -1,22 +1,36 @@
-"""Scheduling: slots, confirm."""
+"""Scheduling: slots (proposed from members' availability), refresh, confirm."""
 import logging
-from datetime import datetime, timezone, timedelta
-from uuid import UUID
+from datetime import datetime, time, timezone, timedelta
+from uuid import UUID, uuid4
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import delete, exists, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.database import get_db
 from app.core.auth import get_current_user
+from app.core.cache import content_key
+from app.core.conditional import ConditionalRequest, conditional_request
 from app.models.user import User
 from app.models.group import GroupMember, MEMBERSHIP_STATUS_ACTIVE
+from app.models.intake import IntakeResult
 from app.models.scheduling import ScheduleSlot, SlotConfirmation
 from app.schemas.scheduling import SlotResponse, SlotListResponse, ConfirmSlotRequest
+from app.services.availability import WeeklySlot, propose_weekly_slots
+from app.services.group_registry import group_registry
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+SLOT_RECURRENCE_WEEKLY = "weekly"
+# Bump when slot proposal changes, so existing proposals are reported stale and recomputed on the next refresh
+SLOT_PROPOSAL_REVISION = 1
+# With hashtext(group_id): regeneration holds it exclusively, confirmation shared, so a slot is never deleted
+# while someone confirms it
+SLOTS_LOCK_KEY = 5_120_231
+
 
 async def get_user_group_id(db: AsyncSession, user_id: UUID) -> UUID | None:
     result = await db.execute(
@@ -29,29 +43,168 @@ async def get_user_group_id(db: AsyncSession, user_id: UUID) -> UUID | None:
     return row[0] if row else None
 
 
-@router.get("/slots", response_model=SlotListResponse)
-async def get_slots(
-    user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
-):
+def _group_zone(name: str | None) -> ZoneInfo:
+    name = name or settings.scheduling_timezone
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning("Unknown group timezone %r; scheduling in UTC", name)
+        return ZoneInfo("UTC")
+
+
+def next_occurrence(slot: WeeklySlot, zone: ZoneInfo, not_before: datetime) -> datetime:
+    """First session of the weekly slot (local day and time in zone) at or after not_before, in UTC."""
+    local = not_before.astimezone(zone)
+    day = local.date() + timedelta(days=(slot.day - local.weekday()) % 7)
+    start = datetime.combine(day, time(slot.minute // 60, slot.minute % 60), tzinfo=zone)
+    if start < local:
+        start += timedelta(days=7)
+    return start.astimezone(timezone.utc)
+
+
+async def _member_availability(db: AsyncSession, group_id: UUID) -> dict[UUID, str | None]:
+    """Availability from each active member's latest intake (None if they have none)."""
+    result = await db.execute(
+        select(GroupMember.user_id, IntakeResult.availability)
+        .outerjoin(IntakeResult, IntakeResult.user_id == GroupMember.user_id)
+        .where(GroupMember.group_id == group_id, GroupMember.status == MEMBERSHIP_STATUS_ACTIVE)
+        .order_by(IntakeResult.updated_at)
+    )
+    availability: dict[UUID, str | None] = {}
+    for user_id, text in result.all():  # latest intake per member wins
+        availability[user_id] = text
+    return availability
+
+
+def _slots_version(zone: ZoneInfo, availability: dict[UUID, str | None]) -> str:
+    """Changes when a member joins or leaves, an intake's availability changes, or the proposal settings do."""
+    return content_key(
+        SLOT_PROPOSAL_REVISION,
+        zone.key,
+        settings.scheduling_slot_count,
+        settings.scheduling_session_minutes,
+        sorted((str(user_id), text) for user_id, text in availability.items()),
+    )
+
+
+async def _regenerate_slots(
+    db: AsyncSession,
+    group_id: UUID,
+    zone: ZoneInfo,
+    availability: dict[UUID, str | None],
+    version: str,
+) -> None:
+    """
+    Replace the group's unconfirmed slots with weekly series proposed from the members' availability,
+    inserted in one statement. Slots someone confirmed are kept (and marked current).
+    """
+    await db.execute(select(func.pg_advisory_xact_lock(SLOTS_LOCK_KEY, func.hashtext(str(group_id)))))
+    current = await db.execute(
+        select(ScheduleSlot.id)
+        .where(ScheduleSlot.group_id == group_id, ScheduleSlot.availability_version == version)
+        .limit(1)
+    )
+    if current.first() is not None:
+        return  # a concurrent request regenerated them while we waited for the lock
+    confirmed = exists().where(SlotConfirmation.slot_id == ScheduleSlot.id)
+    await db.execute(delete(ScheduleSlot).where(ScheduleSlot.group_id == group_id, ~confirmed))
+    await db.execute(
+        update(ScheduleSlot).where(ScheduleSlot.group_id == group_id).values(availability_version=version)
+    )
+    kept = set((await db.execute(select(ScheduleSlot.slot_at).where(ScheduleSlot.group_id == group_id))).scalars())
+    not_before = datetime.now(timezone.utc) + timedelta(days=settings.scheduling_lead_days)
+    proposals = propose_weekly_slots(
+        list(availability.values()),
+        settings.scheduling_slot_count,
+        settings.scheduling_session_minutes,
+        fallback_day=not_before.astimezone(zone).weekday(),
+    )
+    now = datetime.now(timezone.utc)
+    rows = []
+    for proposal in proposals:
+        slot_at = next_occurrence(proposal, zone, not_before)
+        if slot_at not in kept:
+            rows.append({
+                "id": uuid4(),
+                "group_id": group_id,
+                "slot_at": slot_at,
+                "recurrence": SLOT_RECURRENCE_WEEKLY,
+                "available_members": proposal.available,
+                "availability_version": version,
+                "created_at": now,
+            })
+    if rows:
+        await db.execute(insert(ScheduleSlot).values(rows))
+    logger.info(
+        "Slots proposed",
+        extra={"group_id": str(group_id), "members": len(availability), "slots": [p.label for p in proposals]},
+    )
+
+
+async def _slot_context(db: AsyncSession, user: User) -> tuple[UUID, ZoneInfo, dict[UUID, str | None], str]:
     group_id = await get_user_group_id(db, user.id)
     if not group_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No group assigned. Complete intake first.")
+    group = await group_registry.get(db, group_id)
+    zone = _group_zone(group.timezone if group else None)
+    availability = await _member_availability(db, group_id)
+    return group_id, zone, availability, _slots_version(zone, availability)
+
+
+async def _group_slots(db: AsyncSession, group_id: UUID) -> list[ScheduleSlot]:
     result = await db.execute(
-        select(ScheduleSlot).where(ScheduleSlot.group_id == group_id).order_by(ScheduleSlot.slot_at)
+        select(ScheduleSlot)
+        .where(ScheduleSlot.group_id == group_id)
+        .order_by(ScheduleSlot.slot_at)
+        .execution_options(populate_existing=True)
     )
-    slots = result.scalars().all()
-    if not slots:
-        now = datetime.now(timezone.utc)
-        for i in range(3):
-            slot = ScheduleSlot(group_id=group_id, slot_at=now + timedelta(days=7 + i, hours=18))
-            db.add(slot)
-        await db.flush()
-        result = await db.execute(
-            select(ScheduleSlot).where(ScheduleSlot.group_id == group_id).order_by(ScheduleSlot.slot_at)
-        )
-        slots = result.scalars().all()
-    return SlotListResponse(slots=[SlotResponse(id=s.id, slot_at=s.slot_at) for s in slots])
+    return list(result.scalars().all())
+
+
+def _slot_list(
+    slots: list[ScheduleSlot], availability: dict[UUID, str | None], zone: ZoneInfo, version: str
+) -> SlotListResponse:
+    return SlotListResponse(
+        slots=[
+            SlotResponse(id=s.id, slot_at=s.slot_at, recurrence=s.recurrence, available_members=s.available_members)
+            for s in slots
+        ],
+        member_count=len(availability),
+        timezone=zone.key,
+        stale=not any(s.availability_version == version for s in slots),
+    )
+
+
+@router.get("/slots", response_model=SlotListResponse)
+async def get_slots(
+    cond: ConditionalRequest = Depends(conditional_request),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    The group's session slots: weekly series at the times most members said they are available, in the
+    group's timezone. Read-only: stale is true when membership or a member's availability changed since
+    they were proposed (or none were yet), and POST /slots/refresh then proposes them again.
+    """
+    group_id, zone, availability, version = await _slot_context(db, user)
+    slots = await _group_slots(db, group_id)
+    if cond.matches(group_id, version, [(s.id, s.slot_at) for s in slots]):
+        return cond.not_modified()
+    return _slot_list(slots, availability, zone, version)
+
+
+@router.post("/slots/refresh", response_model=SlotListResponse)
+async def refresh_slots(
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Propose the group's slots again if they are stale (a no-op otherwise); returns them like GET /slots."""
+    group_id, zone, availability, version = await _slot_context(db, user)
+    slots = await _group_slots(db, group_id)
+    if not any(s.availability_version == version for s in slots):
+        await _regenerate_slots(db, group_id, zone, availability, version)
+        slots = await _group_slots(db, group_id)
+    return _slot_list(slots, availability, zone, version)
 
 
 @router.post("/confirm")
@@ -60,11 +213,14 @@ async def confirm_slot(
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    group_id = await get_user_group_id(db, user.id)
+    if group_id:
+        # Waits for a regeneration of this group's slots in progress, and holds it off until we commit
+        await db.execute(select(func.pg_advisory_xact_lock_shared(SLOTS_LOCK_KEY, func.hashtext(str(group_id)))))
     result = await db.execute(select(ScheduleSlot).where(ScheduleSlot.id == body.slot_id))
     slot = result.scalar_one_or_none()
     if not slot:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Slot not found")
-    group_id = await get_user_group_id(db, user.id)
     if group_id != slot.group_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Slot does not belong to your group")
     result = await db.execute(
@@ -1,6 +1,7 @@
 """Application configuration."""
 import os
 from pathlib import Path
+from typing import Literal
 
 from dotenv import load_dotenv
 from pydantic import model_validator
@@ -36,6 +37,99 @@ class Settings(BaseSettings):
     openai_api_key: str = ""
     huggingface_token: str = ""
     groq_model: str = "llama-3.1-8b-instant"
+    # OpenAI-compatible endpoints (point at scripts/fake_llm_server.py for offline load tests)
+    groq_base_url: str = "https://api.groq.com/openai/v1"
+    openai_base_url: str = ""
+    # Pooled LLM HTTP clients (one per provider, shared across requests)
+    llm_timeout_sec: float = 30.0
+    llm_connect_timeout_sec: float = 5.0
+    llm_max_connections: int = 50
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry_sec: float = 60.0
+    # Hedged chat requests: if the primary provider is slower than its recent latency percentile,
+    # also ask the secondary and take whichever answers first (needs both GROQ and OPENAI keys)
+    llm_hedge_enabled: bool = False
+    llm_hedge_percentile: float = 0.9
+    llm_hedge_min_delay_sec: float = 0.5
+    llm_hedge_max_delay_sec: float = 5.0
+    llm_hedge_min_samples: int = 20
+    llm_latency_window: int = 200
+    # Per-provider load shedding: AIMD concurrency window, request rate (0 = only honor provider
+    # rate-limit headers), max queueing before falling back, and circuit breaker
+    llm_concurrency_initial: int = 8
+    llm_concurrency_min: int = 1
+    llm_concurrency_max: int = 64
+    llm_rate_limit_rpm: float = 0.0
+    llm_rate_limit_burst: float = 10.0
+    llm_queue_timeout_sec: float = 10.0
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_reset_sec: float = 30.0
+    # Prompt token budgets per task (history / conversation / intake text; oldest turns dropped first)
+    llm_chat_token_budget: int = 1500
+    llm_extraction_token_budget: int = 3000
+    llm_matching_token_budget: int = 600
+    # Content-addressed cache for extraction / matching results (0 entries disables)
+    llm_cache_max_entries: int = 1024
+    llm_cache_ttl_sec: float = 600.0
+    # Run per-turn intake extraction after the reply is sent; /api/chat/send then answers before intake_complete
+    # is known, and the client polls /api/chat/intake-status while intake_pending is true
+    chat_background_extraction: bool = False
+    # Extract from previous state + new turns only (full re-extraction until the state is trusted)
+    incremental_extraction: bool = True
+    # /api/chat/send: one JSON-mode call returns the reply and the updated intake (no separate extraction call)
+    chat_combined_extraction: bool = False
+    # Password KDF and cost; hashes with other parameters are upgraded on login. Any other KDF fails at startup
+    password_kdf: Literal["pbkdf2_sha256", "scrypt"] = "pbkdf2_sha256"
+    password_pbkdf2_iterations: int = 100_000
+    password_scrypt_n: int = 2**14
+    password_scrypt_r: int = 8
+    password_scrypt_p: int = 1
+    # Password hashing runs in this many threads; beyond that plus the queue, login/signup get 503 + Retry-After
+    password_hash_workers: int = 2
+    password_hash_max_queue: int = 32
+    # Opt-in stateless sessions: HMAC-signed tokens (secret_key) instead of auth_sessions rows
+    auth_stateless_tokens: bool = False
+    auth_token_ttl_sec: float = 7 * 24 * 3600.0
+    auth_revocation_max_entries: int = 100_000
+    # Auth session id -> user snapshot cache for get_current_user (0 entries disables); Redis URL shares it
+    auth_cache_max_entries: int = 10000
+    auth_cache_ttl_sec: float = 60.0
+    auth_cache_redis_url: str = ""
+    # Per-session conversation cache (0 sessions disables); Redis URL shares it across workers (needs `redis`)
+    turn_cache_max_sessions: int = 2048
+    turn_cache_ttl_sec: float = 1800.0
+    turn_cache_redis_url: str = ""
+    # Chat turn inserts: "sync" (in the request transaction), "group_commit" (batched, request waits for the
+    # commit) or "write_behind" (batched, not waited for: up to one interval of turns lost on a crash)
+    chat_turn_write_mode: str = "sync"
+    chat_turn_flush_interval_ms: float = 50.0
+    chat_turn_max_batch: int = 500
+    chat_turn_write_retries: int = 3
+    # Group matching: "llm" (LLM pick, local matcher as fallback) or "embedding" (local matcher only, no LLM call)
+    group_matcher: str = "llm"
+    # Local matcher embedder: "hashing" (built in) or a sentence-transformers model; needs numpy, "" disables
+    matching_embedding_model: str = "hashing"
+    # Below this cosine similarity the keyword rules decide instead
+    matching_min_similarity: float = 0.15
+    # Keyword rules: JSON {focus: {keyword: weight}}; empty uses app/services/focus_keywords.json
+    matching_keywords_file: str = ""
+    # Therapy group size: groups are filled up to GROUP_CAPACITY, then a sub-group of the same focus is opened
+    group_capacity: int = 12
+    # "immediate": place each user when intake completes; "batch": intakes wait for the batch optimizer
+    # (app/services/group_assignment.py), run every GROUP_ASSIGNMENT_INTERVAL_SEC or via scripts/assign_groups.py
+    group_assignment: str = "immediate"
+    group_assignment_interval_sec: float = 300.0
+    # Batch optimizer opens a new sub-group only for at least this many pending intakes (the rest wait)
+    group_min_size: int = 6
+    # In-process group registry (matching, /api/groups, handoff): reloaded after local group changes, and at
+    # least this often to pick up changes made by other workers
+    group_registry_ttl_sec: float = 30.0
+    # Session slots proposed from members' intake availability: how many weekly series, session length,
+    # earliest first session (days from now), and the timezone of groups without their own
+    scheduling_slot_count: int = 3
+    scheduling_session_minutes: int = 90
+    scheduling_lead_days: int = 7
+    scheduling_timezone: str = "UTC"
     crisis_line_text: str = "Please contact a mental health professional or crisis helpline."
 
     model_config = {
@@ -49,7 +143,10 @@ class Settings(BaseSettings):
         openai_from_file = _read_env_value("OPENAI_API_KEY")
         if groq_from_file:
             object.__setattr__(self, "groq_api_key", groq_from_file)
-            object.__setattr__(self, "openai_api_key", "")
+            if self.llm_hedge_enabled and openai_from_file:
+                object.__setattr__(self, "openai_api_key", openai_from_file)
+            else:
+                object.__setattr__(self, "openai_api_key", "")
         elif openai_from_file:
             object.__setattr__(self, "openai_api_key", openai_from_file)
         return self
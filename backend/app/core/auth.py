@@ -1,29 +1,209 @@
 """Session-based auth: get user from X-Session-Id."""
+import asyncio
+import json
 import logging
+from datetime import date, datetime
+from typing import Any
 from uuid import UUID
 
 from fastapi import Depends, Header, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.config import settings
+from app.core.cache import TTLCache, get_redis
 from app.models.user import User, AuthSession
 from app.database import get_db
 from app.core.logging_config import session_id_var
+from app.core.tokens import decode_session_token, looks_like_token, revocation_list
 
 logger = logging.getLogger(__name__)
 
+SESSION_KEY_PREFIX = "sage:auth:session:"
+USER_SESSIONS_KEY_PREFIX = "sage:auth:user:"
+# Not cached (never needed by authenticated handlers, and kept out of shared storage)
+_SNAPSHOT_EXCLUDED = {"hashed_password"}
+
+
+def _user_snapshot(user: User) -> dict[str, Any]:
+    """JSON-safe column values of a user, minus the password hash."""
+    snapshot: dict[str, Any] = {}
+    for column in User.__table__.columns:
+        if column.key in _SNAPSHOT_EXCLUDED:
+            continue
+        value = getattr(user, column.key)
+        snapshot[column.key] = value.isoformat() if isinstance(value, (date, datetime)) else (
+            str(value) if isinstance(value, UUID) else value
+        )
+    return snapshot
+
+
+def _user_from_snapshot(snapshot: dict[str, Any]) -> User:
+    """Detached User rebuilt from a snapshot; attach with db.add (no query). hashed_password is not loaded."""
+    values = dict(snapshot)
+    values["id"] = UUID(values["id"])
+    if values.get("date_of_birth"):
+        values["date_of_birth"] = date.fromisoformat(values["date_of_birth"])
+    if values.get("created_at"):
+        values["created_at"] = datetime.fromisoformat(values["created_at"])
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
+
+
+class SessionUserCache:
+    """
+    TTL'd cache of auth session id -> user snapshot, so an authenticated request usually needs no query.
+    In-process LRU; with AUTH_CACHE_REDIS_URL also shared across workers. Entries are dropped on logout
+    (invalidate_session) and whenever a User row is updated through the ORM (invalidate_user). Without Redis,
+    a logout or update in one worker reaches the others within AUTH_CACHE_TTL_SEC.
+    """
+
+    def __init__(self) -> None:
+        self.local = TTLCache(settings.auth_cache_max_entries, settings.auth_cache_ttl_sec)
+        # Sessions logged out recently: a lookup that raced the logout must not re-cache them
+        self._invalidated = TTLCache(settings.auth_cache_max_entries, settings.auth_cache_ttl_sec)
+        self._user_sessions: dict[str, set[str]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def _redis(self) -> Any:
+        return get_redis(settings.auth_cache_redis_url)
+
+    async def get(self, session_id: str) -> dict[str, Any] | None:
+        snapshot = self.local.get(session_id)
+        if snapshot is not None:
+            return snapshot
+        redis = self._redis()
+        if redis is None:
+            return None
+        try:
+            raw = await redis.get(SESSION_KEY_PREFIX + session_id)
+        except Exception as e:
+            logger.warning("Auth cache: Redis read failed: %s", e)
+            return None
+        if raw is None:
+            return None
+        snapshot = json.loads(raw)
+        self.local.set(session_id, snapshot)
+        return snapshot
+
+    async def set(self, session_id: str, snapshot: dict[str, Any]) -> None:
+        if self.local.maxsize <= 0 and self._redis() is None:
+            return
+        if self._invalidated.get(session_id) is not None:
+            return
+        self.local.set(session_id, snapshot)
+        self._user_sessions.setdefault(snapshot["id"], set()).add(session_id)
+        if len(self._user_sessions) > 2 * max(self.local.maxsize, 1):
+            self._user_sessions.clear()  # only an index for invalidate_user; entries still expire by TTL
+        redis = self._redis()
+        if redis is not None:
+            ttl = int(settings.auth_cache_ttl_sec)
+            try:
+                async with redis.pipeline(transaction=False) as pipe:
+                    pipe.set(SESSION_KEY_PREFIX + session_id, json.dumps(snapshot), ex=ttl)
+                    pipe.sadd(USER_SESSIONS_KEY_PREFIX + snapshot["id"], session_id)
+                    pipe.expire(USER_SESSIONS_KEY_PREFIX + snapshot["id"], ttl)
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning("Auth cache: Redis write failed: %s", e)
+
+    def invalidate_session(self, session_id: str) -> None:
+        self.local.delete(session_id)
+        self._invalidated.set(session_id, True)
+        self._spawn(self._invalidate_redis([session_id], None))
+
+    def invalidate_user(self, user_id: UUID | str) -> None:
+        user_key = str(user_id)
+        session_ids = self._user_sessions.pop(user_key, set())
+        for session_id in session_ids:
+            self.local.delete(session_id)
+        self._spawn(self._invalidate_redis(list(session_ids), user_key))
+
+    def _spawn(self, coro: Any) -> None:
+        if self._redis() is None:
+            coro.close()
+            return
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _invalidate_redis(self, session_ids: list[str], user_key: str | None) -> None:
+        redis = self._redis()
+        try:
+            if user_key is not None:
+                session_ids = list(set(session_ids) | set(await redis.smembers(USER_SESSIONS_KEY_PREFIX + user_key)))
+                await redis.delete(USER_SESSIONS_KEY_PREFIX + user_key)
+            if session_ids:
+                await redis.delete(*(SESSION_KEY_PREFIX + s for s in session_ids))
+        except Exception as e:
+            logger.warning("Auth cache: Redis invalidation failed: %s", e)
+
+    def stats(self) -> dict[str, Any]:
+        return {**self.local.stats(), "shared": self._redis() is not None}
+
+    async def aclose(self) -> None:
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+session_user_cache = SessionUserCache()
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_updated_user(mapper: Any, connection: Any, target: User) -> None:
+    session_user_cache.invalidate_user(target.id)
+
+
+def _attach_snapshot(db: AsyncSession, snapshot: dict[str, Any]) -> User:
+    user = _user_from_snapshot(snapshot)
+    db.add(user)  # attach as persistent (no query) so the handler can use it like a loaded row
+    return user
+
+
+async def _user_from_token(token: str, db: AsyncSession) -> User:
+    """Stateless token: signature, expiry and revocation are checked in memory; the user comes from the cache."""
+    claims = decode_session_token(token)
+    if claims is None or await revocation_list.is_revoked(claims):
+        logger.warning("Invalid, expired or revoked session token")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired session",
+        )
+    session_id_var.set(claims.token_id)
+    cache_key = f"user:{claims.user_id}"
+    snapshot = await session_user_cache.get(cache_key)
+    if snapshot is not None:
+        return _attach_snapshot(db, snapshot)
+    result = await db.execute(select(User).where(User.id == claims.user_id))
+    user = result.scalar_one_or_none()
+    if not user:
+        logger.warning("User not found for session token", extra={"session_id": claims.token_id})
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid session",
+        )
+    await session_user_cache.set(cache_key, _user_snapshot(user))
+    return user
+
 
 async def get_current_user(
     x_session_id: str | None = Header(None, alias="X-Session-Id"),
     db: AsyncSession = Depends(get_db),
 ) -> User:
-    """Resolve X-Session-Id to User; set session_id in context for logging."""
+    """
+    Resolve X-Session-Id (auth session UUID, or a signed session token) to User, from the cached snapshot or
+    one query; set session_id in context for logging.
+    """
     if not x_session_id:
         logger.warning("Missing X-Session-Id header")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Missing X-Session-Id",
         )
+    if looks_like_token(x_session_id):
+        return await _user_from_token(x_session_id, db)
     try:
         session_uuid = UUID(x_session_id)
     except ValueError:
@@ -33,22 +213,21 @@ async def get_current_user(
             detail="Invalid session",
         )
     session_id_var.set(x_session_id)
+    cache_key = str(session_uuid)
+    snapshot = await session_user_cache.get(cache_key)
+    if snapshot is not None:
+        return _attach_snapshot(db, snapshot)
     result = await db.execute(
-        select(AuthSession).where(AuthSession.id == session_uuid)
+        select(User)
+        .join(AuthSession, AuthSession.user_id == User.id)
+        .where(AuthSession.id == session_uuid)
     )
-    auth_session = result.scalar_one_or_none()
-    if not auth_session:
-        logger.warning("Session not found", extra={"session_id": x_session_id[:8]})
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired session",
-        )
-    result = await db.execute(select(User).where(User.id == auth_session.user_id))
     user = result.scalar_one_or_none()
     if not user:
-        logger.warning("User not found for session", extra={"session_id": x_session_id[:8]})
+        logger.warning("Session not found", extra={"session_id": x_session_id[:8]})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid session",
+            detail="Invalid or expired session",
         )
+    await session_user_cache.set(cache_key, _user_snapshot(user))
     return user
@@ -0,0 +1,106 @@
+"""In-process bounded LRU cache with TTL eviction and hit/miss counters; optional shared Redis clients."""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+_redis_clients: dict[str, Any] = {}
+
+
+def content_key(*parts: Any) -> str:
+    """Stable SHA-256 of JSON-serializable parts (dict keys sorted), for content-addressed caching."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTLCache:
+    """
+    Least-recently-used cache bounded by maxsize; entries expire ttl seconds after being set.
+    maxsize <= 0 disables the cache (every get is a miss, set is a no-op).
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.evictions += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_sec": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def get_redis(url: str) -> Any:
+    """Shared redis.asyncio client for url; None if url is empty or the optional `redis` package is not installed."""
+    if not url:
+        return None
+    if url not in _redis_clients:
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            logger.warning("A Redis URL is set but the redis package is not installed; using in-process cache only")
+            _redis_clients[url] = None
+        else:
+            _redis_clients[url] = redis.from_url(url, decode_responses=True)
+    return _redis_clients[url]
+
+
+async def close_redis_clients() -> None:
+    for client in _redis_clients.values():
+        if client is not None:
+            await client.aclose()
+    _redis_clients.clear()
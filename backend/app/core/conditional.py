@@ -0,0 +1,62 @@
+"""
+Conditional GET: handlers derive an ETag from row versions (ids, updated_at, counts) before building the
+response; a request whose If-None-Match matches gets 304 with no body, skipping serialization and, where the
+handler checks early, the heavier queries. Responses are marked private/no-cache so browsers revalidate with
+If-None-Match on each fetch instead of re-downloading.
+"""
+from typing import Any
+
+from fastapi import Header, Response, status
+
+from app.core.cache import content_key
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag from JSON-serializable validator parts."""
+    return f'"{content_key(*parts)[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 requires for GET); handles lists and *."""
+    if not if_none_match:
+        return False
+    candidates = [c.strip().removeprefix("W/") for c in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class ConditionalRequest:
+    """
+    Per-request helper (use via Depends(conditional_request)):
+
+        if cond.matches(row.id, row.updated_at):
+            return cond.not_modified()
+
+    matches() also sets ETag and Cache-Control on the response the handler goes on to return (handlers that
+    build their own Response add headers()).
+    """
+
+    def __init__(self, response: Response, if_none_match: str | None) -> None:
+        self.response = response
+        self.if_none_match = if_none_match
+        self.etag: str | None = None
+
+    def matches(self, *validator: Any) -> bool:
+        self.etag = make_etag(*validator)
+        self.response.headers["ETag"] = self.etag
+        self.response.headers["Cache-Control"] = CACHE_CONTROL
+        return etag_matches(self.if_none_match, self.etag)
+
+    def headers(self) -> dict[str, str]:
+        return {"ETag": self.etag or "", "Cache-Control": CACHE_CONTROL}
+
+    def not_modified(self) -> Response:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers())
+
+
+def conditional_request(
+    response: Response,
+    if_none_match: str | None = Header(None, alias="If-None-Match"),
+) -> ConditionalRequest:
+    return ConditionalRequest(response, if_none_match)
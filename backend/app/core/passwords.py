@@ -0,0 +1,174 @@
+"""
+Password hashing (PBKDF2-HMAC-SHA256 or scrypt; KDF and cost from settings, calibrate with
+scripts/calibrate_password_hash.py) run off the event loop in a bounded thread pool: hashlib releases the GIL,
+so a login no longer stalls the worker's other requests. Beyond the pool plus PASSWORD_HASH_MAX_QUEUE waiting
+calls, new calls are refused (PasswordHasherBusy -> 503 with Retry-After) instead of queueing without bound.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SALT_BYTES = 16
+STORED_FORMAT = "pbkdf2_sha256${}${}${}"
+SCRYPT_STORED_FORMAT = "scrypt${}${}${}${}${}"
+KDF_PBKDF2 = "pbkdf2_sha256"
+KDF_SCRYPT = "scrypt"
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # maxmem must cover scrypt's ~128*r*(N+p) bytes; OpenSSL's default cap (32 MiB) is too low for N=2**15+
+    return hashlib.scrypt(
+        password.encode("utf-8"), salt=salt, n=n, r=r, p=p, maxmem=128 * r * (n + p) + (1 << 20), dklen=32
+    )
+
+
+def hash_password(password: str, kdf: str | None = None, cost: dict[str, int] | None = None) -> str:
+    """
+    Hash password with the configured KDF (PASSWORD_KDF: PBKDF2-HMAC-SHA256 or scrypt) and cost; the stored
+    string records its parameters. Blocking: use password_hasher.hash in handlers.
+    """
+    kdf = kdf or settings.password_kdf
+    cost = cost or current_cost(kdf)
+    salt = os.urandom(SALT_BYTES)
+    if kdf == KDF_SCRYPT:
+        key = _scrypt(password, salt, cost["n"], cost["r"], cost["p"])
+        return SCRYPT_STORED_FORMAT.format(cost["n"], cost["r"], cost["p"], _b64(salt), _b64(key))
+    if kdf != KDF_PBKDF2:
+        raise ValueError(f"Unsupported PASSWORD_KDF: {kdf}")
+    key = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, cost["iterations"])
+    return STORED_FORMAT.format(cost["iterations"], _b64(salt), _b64(key))
+
+
+def current_cost(kdf: str | None = None) -> dict[str, int]:
+    """Configured parameters for kdf (default PASSWORD_KDF)."""
+    if (kdf or settings.password_kdf) == KDF_SCRYPT:
+        return {"n": settings.password_scrypt_n, "r": settings.password_scrypt_r, "p": settings.password_scrypt_p}
+    return {"iterations": settings.password_pbkdf2_iterations}
+
+
+def _parse(stored: str) -> tuple[str, dict[str, int], bytes, bytes]:
+    parts = stored.split("$")
+    if parts[0] == KDF_PBKDF2 and len(parts) == 4:
+        return KDF_PBKDF2, {"iterations": int(parts[1])}, base64.b64decode(parts[2]), base64.b64decode(parts[3])
+    if parts[0] == KDF_SCRYPT and len(parts) == 6:
+        cost = {"n": int(parts[1]), "r": int(parts[2]), "p": int(parts[3])}
+        return KDF_SCRYPT, cost, base64.b64decode(parts[4]), base64.b64decode(parts[5])
+    raise ValueError("Unknown password hash format")
+
+
+def verify_password(password: str, stored: str) -> bool:
+    """Verify password against a stored PBKDF2 or scrypt hash. Blocking: use password_hasher.verify in handlers."""
+    try:
+        kdf, cost, salt, key = _parse(stored)
+        if kdf == KDF_SCRYPT:
+            expected = _scrypt(password, salt, cost["n"], cost["r"], cost["p"])
+        else:
+            expected = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, cost["iterations"])
+        return hmac.compare_digest(expected, key)
+    except Exception:
+        return False
+
+
+def needs_rehash(stored: str) -> bool:
+    """True if stored was made with another KDF or other parameters than currently configured."""
+    try:
+        kdf, cost, _, _ = _parse(stored)
+    except Exception:
+        return False
+    return kdf != settings.password_kdf or cost != current_cost(kdf)
+
+
+class PasswordHasherBusy(Exception):
+    """Too many hashes in flight; retry after retry_after seconds."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"Password hashing is busy; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """Bounded executor for hash/verify with in-flight limit and latency stats (reported in /api/auth/hash-stats)."""
+
+    def __init__(self, workers: int, max_queue: int, latency_window: int = 200) -> None:
+        self.workers = max(1, workers)
+        self.max_in_flight = self.workers + max(0, max_queue)
+        self._executor: ThreadPoolExecutor | None = None
+        self._in_flight = 0
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    def _retry_after(self) -> int:
+        """Seconds until the current backlog has likely drained."""
+        mean = sum(self._latencies) / len(self._latencies) if self._latencies else 0.1
+        return max(1, math.ceil(self._in_flight * mean / self.workers))
+
+    async def _run(self, op: str, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._in_flight >= self.max_in_flight:
+            self.rejected += 1
+            retry_after = self._retry_after()
+            logger.warning("Password %s rejected: %s in flight, retry after %ss", op, self._in_flight, retry_after)
+            raise PasswordHasherBusy(retry_after)
+        self._in_flight += 1
+        started = time.monotonic()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._in_flight -= 1
+            elapsed = time.monotonic() - started
+            self._latencies.append(elapsed)
+            self.completed += 1
+            logger.debug("Password %s took %.1f ms", op, elapsed * 1000)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", hash_password, password)
+
+    async def verify(self, password: str, stored: str) -> bool:
+        return await self._run("verify", verify_password, password, stored)
+
+    def stats(self) -> dict[str, Any]:
+        """Latency (queue wait + hashing) percentiles in ms over the recent window, plus load counters."""
+        ordered = sorted(self._latencies)
+
+        def pct(p: float) -> float | None:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 1)
+
+        return {
+            "workers": self.workers,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "latency_ms": {"p50": pct(0.5), "p90": pct(0.9), "p99": pct(0.99), "samples": len(ordered)},
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_max_queue)
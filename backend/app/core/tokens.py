@@ -0,0 +1,124 @@
+"""
+Stateless session tokens (opt-in, AUTH_STATELESS_TOKENS): HMAC-SHA256 signed with settings.secret_key, carrying
+user id, issue time and expiry, so they are validated without a database lookup. Sent in X-Session-Id like
+the DB-backed session UUIDs, which keep working. Logout revokes a token by id in a bounded, expiring list.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+from app.config import settings
+from app.core.cache import TTLCache, get_redis
+
+logger = logging.getLogger(__name__)
+
+TOKEN_VERSION = "v1"
+REVOKED_KEY_PREFIX = "sage:auth:revoked:"
+
+
+@dataclass(frozen=True)
+class SessionToken:
+    user_id: UUID
+    issued_at: int
+    expires_at: int
+    token_id: str
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    key = settings.secret_key.encode("utf-8")
+    return _b64encode(hmac.new(key, f"{TOKEN_VERSION}.{payload}".encode("ascii"), hashlib.sha256).digest())
+
+
+def looks_like_token(value: str) -> bool:
+    return value.startswith(f"{TOKEN_VERSION}.")
+
+
+def issue_session_token(user_id: UUID) -> str:
+    now = int(time.time())
+    claims = {
+        "uid": str(user_id),
+        "iat": now,
+        "exp": now + int(settings.auth_token_ttl_sec),
+        "jti": _b64encode(os.urandom(9)),
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    return f"{TOKEN_VERSION}.{payload}.{_sign(payload)}"
+
+
+def decode_session_token(token: str) -> SessionToken | None:
+    """Claims of a well-signed, unexpired token, else None. Does not check revocation."""
+    try:
+        version, payload, signature = token.split(".")
+        if version != TOKEN_VERSION or not hmac.compare_digest(signature, _sign(payload)):
+            return None
+        claims = json.loads(_b64decode(payload))
+        parsed = SessionToken(
+            user_id=UUID(claims["uid"]),
+            issued_at=int(claims["iat"]),
+            expires_at=int(claims["exp"]),
+            token_id=str(claims["jti"]),
+        )
+    except (ValueError, KeyError, TypeError):
+        return None
+    if parsed.expires_at <= time.time():
+        return None
+    return parsed
+
+
+class TokenRevocationList:
+    """
+    Revoked token ids until their expiry. In-process and bounded (AUTH_REVOCATION_MAX_ENTRIES; when full the
+    least recently used entries are evicted, so keep it above the expected logouts per token lifetime); with
+    AUTH_CACHE_REDIS_URL revocations are also shared across workers.
+    """
+
+    def __init__(self) -> None:
+        self.local = TTLCache(settings.auth_revocation_max_entries, settings.auth_token_ttl_sec)
+
+    def _redis(self) -> Any:
+        return get_redis(settings.auth_cache_redis_url)
+
+    async def revoke(self, token: SessionToken) -> None:
+        remaining = token.expires_at - time.time()
+        if remaining <= 0:
+            return
+        self.local.set(token.token_id, True, ttl=remaining)
+        redis = self._redis()
+        if redis is not None:
+            try:
+                await redis.set(REVOKED_KEY_PREFIX + token.token_id, "1", ex=max(1, int(remaining)))
+            except Exception as e:
+                logger.warning("Token revocation: Redis write failed (revoked in this worker only): %s", e)
+
+    async def is_revoked(self, token: SessionToken) -> bool:
+        if self.local.get(token.token_id) is not None:
+            return True
+        redis = self._redis()
+        if redis is None:
+            return False
+        try:
+            revoked = await redis.exists(REVOKED_KEY_PREFIX + token.token_id)
+        except Exception as e:
+            logger.warning("Token revocation: Redis read failed: %s", e)
+            return False
+        if revoked:
+            self.local.set(token.token_id, True, ttl=max(1.0, token.expires_at - time.time()))
+        return bool(revoked)
+
+
+revocation_list = TokenRevocationList()
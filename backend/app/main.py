@@ -11,8 +11,18 @@ from fastapi.responses import JSONResponse
 
 from app.config import settings
 from app.core.logging_config import setup_logging
+from app.core.auth import session_user_cache
+from app.core.cache import close_redis_clients
+from app.core.passwords import password_hasher
 from app import models  # noqa: F401
 from app.api import auth, chat, intake, groups, scheduling, payments, handoff
+from app.services.llm_providers import provider_registry
+from app.services.embedding_matcher import embedding_matcher
+from app.services.group_assignment import batch_assignment_job
+from app.services.intake_completion import intake_completion_service
+from app.services.matching import matching_service
+from app.services.turn_cache import turn_cache
+from app.services.turn_writer import turn_writer
 
 setup_logging(debug=settings.debug)
 logger = logging.getLogger(__name__)
@@ -57,6 +67,13 @@ app.include_router(handoff.router, prefix="/api/handoff", tags=["handoff"])
 @app.on_event("startup")
 async def startup():
     logger.info("Application started")
+    provider_registry.start()
+    embedding_matcher.check_dependencies()
+    try:
+        await matching_service.seed()
+    except Exception as e:
+        logger.warning("Groups not seeded at startup (%s); they are created on first assignment", e)
+    batch_assignment_job.start()
     groq_ok = bool(settings.groq_api_key and settings.groq_api_key.strip())
     openai_ok = bool(settings.openai_api_key and settings.openai_api_key.strip())
     if groq_ok:
@@ -67,6 +84,21 @@ async def startup():
         msg = "No LLM API key set (chat will use mock replies)"
     logger.info(msg)
     print(f"\n>>> {msg} <<<\n", flush=True)
+    if settings.auth_stateless_tokens and settings.secret_key == "change-me-in-production":
+        logger.warning("AUTH_STATELESS_TOKENS is on with the default SECRET_KEY; set SECRET_KEY before deploying")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await intake_completion_service.aclose()
+    await batch_assignment_job.aclose()
+    await provider_registry.aclose()
+    await turn_writer.aclose()
+    await turn_cache.aclose()
+    await session_user_cache.aclose()
+    await close_redis_clients()
+    password_hasher.shutdown()
+    logger.info("Application stopped")
 
 
 @app.get("/")
@@ -1,9 +1,9 @@
 """Chat session and turns."""
 import uuid
 from datetime import datetime
-from sqlalchemy import String, DateTime, ForeignKey, Text
+from sqlalchemy import String, DateTime, ForeignKey, Integer, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 
 from app.database import Base
 
@@ -15,11 +15,19 @@ class ChatSession(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     completed: Mapped[bool] = mapped_column(default=False)
+    # Incremental extraction: last extracted intake JSON and how many turns (in order) it covers
+    extraction_state: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    extracted_turn_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
 
     turns: Mapped[list["ChatTurn"]] = relationship("ChatTurn", back_populates="chat_session", order_by="ChatTurn.created_at")
 
+    __table_args__ = (
+        # get_or_create_chat_session / history: latest session per user
+        Index("chat_sessions_user_id_created_at_idx", "user_id", "created_at"),
+    )
+
 
 class ChatTurn(Base):
     """Single message in a chat session."""
@@ -32,3 +40,8 @@ class ChatTurn(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
     chat_session: Mapped["ChatSession"] = relationship("ChatSession", back_populates="turns")
+
+    __table_args__ = (
+        # A session's turns in order (history, extraction input)
+        Index("chat_turns_chat_session_id_created_at_idx", "chat_session_id", "created_at"),
+    )
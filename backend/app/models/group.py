@@ -14,6 +14,7 @@ class Group(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     focus: Mapped[str] = mapped_column(String(255), nullable=False)
+    timezone: Mapped[str | None] = mapped_column(String(64), nullable=True)  # IANA name; None: SCHEDULING_TIMEZONE
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
     members: Mapped[list["GroupMember"]] = relationship("GroupMember", back_populates="group")
@@ -43,4 +44,6 @@ class GroupMember(Base):
             unique=True,
             postgresql_where=text("status = 'active'"),
         ),
+        # Active members of a group (handoff, matching counts)
+        Index("group_members_group_id_status_idx", "group_id", "status"),
     )
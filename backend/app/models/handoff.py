@@ -14,4 +14,6 @@ class HandoffDocument(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     group_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("groups.id"), nullable=False)
     content: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    # Fingerprint of the group, active memberships and their intakes the content was built from
+    version: Mapped[str | None] = mapped_column(String(64), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
@@ -1,7 +1,7 @@
 """Structured intake result (no group_readiness)."""
 import uuid
 from datetime import datetime
-from sqlalchemy import String, DateTime, ForeignKey, Integer, Text
+from sqlalchemy import String, DateTime, ForeignKey, Integer, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 
@@ -24,3 +24,8 @@ class IntakeResult(Base):
     group_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), ForeignKey("groups.id"), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Latest intake per user (/api/intake, /api/groups/my); also serves user_id IN (...) in handoff
+        Index("intake_results_user_id_updated_at_idx", "user_id", "updated_at"),
+    )
@@ -1,7 +1,7 @@
 """Scheduling slots and confirmations."""
 import uuid
 from datetime import datetime
-from sqlalchemy import String, DateTime, ForeignKey
+from sqlalchemy import String, DateTime, ForeignKey, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -13,9 +13,18 @@ class ScheduleSlot(Base):
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     group_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("groups.id"), nullable=False)
-    slot_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    slot_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)  # first (or only) session
+    recurrence: Mapped[str | None] = mapped_column(String(16), nullable=True)  # "weekly": a series from slot_at
+    available_members: Mapped[int | None] = mapped_column(Integer, nullable=True)  # when proposed
+    # Version of the members' availability the slot was proposed from (see app/api/scheduling.py)
+    availability_version: Mapped[str | None] = mapped_column(String(64), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
+    __table_args__ = (
+        # A group's slots in time order
+        Index("schedule_slots_group_id_slot_at_idx", "group_id", "slot_at"),
+    )
+
 
 class SlotConfirmation(Base):
     __tablename__ = "slot_confirmations"
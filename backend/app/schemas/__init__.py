@@ -1,6 +1,8 @@
 """Pydantic schemas."""
 from app.schemas.auth import SignupRequest, LoginRequest, AuthResponse, UserResponse
-from app.schemas.chat import ChatSendRequest, ChatSendResponse, ChatTurnResponse, ChatHistoryResponse
+from app.schemas.chat import (
+    ChatSendRequest, ChatSendResponse, ChatTurnResponse, ChatHistoryResponse, ChatIntakeStatusResponse,
+)
 from app.schemas.intake import IntakeResponse, IntakeUpdate
 from app.schemas.group import GroupResponse, GroupListResponse, GroupMemberResponse
 from app.schemas.scheduling import SlotResponse, SlotListResponse, ConfirmSlotRequest
@@ -9,7 +11,7 @@ from app.schemas.handoff import HandoffResponse, HandoffListResponse
 
 __all__ = [
     "SignupRequest", "LoginRequest", "AuthResponse", "UserResponse",
-    "ChatSendRequest", "ChatSendResponse", "ChatTurnResponse", "ChatHistoryResponse",
+    "ChatSendRequest", "ChatSendResponse", "ChatTurnResponse", "ChatHistoryResponse", "ChatIntakeStatusResponse",
     "IntakeResponse", "IntakeUpdate",
     "GroupResponse", "GroupListResponse", "GroupMemberResponse",
     "SlotResponse", "SlotListResponse", "ConfirmSlotRequest",
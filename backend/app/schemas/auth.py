@@ -32,5 +32,5 @@ class UserResponse(BaseModel):
 
 class AuthResponse(BaseModel):
     user_id: UUID
-    session_id: UUID
+    session_id: UUID | str  # AuthSession id, or a signed token with AUTH_STATELESS_TOKENS
     user: UserResponse | None = None
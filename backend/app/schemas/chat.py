@@ -16,6 +16,17 @@ class ChatSendResponse(BaseModel):
     group_name: str | None = None
     group_focus: str | None = None
     match_reason: str | None = None
+    intake_pending: bool = False  # background extraction running; poll /api/chat/intake-status
+
+
+class ChatIntakeStatusResponse(BaseModel):
+    intake_pending: bool = False
+    intake_complete: bool = False
+    group_id: UUID | None = None
+    group_name: str | None = None
+    group_focus: str | None = None
+    match_reason: str | None = None
+    message: str | None = None
 
 
 class ChatTurnResponse(BaseModel):
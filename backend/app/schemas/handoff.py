@@ -8,6 +8,7 @@ class HandoffResponse(BaseModel):
     group_id: UUID
     content: dict
     created_at: datetime
+    version: str | None = None
 
 
 class HandoffGroupSummary(BaseModel):
@@ -19,3 +20,6 @@ class HandoffGroupSummary(BaseModel):
 
 class HandoffListResponse(BaseModel):
     groups: list[HandoffGroupSummary]
+    total: int = 0  # groups matching the filter, across all pages
+    limit: int | None = None
+    offset: int = 0
@@ -7,10 +7,15 @@ from pydantic import BaseModel
 class SlotResponse(BaseModel):
     id: UUID
     slot_at: datetime
+    recurrence: str | None = None  # "weekly": slot_at is the first session of a weekly series
+    available_members: int | None = None
 
 
 class SlotListResponse(BaseModel):
     slots: list[SlotResponse]
+    member_count: int | None = None
+    timezone: str | None = None
+    stale: bool = False  # proposed before the latest membership/availability change; POST /slots/refresh
 
 
 class ConfirmSlotRequest(BaseModel):
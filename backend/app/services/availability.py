@@ -0,0 +1,265 @@
+"""
+Free-text availability ("weekday evenings", "Tue/Thu after 6", "weekends"), read two ways:
+- coarse weekly buckets (day x part of day, e.g. "tue_evening"), which the batch group assignment uses to
+  favour groups whose members can meet at the same times;
+- weekly intervals (minutes from Monday 00:00 in the group's local time), which slot proposal intersects
+  across a group's members to find the session times most of them can attend.
+Both come from one parse (days, plus clock windows within a day), so they always agree.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+
+DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+PARTS = ("morning", "afternoon", "evening")
+WEEKDAYS = DAYS[:5]
+WEEKEND = DAYS[5:]
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+# Local clock windows, in minutes after midnight, for parts of the day and for "any time" on a day
+PART_WINDOWS = {"morning": (8 * 60, 12 * 60), "afternoon": (12 * 60, 17 * 60), "evening": (17 * 60, 22 * 60)}
+DAY_WINDOW = (8 * 60, 22 * 60)
+# Which bucket a clock window falls in: the whole day is split at noon and 17:00
+BUCKET_WINDOWS = {"morning": (0, 12 * 60), "afternoon": (12 * 60, 17 * 60), "evening": (17 * 60, MINUTES_PER_DAY)}
+
+_DAY_PATTERNS = [
+    (re.compile(r"\bweek\s?days?\b|\bweek nights?\b|\bmon(day)?s?\s*(-|to|through)\s*fri(day)?s?\b"), WEEKDAYS),
+    (re.compile(r"\bweek\s?ends?\b|\bsat(urday)?s?\s*(and|&|/|-)\s*sun(day)?s?\b"), WEEKEND),
+    (re.compile(r"\bmon(day)?s?\b"), ("mon",)),
+    (re.compile(r"\btue(s|sday)?s?\b"), ("tue",)),
+    (re.compile(r"\bwed(nesday)?s?\b"), ("wed",)),
+    (re.compile(r"\bthu(r|rs|rsday)?s?\b"), ("thu",)),
+    (re.compile(r"\bfri(day)?s?\b"), ("fri",)),
+    (re.compile(r"\bsat(urday)?s?\b"), ("sat",)),
+    (re.compile(r"\bsun(day)?s?\b"), ("sun",)),
+]
+_PART_PATTERNS = [
+    (re.compile(r"\bmornings?\b|\bbefore (work|noon)\b|\bearly\b"), ("morning",)),
+    (re.compile(r"\bafternoons?\b|\blunch(time)?\b|\bmidday\b"), ("afternoon",)),
+    (re.compile(r"\bevenings?\b|\bnights?\b|\bafter (work|\d)|\blate\b"), ("evening",)),
+]
+_ANYTIME = re.compile(r"\bany\s?time\b|\bflexible\b|\bwhenever\b|\bany day\b")
+# A negation applies from where it appears to the end of its clause: "evenings, not Fridays",
+# "can't do weekends", "weekdays except Wed"
+_CLAUSE = re.compile(r"[,;.!?\n]+")
+_NEGATION = re.compile(
+    r"\b(?:not|no|never|except|excluding|other than|can't|cant|cannot|won't|don't|busy|unavailable)\b"
+)
+
+_TIME = r"(\d{1,2})(?::(\d\d))?\s*(am|pm)?"
+_RANGE = re.compile(rf"\b{_TIME}\s*(?:-|–|to|until|till)\s*{_TIME}\b")
+_AFTER = re.compile(rf"\b(?:after|from|since)\s+{_TIME}\b")
+_BEFORE = re.compile(rf"\b(?:before|until|till|by)\s+{_TIME}\b")
+
+
+def _clock(hour: str, minute: str | None, meridiem: str | None) -> int | None:
+    """Minutes after midnight; a bare 1..7 means pm ("after 6" is evening). None if not a time of day."""
+    h, m = int(hour), int(minute or 0)
+    if h > 24 or m > 59 or (meridiem and not 1 <= h <= 12):
+        return None
+    if meridiem:
+        h = h % 12 + (12 if meridiem == "pm" else 0)
+    elif 1 <= h <= 7:
+        h += 12
+    return min(h * 60 + m, MINUTES_PER_DAY)
+
+
+def _clock_windows(lowered: str) -> list[tuple[int, int]]:
+    windows = []
+    for match in _RANGE.finditer(lowered):
+        h1, m1, ap1, h2, m2, ap2 = match.groups()
+        end = _clock(h2, m2, ap2)
+        start = _clock(h1, m1, ap1 or ap2)
+        if start is not None and end is not None and start >= end and not ap1:
+            start -= 12 * 60  # "10-2pm": the start is morning
+        if start is not None and end is not None and 0 <= start < end:
+            windows.append((start, end))
+    lowered = _RANGE.sub(" ", lowered)
+    for match in _AFTER.finditer(lowered):
+        start = _clock(*match.groups())
+        if start is not None and start < DAY_WINDOW[1]:
+            windows.append((start, DAY_WINDOW[1]))
+    for match in _BEFORE.finditer(lowered):
+        end = _clock(*match.groups())
+        if end is not None and end > DAY_WINDOW[0]:
+            windows.append((DAY_WINDOW[0], end))
+    return windows
+
+
+def _merge(intervals: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _subtract(windows: list[tuple[int, int]], cut: tuple[int, int]) -> list[tuple[int, int]]:
+    kept = []
+    for start, end in windows:
+        if start < cut[0]:
+            kept.append((start, min(end, cut[0])))
+        if end > cut[1]:
+            kept.append((max(start, cut[1]), end))
+    return kept
+
+
+def _named_days(text: str) -> set[int]:
+    return {DAYS.index(d) for pattern, covered in _DAY_PATTERNS if pattern.search(text) for d in covered}
+
+
+def _named_parts(text: str) -> list[str]:
+    return [p for pattern, covered in _PART_PATTERNS if pattern.search(text) for p in covered]
+
+
+@lru_cache(maxsize=4096)
+def _parse(text: str) -> tuple[tuple[int, ...], tuple[tuple[int, int], ...]]:
+    """
+    (days, daily windows) the text says the person can make: day indexes (0 = Monday) and sorted local
+    [start, end) minutes after midnight. Clock times ("after 6pm", "6-8pm") take precedence over parts of
+    the day, and a day with neither means the whole DAY_WINDOW. Days and parts of the day after a negation
+    are taken out ("evenings, not Fridays"; "busy on weekends" is weekdays). Clock times after a negation
+    are ignored. Both empty if the text says nothing usable, or rules everything out (unknown, not "never").
+    """
+    wanted, unwanted = [], []
+    for clause in _CLAUSE.split(text.lower().replace("’", "'")):
+        negation = _NEGATION.search(clause)
+        if negation:
+            wanted.append(clause[:negation.start()])
+            unwanted.append(clause[negation.end():])
+        else:
+            wanted.append(clause)
+    wanted_text, unwanted_text = " , ".join(wanted), " , ".join(unwanted)
+    days = _named_days(wanted_text)
+    windows = _clock_windows(wanted_text) or [PART_WINDOWS[p] for p in _named_parts(wanted_text)]
+    excluded_days = _named_days(unwanted_text)
+    excluded_parts = _named_parts(unwanted_text)
+    if not (days or windows or excluded_days or excluded_parts or _ANYTIME.search(wanted_text)):
+        return (), ()
+    days = (days or set(range(len(DAYS)))) - excluded_days
+    windows = windows or [DAY_WINDOW]
+    for part in excluded_parts:
+        windows = _subtract(windows, PART_WINDOWS[part])
+    windows = _merge(windows)
+    if not days or not windows:
+        return (), ()
+    return tuple(sorted(days)), tuple(windows)
+
+
+def availability_buckets(text: str | None) -> frozenset[str]:
+    """Weekly buckets the text's windows touch; empty if it says nothing usable (unknown, not "never")."""
+    if not text:
+        return frozenset()
+    days, windows = _parse(text)
+    parts = [
+        part for part, (low, high) in BUCKET_WINDOWS.items()
+        if any(start < high and end > low for start, end in windows)
+    ]
+    return frozenset(f"{DAYS[d]}_{p}" for d in days for p in parts)
+
+
+def availability_overlap(a: frozenset[str], b: frozenset[str]) -> float:
+    """Jaccard overlap of two bucket sets, 0..1; 0.5 when either side is unknown."""
+    if not a or not b:
+        return 0.5
+    return len(a & b) / len(a | b)
+
+
+@lru_cache(maxsize=4096)
+def weekly_intervals(text: str | None) -> tuple[tuple[int, int], ...]:
+    """
+    Sorted, non-overlapping [start, end) minutes of the week (Monday 00:00 = 0) the text covers, in local
+    time. Empty if the text says nothing usable (unknown, not "never").
+    """
+    if not text:
+        return ()
+    days, windows = _parse(text)
+    return tuple(
+        (day * MINUTES_PER_DAY + start, day * MINUTES_PER_DAY + end) for day in days for start, end in windows
+    )
+
+
+@dataclass(frozen=True)
+class WeeklySlot:
+    day: int  # 0 = Monday
+    minute: int  # local start, minutes after midnight
+    # Members who can attend the whole session, or its longest part anyone can if no one can attend all of it
+    # (members with unknown availability included)
+    available: int
+
+    @property
+    def label(self) -> str:
+        return f"{DAYS[self.day].title()} {self.minute // 60:02d}:{self.minute % 60:02d}"
+
+
+def _session_starts(known: Counter[str | None], duration: int, step: int) -> list[tuple[int, int]]:
+    """(members, minute of week) for each stretch of the week where some members can start a session."""
+    deltas: Counter[int] = Counter()
+    for text, members in known.items():
+        for start, end in weekly_intervals(text):
+            if end - start >= duration:
+                deltas[start] += members
+                deltas[end - duration + 1] -= members  # last start that fits is end - duration
+    endpoints = sorted(deltas)
+    candidates: list[tuple[int, int]] = []
+    covering = 0
+    for i, position in enumerate(endpoints):
+        covering += deltas[position]
+        segment_end = endpoints[i + 1] if i + 1 < len(endpoints) else position
+        start = -(-position // step) * step
+        if covering > 0 and start < segment_end:
+            candidates.append((covering, start))
+    return candidates
+
+
+def propose_weekly_slots(
+    availabilities: list[str | None],
+    count: int,
+    duration: int,
+    step: int = 30,
+    fallback_day: int = 0,
+) -> list[WeeklySlot]:
+    """
+    Up to count weekly session start times (on a step-minute grid) that the most members can attend for
+    duration minutes, on different days where possible. Each member's intervals become the interval of
+    start times that fit a whole session. Their endpoints are summed per minute of the week (an interval
+    index: at most one entry per distinct endpoint, however many members share it), and one sweep over
+    the sorted endpoints gives, for every stretch of the week, how many members can start a session
+    there. O(members + distinct endpoints log distinct endpoints). Members with unknown availability count
+    as available everywhere. If no one's window is long enough for a session ("Mondays 7pm-8pm" for 90
+    minutes), the same sweep runs for the longest window anyone gave, so sessions start inside the windows
+    members named. Without any usable availability: 18:00 on count consecutive days from fallback_day.
+    """
+    known: Counter[str | None] = Counter(text for text in availabilities if weekly_intervals(text))
+    unknown = len(availabilities) - sum(known.values())
+    if not known:
+        return [
+            WeeklySlot((fallback_day + i) % len(DAYS), PART_WINDOWS["evening"][0] + 60, unknown)
+            for i in range(min(count, len(DAYS)))
+        ]
+    candidates = _session_starts(known, duration, step)
+    if not candidates:
+        longest = max(end - start for text in known for start, end in weekly_intervals(text))
+        candidates = _session_starts(known, longest, 1)
+    candidates.sort(key=lambda c: (-c[0], c[1]))
+    chosen: list[tuple[int, int]] = []
+    days_used: set[int] = set()
+    for distinct_days in (True, False):
+        for members, start in candidates:
+            if len(chosen) >= count:
+                break
+            day = start // MINUTES_PER_DAY
+            if distinct_days and day in days_used:
+                continue
+            if any(abs(start - other) < duration for _, other in chosen):
+                continue
+            chosen.append((members, start))
+            days_used.add(day)
+    return [
+        WeeklySlot(start // MINUTES_PER_DAY, start % MINUTES_PER_DAY, members + unknown)
+        for members, start in sorted(chosen, key=lambda c: c[1])
+    ]
@@ -0,0 +1,158 @@
+"""
+Local embedding matcher: intake text and group descriptions become unit vectors, and one matrix-vector product
+scores every group (cosine similarity). Needs the optional `numpy` package; MATCHING_EMBEDDING_MODEL picks the
+embedder: "hashing" (built in, no download: hashed words and character n-grams) or a sentence-transformers
+model name (optional `sentence-transformers` package, e.g. "all-MiniLM-L6-v2"). When numpy or the model is
+unavailable, available() is False and matching keeps using the keyword rules.
+"""
+import asyncio
+import logging
+import math
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Any
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+EMBEDDER_HASHING = "hashing"
+HASHING_DIM = 1024
+CHAR_NGRAM = 4
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+class HashingEmbedder:
+    """Feature-hashed bag of words plus in-word character n-grams (so "anxious" and "anxiety" overlap)."""
+
+    blocking = False
+
+    def __init__(self, dim: int = HASHING_DIM) -> None:
+        self.dim = dim
+
+    def _features(self, text: str) -> dict[int, float]:
+        counts: dict[int, float] = {}
+        for word in _WORD_RE.findall(text.lower()):
+            grams = [word]
+            padded = f"<{word}>"
+            if len(padded) > CHAR_NGRAM:
+                grams.extend(padded[i:i + CHAR_NGRAM] for i in range(len(padded) - CHAR_NGRAM + 1))
+            for gram in grams:
+                h = zlib.crc32(gram.encode("utf-8"))
+                index = h % self.dim
+                counts[index] = counts.get(index, 0.0) + (1.0 if h & 0x80000000 else -1.0)
+        return counts
+
+    def embed(self, texts: list[str]) -> Any:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for index, value in self._features(text).items():
+                matrix[row, index] = math.copysign(1.0 + math.log(abs(value)), value) if value else 0.0
+        return _normalize(matrix)
+
+
+class SentenceTransformerEmbedder:
+    """Pretrained sentence embedding model, run locally on CPU."""
+
+    blocking = True
+
+    def __init__(self, model_name: str) -> None:
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+
+    def embed(self, texts: list[str]) -> Any:
+        return _normalize(np.asarray(self.model.encode(texts, convert_to_numpy=True), dtype=np.float32))
+
+
+def _normalize(matrix: Any) -> Any:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+@dataclass(frozen=True)
+class EmbeddingMatch:
+    focus: str
+    name: str
+    similarity: float
+    runner_up: tuple[str, float] | None  # (name, similarity) of the next best group
+
+
+class EmbeddingMatcher:
+    """Group index (one unit vector per group), rebuilt when the set of groups or their descriptions change."""
+
+    def __init__(self, model: str) -> None:
+        self.model = model
+        self._embedder: Any = None
+        self._unavailable = not model
+        # (groups key, unit-vector matrix, [(focus, name)]), swapped as a whole so readers never mix two indexes
+        self._index: tuple[tuple, Any, list[tuple[str, str]]] | None = None
+
+    def _get_embedder(self) -> Any:
+        if self._embedder is None and not self._unavailable and np is None:
+            logger.warning(
+                "Embedding matcher unavailable (model %s): numpy is not installed (pip install numpy); "
+                "using keyword rules",
+                self.model,
+            )
+            self._unavailable = True
+        if self._embedder is None and not self._unavailable:
+            try:
+                if self.model == EMBEDDER_HASHING:
+                    self._embedder = HashingEmbedder()
+                else:
+                    self._embedder = SentenceTransformerEmbedder(self.model)
+            except Exception as e:
+                logger.warning("Embedding matcher unavailable (model %s): %s; using keyword rules", self.model, e)
+                self._unavailable = True
+        return self._embedder
+
+    def available(self) -> bool:
+        return self._get_embedder() is not None
+
+    def check_dependencies(self) -> None:
+        """At startup: warn once if an embedder is configured but numpy is missing (model weights load lazily)."""
+        if self.model and np is None:
+            self._get_embedder()
+
+    def _get_index(self, groups: list[tuple[str, str, str]]) -> tuple[tuple, Any, list[tuple[str, str]]]:
+        """groups: (focus, name, description)."""
+        key = tuple(groups)
+        index = self._index
+        if index is None or index[0] != key:
+            matrix = self._get_embedder().embed([f"{name}. {description}" for _, name, description in groups])
+            index = self._index = (key, matrix, [(focus, name) for focus, name, _ in groups])
+            logger.info("Embedding matcher: indexed %s groups", len(groups))
+        return index
+
+    def _match_sync(self, text: str, groups: list[tuple[str, str, str]]) -> EmbeddingMatch:
+        _, matrix, indexed = self._get_index(groups)
+        scores = matrix @ self._get_embedder().embed([text])[0]
+        if len(scores) > 2:
+            top = np.argpartition(-scores, 1)[:2]
+            order = top[np.argsort(-scores[top])]
+        else:
+            order = np.argsort(-scores)
+        best = int(order[0])
+        runner_up = (indexed[int(order[1])][1], float(scores[order[1]])) if len(order) > 1 else None
+        return EmbeddingMatch(indexed[best][0], indexed[best][1], float(scores[best]), runner_up)
+
+    async def match(self, text: str, groups: list[tuple[str, str, str]]) -> EmbeddingMatch | None:
+        """Best group for text by cosine similarity; None if unavailable or there are no groups."""
+        if self._embedder is None and self.model != EMBEDDER_HASHING and not self._unavailable:
+            await asyncio.to_thread(self._get_embedder)  # loading model weights blocks
+        embedder = self._get_embedder()
+        if embedder is None or not groups or not text.strip():
+            return None
+        if embedder.blocking:
+            return await asyncio.to_thread(self._match_sync, text, groups)
+        return self._match_sync(text, groups)
+
+
+embedding_matcher = EmbeddingMatcher(settings.matching_embedding_model)
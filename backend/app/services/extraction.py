@@ -37,6 +37,25 @@ async def extract_from_conversation(turns: list[dict]) -> dict[str, Any]:
     return _empty_extraction()
 
 
+async def extract_incremental_from_conversation(
+    previous: dict[str, Any],
+    new_turns: list[dict],
+    context_turns: list[dict] | None = None,
+) -> dict[str, Any] | None:
+    """
+    Update a previous extraction with only the new turns (LLM only).
+    Returns None on missing API key or failure so the caller keeps its previous state and resends these turns.
+    """
+    try:
+        result = await llm_service.extract_intake_incremental(previous, new_turns, context_turns)
+        if result is not None:
+            return result
+        logger.warning("Incremental LLM extraction returned None; keeping previous extraction state")
+    except Exception as e:
+        logger.exception("Incremental LLM extraction error; keeping previous extraction state: %s", e)
+    return None
+
+
 def is_intake_complete(extracted: dict[str, Any]) -> bool:
     """Return True when all required intake fields are present for matching."""
     if not extracted:
@@ -69,5 +88,13 @@ class ExtractionService:
     async def extract(self, turns: list[dict]) -> dict[str, Any]:
         return await extract_from_conversation(turns)
 
+    async def extract_incremental(
+        self,
+        previous: dict[str, Any],
+        new_turns: list[dict],
+        context_turns: list[dict] | None = None,
+    ) -> dict[str, Any] | None:
+        return await extract_incremental_from_conversation(previous, new_turns, context_turns)
+
 
 extraction_service = ExtractionService()
@@ -0,0 +1,83 @@
+"""
+Keyword focus classifier for group matching without the LLM. Per-focus keyword tables ({focus: {keyword:
+weight}}, from focus_keywords.json or MATCHING_KEYWORDS_FILE) compile into one regex. A single pass over the
+intake text adds up the weights per focus, and the highest score wins. Ties go to the focus listed first in
+the table, and text with no hits gets no focus. Keywords match at word starts, so "anxi" covers "anxious" and
+"anxiety". Terms in the primary concern count PRIMARY_CONCERN_WEIGHT times.
+"""
+import json
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEYWORDS_FILE = Path(__file__).resolve().parent / "focus_keywords.json"
+PRIMARY_CONCERN_WEIGHT = 2.0
+
+
+@dataclass(frozen=True)
+class FocusScore:
+    focus: str
+    score: float
+    terms: tuple[str, ...]  # matched keywords, highest contribution first
+
+
+def load_keyword_tables(path: str | Path | None = None) -> dict[str, dict[str, float]]:
+    """Keyword tables from path (default: the bundled focus_keywords.json), keywords lowercased."""
+    path = Path(path) if path else DEFAULT_KEYWORDS_FILE
+    raw = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(raw, dict):
+        raise ValueError(f"{path}: expected an object of focus -> {{keyword: weight}}")
+    return {
+        str(focus): {str(keyword).lower(): float(weight) for keyword, weight in keywords.items()}
+        for focus, keywords in raw.items()
+    }
+
+
+class FocusClassifier:
+    def __init__(self, tables: dict[str, dict[str, float]]) -> None:
+        self.tables = tables
+        self.foci = list(tables)
+        self._rank = {focus: i for i, focus in enumerate(self.foci)}
+        self._weights: dict[str, list[tuple[str, float]]] = {}
+        for focus, keywords in tables.items():
+            for keyword, weight in keywords.items():
+                self._weights.setdefault(keyword, []).append((focus, weight))
+        # Longest first, so "new parent" wins over "parent" at the same position
+        alternatives = sorted(self._weights, key=len, reverse=True)
+        self._pattern = re.compile(r"\b(?:" + "|".join(map(re.escape, alternatives)) + ")") if alternatives else None
+
+    def scores(self, primary_concern: str, other_text: str) -> list[FocusScore]:
+        """All foci with at least one hit, best first."""
+        if self._pattern is None:
+            return []
+        totals: dict[str, float] = {}
+        terms: dict[str, dict[str, float]] = {}
+        for text, factor in ((primary_concern.lower(), PRIMARY_CONCERN_WEIGHT), (other_text.lower(), 1.0)):
+            for match in self._pattern.finditer(text):
+                keyword = match.group(0)
+                for focus, weight in self._weights[keyword]:
+                    totals[focus] = totals.get(focus, 0.0) + weight * factor
+                    focus_terms = terms.setdefault(focus, {})
+                    focus_terms[keyword] = focus_terms.get(keyword, 0.0) + weight * factor
+        ranked = sorted(totals, key=lambda f: (-totals[f], self._rank[f]))
+        return [
+            FocusScore(f, totals[f], tuple(sorted(terms[f], key=lambda k: -terms[f][k]))) for f in ranked
+        ]
+
+    def classify(self, primary_concern: str, other_text: str) -> FocusScore | None:
+        ranked = self.scores(primary_concern, other_text)
+        return ranked[0] if ranked else None
+
+
+def _load_default() -> FocusClassifier:
+    tables = load_keyword_tables(settings.matching_keywords_file or None)
+    logger.debug("Focus classifier: %s foci, %s keywords", len(tables), sum(len(k) for k in tables.values()))
+    return FocusClassifier(tables)
+
+
+focus_classifier = _load_default()
@@ -0,0 +1,449 @@
+"""
+Batch group assignment (GROUP_ASSIGNMENT=batch): places a cohort of pending intakes (users with an IntakeResult
+but no active membership) into groups of at most GROUP_CAPACITY, opening sub-groups as needed.
+
+The assignment is decomposed rather than solved as one matrix problem. That would not fit in memory for tens
+of thousands of intakes, and opening sub-groups removes any capacity pressure between foci. The result is not
+a global minimum: focus comes first, and each step is optimised on its own.
+1. Focus: each intake goes to its best focus (local matcher, as in match_locally).
+2. Free seats in that focus's existing groups: exact minimum-cost transport of intake classes to seats, cost
+   per (intake, group) = intensity term (how far the group's mean emotional_intensity would move from the
+   cohort mean) + availability term (1 - overlap of the intake's weekly buckets with what most members can
+   do), both against the group as it is before the run.
+3. The rest: intakes with the same availability form new sub-groups of even size, at least GROUP_MIN_SIZE.
+   Members are dealt out in snake order of intensity, so every group gets a similar mix. Leftovers that
+   are too few for a group fill spare seats or wait for the next run.
+"""
+import asyncio
+import heapq
+import logging
+import math
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+from uuid import UUID, uuid4
+
+from sqlalchemy import and_, exists, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.group import Group, GroupMember, MEMBERSHIP_STATUS_ACTIVE
+from app.models.intake import IntakeResult
+from app.services.availability import availability_buckets, availability_overlap
+from app.services.group_registry import GroupInfo, group_registry
+from app.services.matching import DEFAULT_GROUPS, focus_groups, match_locally, subgroup_name
+
+logger = logging.getLogger(__name__)
+
+INTENSITY_WEIGHT = 1.0
+AVAILABILITY_WEIGHT = 1.0
+INTENSITY_RANGE = 4.0  # emotional_intensity is 1..5 (see is_intake_complete)
+ADVISORY_LOCK_KEY = 5_120_230  # one batch run at a time across workers and the CLI
+INSERT_CHUNK = 5000  # rows per multi-row INSERT (asyncpg allows 32767 parameters)
+
+
+@dataclass
+class PendingIntake:
+    intake_id: UUID
+    user_id: UUID
+    focus: str
+    reason: str
+    intensity: int | None
+    availability: frozenset[str]
+
+
+@dataclass
+class GroupSlot:
+    """An existing group (group_id set) or a sub-group the plan opens; tracks its members' profile."""
+    focus: str
+    name: str
+    group_id: UUID | None = None
+    size: int = 0
+    intensity_sum: float = 0.0
+    intensity_count: int = 0
+    availability: Counter = field(default_factory=Counter)
+    availability_known: int = 0
+
+    def add(self, intensity: int | None, availability: frozenset[str]) -> None:
+        self.size += 1
+        if intensity is not None:
+            self.intensity_sum += intensity
+            self.intensity_count += 1
+        if availability:
+            self.availability.update(availability)
+            self.availability_known += 1
+
+    def profile(self) -> frozenset[str]:
+        """Buckets at least half of the members with known availability share."""
+        if not self.availability_known:
+            return frozenset()
+        return frozenset(b for b, n in self.availability.items() if 2 * n >= self.availability_known)
+
+
+@dataclass
+class Placement:
+    intake: PendingIntake
+    slot: GroupSlot
+    cost: float
+
+    @property
+    def match_reason(self) -> str:
+        return f"{self.intake.reason} Placed in {self.slot.name} by batch assignment."
+
+
+@dataclass
+class AssignmentPlan:
+    placements: list[Placement] = field(default_factory=list)
+    new_groups: list[GroupSlot] = field(default_factory=list)
+    deferred: list[PendingIntake] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    def summary(self) -> dict[str, Any]:
+        total = sum(p.cost for p in self.placements)
+        return {
+            "placed": len(self.placements),
+            "new_groups": len(self.new_groups),
+            "deferred": len(self.deferred),
+            "total_cost": round(total, 3),
+            "mean_cost": round(total / len(self.placements), 4) if self.placements else None,
+            "elapsed_ms": round(self.elapsed_ms, 1),
+        }
+
+
+def placement_cost(intake: PendingIntake, slot: GroupSlot, target_intensity: float | None) -> float:
+    intensity_cost = 0.0
+    if intake.intensity is not None and target_intensity is not None:
+        mean = (slot.intensity_sum + intake.intensity) / (slot.intensity_count + 1)
+        intensity_cost = abs(mean - target_intensity) / INTENSITY_RANGE
+    availability_cost = 1.0 - availability_overlap(intake.availability, slot.profile())
+    return INTENSITY_WEIGHT * intensity_cost + AVAILABILITY_WEIGHT * availability_cost
+
+
+def _min_cost_transport(supply: list[int], seats: list[int], cost: list[list[float]]) -> dict[tuple[int, int], int]:
+    """
+    Exact minimum-cost flow of min(sum(supply), sum(seats)) units from rows (supply[r] units each) to columns
+    (at most seats[c] each), where a unit from r to c costs cost[r][c] >= 0. Successive shortest paths with
+    Dijkstra on reduced costs; each augmentation sends as many units as the path allows. Returns units per
+    (row, column).
+    """
+    rows, cols = len(supply), len(seats)
+    source, sink = rows + cols, rows + cols + 1
+    graph: list[list[list]] = [[] for _ in range(rows + cols + 2)]  # edges: [to, residual, cost, reverse index]
+
+    def edge(u: int, v: int, units: int, unit_cost: float) -> None:
+        graph[u].append([v, units, unit_cost, len(graph[v])])
+        graph[v].append([u, 0, -unit_cost, len(graph[u]) - 1])
+
+    for r, units in enumerate(supply):
+        edge(source, r, units, 0.0)
+        for c, free in enumerate(seats):
+            edge(r, rows + c, min(units, free), cost[r][c])
+    for c, free in enumerate(seats):
+        edge(rows + c, sink, free, 0.0)
+
+    potential = [0.0] * len(graph)
+    while True:
+        dist = [math.inf] * len(graph)
+        dist[source] = 0.0
+        prev: list[tuple[int, int] | None] = [None] * len(graph)
+        heap = [(0.0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for i, (v, residual, unit_cost, _) in enumerate(graph[u]):
+                reduced = d + unit_cost + potential[u] - potential[v]
+                if residual > 0 and reduced < dist[v] - 1e-12:
+                    dist[v] = reduced
+                    prev[v] = (u, i)
+                    heapq.heappush(heap, (reduced, v))
+        if dist[sink] == math.inf:
+            break
+        for v, d in enumerate(dist):
+            if d < math.inf:
+                potential[v] += d
+        path = []
+        v = sink
+        while v != source:
+            u, i = prev[v]
+            path.append(graph[u][i])
+            v = u
+        units = min(e[1] for e in path)
+        for e in path:
+            e[1] -= units
+            graph[e[0]][e[3]][1] += units
+    return {
+        (r, v - rows): graph[v][reverse][1]
+        for r in range(rows)
+        for v, _, _, reverse in graph[r]
+        if rows <= v < rows + cols and graph[v][reverse][1]
+    }
+
+
+def _fill_open_seats(
+    pool: list[PendingIntake],
+    slots: list[GroupSlot],
+    capacity: int,
+    target: float | None,
+    placements: list[Placement],
+) -> list[PendingIntake]:
+    """
+    Fill free seats at minimum total cost, as many as the pool allows. Each cost is taken against the group as
+    it is before this fill (its mean intensity and availability profile do not move while seats are being
+    filled), so this is a transportation problem from intake classes (equal intensity and availability) to
+    groups, solved exactly by _min_cost_transport.
+    """
+    open_slots = [s for s in slots if s.size < capacity]
+    if not pool or not open_slots:
+        return pool
+    by_key: dict[tuple, list[PendingIntake]] = defaultdict(list)
+    for intake in pool:
+        by_key[(intake.intensity, intake.availability)].append(intake)
+    classes = list(by_key.values())
+    cost = [[placement_cost(members[0], slot, target) for slot in open_slots] for members in classes]
+    flows = _min_cost_transport([len(m) for m in classes], [capacity - s.size for s in open_slots], cost)
+    for (class_index, slot_index), units in sorted(flows.items()):
+        slot = open_slots[slot_index]
+        for _ in range(units):
+            intake = classes[class_index].pop()
+            placements.append(Placement(intake, slot, cost[class_index][slot_index]))
+            slot.add(intake.intensity, intake.availability)
+    return [intake for members in classes for intake in members]
+
+
+def _open_subgroups(
+    members: list[PendingIntake],
+    focus: str,
+    base_name: str,
+    numbers: Iterator[int],
+    capacity: int,
+    target: float | None,
+    new_groups: list[GroupSlot],
+    placements: list[Placement],
+) -> None:
+    """Split members into ceil(n / capacity) even groups, dealt in snake order of intensity."""
+    count = math.ceil(len(members) / capacity)
+    slots = [GroupSlot(focus=focus, name=subgroup_name(base_name, next(numbers))) for _ in range(count)]
+    fallback = target if target is not None else 0.0
+    ordered = sorted(members, key=lambda m: m.intensity if m.intensity is not None else fallback)
+    for i, intake in enumerate(ordered):
+        lap, offset = divmod(i, count)
+        slot = slots[offset if lap % 2 == 0 else count - 1 - offset]
+        placements.append(Placement(intake, slot, placement_cost(intake, slot, target)))
+        slot.add(intake.intensity, intake.availability)
+    new_groups.extend(slots)
+
+
+def plan_assignments(
+    intakes: list[PendingIntake],
+    groups: list[GroupSlot],
+    capacity: int,
+    min_size: int,
+    base_names: dict[str, str] | None = None,
+) -> AssignmentPlan:
+    """Pure planning step (no database): see the module docstring. groups are the existing groups, oldest first."""
+    started = time.perf_counter()
+    plan = AssignmentPlan()
+    capacity = max(1, capacity)
+    min_size = max(1, min(min_size, capacity))
+    slots_by_focus: dict[str, list[GroupSlot]] = defaultdict(list)
+    for slot in groups:
+        slots_by_focus[slot.focus].append(slot)
+    pools: dict[str, list[PendingIntake]] = defaultdict(list)
+    for intake in intakes:
+        pools[intake.focus].append(intake)
+
+    for focus, pool in pools.items():
+        slots = slots_by_focus[focus]
+        known = [i.intensity for i in pool if i.intensity is not None]
+        known_sum = sum(known) + sum(s.intensity_sum for s in slots)
+        known_count = len(known) + sum(s.intensity_count for s in slots)
+        target = known_sum / known_count if known_count else None
+        pool = _fill_open_seats(pool, slots, capacity, target, plan.placements)
+
+        base_name = slots[0].name if slots else (base_names or {}).get(focus, focus.replace("_", " ").title())
+        numbers = iter(range(len(slots) + 1, len(slots) + len(pool) + 2))
+        by_availability: dict[frozenset[str], list[PendingIntake]] = defaultdict(list)
+        for intake in pool:
+            by_availability[intake.availability].append(intake)
+        leftover: list[PendingIntake] = []
+        for availability, members in sorted(by_availability.items(), key=lambda kv: -len(kv[1])):
+            if availability and len(members) >= min_size:
+                _open_subgroups(members, focus, base_name, numbers, capacity, target, plan.new_groups, plan.placements)
+            else:
+                leftover.extend(members)
+        focus_new = [s for s in plan.new_groups if s.focus == focus]
+        leftover = _fill_open_seats(leftover, focus_new, capacity, target, plan.placements)
+        if len(leftover) >= min_size:
+            _open_subgroups(leftover, focus, base_name, numbers, capacity, target, plan.new_groups, plan.placements)
+        else:
+            plan.deferred.extend(leftover)
+    plan.elapsed_ms = (time.perf_counter() - started) * 1000
+    return plan
+
+
+async def load_pending_intakes(db: AsyncSession, limit: int | None = None) -> list[IntakeResult]:
+    """
+    Intakes waiting for a group: each user's latest intake, if it has no group yet (group_id IS NULL) and the
+    user has no active membership. Users whose membership completed or was withdrawn keep their intake's
+    group_id, so they are not placed again.
+    """
+    newer = aliased(IntakeResult)
+    stmt = (
+        select(IntakeResult)
+        .where(
+            IntakeResult.group_id.is_(None),
+            ~exists().where(newer.user_id == IntakeResult.user_id, newer.updated_at > IntakeResult.updated_at),
+            ~exists().where(
+                GroupMember.user_id == IntakeResult.user_id,
+                GroupMember.status == MEMBERSHIP_STATUS_ACTIVE,
+            )
+        )
+        .distinct(IntakeResult.user_id)
+        .order_by(IntakeResult.user_id, IntakeResult.updated_at.desc())
+    )
+    if limit:
+        stmt = stmt.limit(limit)
+    return list((await db.execute(stmt)).scalars().all())
+
+
+async def load_group_slots(db: AsyncSession, groups: tuple[GroupInfo, ...]) -> list[GroupSlot]:
+    """The groups (oldest first) with their active members' intensity/availability profile."""
+    slots = {g.id: GroupSlot(focus=g.focus, name=g.name, group_id=g.id) for g in groups}
+    result = await db.execute(
+        select(GroupMember.group_id, IntakeResult.emotional_intensity, IntakeResult.availability)
+        .outerjoin(
+            IntakeResult,
+            and_(IntakeResult.user_id == GroupMember.user_id, IntakeResult.group_id == GroupMember.group_id),
+        )
+        .where(GroupMember.status == MEMBERSHIP_STATUS_ACTIVE)
+    )
+    for group_id, intensity, availability in result.all():
+        if group_id in slots:
+            slots[group_id].add(intensity, availability_buckets(availability))
+    return list(slots.values())
+
+
+async def build_plan(
+    rows: list[IntakeResult],
+    slots: list[GroupSlot],
+    candidates: list[GroupInfo],
+    capacity: int,
+    min_size: int,
+) -> AssignmentPlan:
+    """Match each pending intake to a focus among candidates (one group per focus) locally, then plan_assignments."""
+    intakes = []
+    for row in rows:
+        intake = {
+            "primary_concern": row.primary_concern,
+            "contextual_background": row.contextual_background,
+            "emotional_intensity": row.emotional_intensity,
+            "life_impact_areas": row.life_impact_areas,
+            "support_goals": row.support_goals,
+        }
+        focus, reason, _ = await match_locally(intake, candidates)
+        intakes.append(PendingIntake(
+            intake_id=row.id,
+            user_id=row.user_id,
+            focus=focus,
+            reason=reason,
+            intensity=row.emotional_intensity,
+            availability=availability_buckets(row.availability),
+        ))
+    return plan_assignments(intakes, slots, capacity, min_size, {focus: name for name, focus in DEFAULT_GROUPS})
+
+
+async def apply_plan(db: AsyncSession, plan: AssignmentPlan) -> None:
+    """Create the new sub-groups, then add all memberships and link the intakes, in multi-row statements."""
+    new_groups = [Group(name=slot.name, focus=slot.focus) for slot in plan.new_groups]
+    db.add_all(new_groups)
+    await db.flush()
+    for slot, group in zip(plan.new_groups, new_groups):
+        slot.group_id = group.id
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": uuid4(),
+            "group_id": p.slot.group_id,
+            "user_id": p.intake.user_id,
+            "status": MEMBERSHIP_STATUS_ACTIVE,
+            "match_reason": p.match_reason,
+            "joined_at": now,
+        }
+        for p in plan.placements
+    ]
+    for start in range(0, len(rows), INSERT_CHUNK):
+        await db.execute(insert(GroupMember).values(rows[start:start + INSERT_CHUNK]))
+    if plan.placements:
+        await db.execute(
+            update(IntakeResult),
+            [{"id": p.intake.intake_id, "group_id": p.slot.group_id} for p in plan.placements],
+        )
+
+
+async def run_batch_assignment(
+    db: AsyncSession,
+    capacity: int | None = None,
+    min_size: int | None = None,
+    limit: int | None = None,
+    dry_run: bool = False,
+) -> AssignmentPlan | None:
+    """Plan and (unless dry_run) apply in db's transaction; the caller commits. None if another run holds the lock."""
+    locked = (await db.execute(select(func.pg_try_advisory_xact_lock(ADVISORY_LOCK_KEY)))).scalar()
+    if not locked:
+        logger.info("Batch assignment already running elsewhere; skipped")
+        return None
+    await focus_groups(db)
+    rows = await load_pending_intakes(db, limit)
+    if not rows:
+        return AssignmentPlan()
+    snapshot = await group_registry.refresh(db)  # under the lock: include sub-groups other workers just opened
+    slots = await load_group_slots(db, snapshot.groups)
+    plan = await build_plan(
+        rows,
+        slots,
+        snapshot.first_per_focus(),
+        capacity or settings.group_capacity,
+        min_size or settings.group_min_size,
+    )
+    if not dry_run:
+        await apply_plan(db, plan)
+    logger.info("Batch assignment %s: %s", "planned" if dry_run else "applied", plan.summary())
+    return plan
+
+
+class BatchAssignmentJob:
+    """In-process schedule for run_batch_assignment (GROUP_ASSIGNMENT=batch); the advisory lock keeps runs single."""
+
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if settings.group_assignment != "batch" or settings.group_assignment_interval_sec <= 0:
+            return
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.group_assignment_interval_sec)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await run_batch_assignment(db)
+                    await db.commit()
+            except Exception:
+                logger.exception("Batch assignment failed")
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+batch_assignment_job = BatchAssignmentJob()
@@ -0,0 +1,152 @@
+"""
+In-process registry of groups (id, name, focus, timezone), so matching, /api/groups, handoff and scheduling
+read groups from memory instead of the groups table. Groups change rarely, and a reload reads the whole table
+in one query. A reload happens after a transaction in this process that added, changed or deleted a Group
+commits or rolls back. It also happens once the snapshot is GROUP_REGISTRY_TTL_SEC old, which is how changes
+made by other workers arrive. A lookup by id that misses checks that one row by primary key, so a group created
+elsewhere is never reported missing, and reloads only if the row exists.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.cache import content_key
+from app.models.group import Group
+
+logger = logging.getLogger(__name__)
+
+_CHANGED_KEY = "group_registry_changed"
+
+
+@dataclass(frozen=True)
+class GroupInfo:
+    """Detached copy of a Group row (same attribute names, safe to share across requests)."""
+    id: UUID
+    name: str
+    focus: str
+    created_at: datetime | None
+    timezone: str | None = None
+
+
+@dataclass(frozen=True)
+class GroupSnapshot:
+    groups: tuple[GroupInfo, ...]  # oldest first
+    by_id: dict[UUID, GroupInfo]
+    by_focus: dict[str, tuple[GroupInfo, ...]]  # oldest first; foci in order of their first group
+    key: str  # content hash of all groups, e.g. for ETags
+    loaded_at: float
+
+    def by_name(self) -> list[GroupInfo]:
+        return sorted(self.groups, key=lambda g: (g.name, str(g.id)))
+
+    def first_per_focus(self) -> list[GroupInfo]:
+        """The oldest group of each focus (matching candidates; sub-groups are chosen by capacity later)."""
+        return [groups[0] for groups in self.by_focus.values()]
+
+
+class GroupRegistry:
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._snapshot: GroupSnapshot | None = None
+        self._stale = True
+        self._lock = asyncio.Lock()
+        self.loads = 0
+
+    def invalidate(self) -> None:
+        self._stale = True
+
+    def _is_fresh(self, snapshot: GroupSnapshot | None) -> bool:
+        return (
+            snapshot is not None
+            and not self._stale
+            and time.monotonic() - snapshot.loaded_at < self.ttl
+        )
+
+    async def refresh(self, db: AsyncSession) -> GroupSnapshot:
+        """Reload from db (sees db's own uncommitted groups) and publish the new snapshot."""
+        self._stale = False  # set before the query, so an invalidation during it is not lost
+        result = await db.execute(
+            select(Group.id, Group.name, Group.focus, Group.created_at, Group.timezone)
+            .order_by(Group.created_at, Group.name)
+        )
+        groups = tuple(GroupInfo(*row) for row in result.all())
+        by_focus: dict[str, list[GroupInfo]] = {}
+        for g in groups:
+            by_focus.setdefault(g.focus, []).append(g)
+        snapshot = GroupSnapshot(
+            groups=groups,
+            by_id={g.id: g for g in groups},
+            by_focus={focus: tuple(members) for focus, members in by_focus.items()},
+            key=content_key([(str(g.id), g.name, g.focus) for g in groups]),
+            loaded_at=time.monotonic(),
+        )
+        self._snapshot = snapshot
+        self.loads += 1
+        logger.debug("Group registry loaded %s groups", len(groups))
+        return snapshot
+
+    async def snapshot(self, db: AsyncSession) -> GroupSnapshot:
+        """Current groups; reloads through db when stale (one reload at a time, others wait for it)."""
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+        async with self._lock:
+            snapshot = self._snapshot
+            if self._is_fresh(snapshot):
+                return snapshot
+            return await self.refresh(db)
+
+    async def get(self, db: AsyncSession, group_id: UUID) -> GroupInfo | None:
+        snapshot = await self.snapshot(db)
+        group = snapshot.by_id.get(group_id)
+        if group is not None:
+            return group
+        # Maybe created by another worker since the last load: one primary-key lookup, not a reload per miss
+        row = (
+            await db.execute(
+                select(Group.id, Group.name, Group.focus, Group.created_at, Group.timezone).where(Group.id == group_id)
+            )
+        ).first()
+        if row is None:
+            return None
+        self.invalidate()
+        return GroupInfo(*row)
+
+    def stats(self) -> dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "groups": len(snapshot.groups) if snapshot else None,
+            "age_sec": round(time.monotonic() - snapshot.loaded_at, 1) if snapshot else None,
+            "loads": self.loads,
+        }
+
+
+group_registry = GroupRegistry(settings.group_registry_ttl_sec)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_group_changes(session: Session, flush_context: Any) -> None:
+    if any(isinstance(obj, Group) for objs in (session.new, session.dirty, session.deleted) for obj in objs):
+        session.info[_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _reload_after_commit(session: Session) -> None:
+    if session.info.pop(_CHANGED_KEY, False):
+        group_registry.invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _reload_after_rollback(session: Session, previous_transaction: Any) -> None:
+    # A refresh in the rolled-back transaction may have published groups that no longer exist
+    if session.info.pop(_CHANGED_KEY, False):
+        group_registry.invalidate()
@@ -0,0 +1,188 @@
+"""Intake completion: extract after a chat turn, save IntakeResult and assign a group (inline or in background)."""
+import asyncio
+import json
+import logging
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.chat import ChatSession
+from app.models.intake import IntakeResult
+from app.models.group import GroupMember, MEMBERSHIP_STATUS_ACTIVE
+from app.services.extraction import extraction_service, is_intake_complete
+from app.services.matching import matching_service
+from app.services.turn_cache import turn_cache
+
+logger = logging.getLogger(__name__)
+
+MIN_USER_TURNS_BEFORE_COMPLETE = 3
+INTAKE_COMPLETE_REPLY = "We have enough information. We're finding a support group for you…"
+GROUP_PLACEMENT_PENDING_MESSAGE = "Your intake is complete. We'll place you in a support group shortly."
+INCREMENTAL_CONTEXT_TURNS = 2
+
+
+async def extract_for_session(session: ChatSession, all_turns: list[dict]) -> dict[str, Any]:
+    """
+    Extract intake for the session's conversation. With incremental extraction on and a saved state, only the
+    turns added since that state (plus a little context) go to the LLM; otherwise the whole conversation does.
+    The state is saved once MIN_USER_TURNS_BEFORE_COMPLETE user turns exist, since earlier values
+    (e.g. emotional_intensity) are not trusted yet; the caller commits it with the turn.
+    """
+    previous = session.extraction_state
+    covered = session.extracted_turn_count or 0
+    if settings.incremental_extraction and previous and 0 < covered <= len(all_turns):
+        context_turns = all_turns[max(0, covered - INCREMENTAL_CONTEXT_TURNS):covered]
+        extracted = await extraction_service.extract_incremental(previous, all_turns[covered:], context_turns)
+        if extracted is None:
+            return dict(previous)
+    else:
+        extracted = await extraction_service.extract(all_turns)
+    save_extraction_state(session, all_turns, extracted)
+    return dict(extracted)
+
+
+def save_extraction_state(session: ChatSession, all_turns: list[dict], extracted: dict[str, Any]) -> None:
+    """Keep extracted as the session's incremental-extraction state once enough user turns exist."""
+    user_turn_count = sum(1 for t in all_turns if t.get("role") == "user")
+    if settings.incremental_extraction and user_turn_count >= MIN_USER_TURNS_BEFORE_COMPLETE and any(extracted.values()):
+        session.extraction_state = extracted
+        session.extracted_turn_count = len(all_turns)
+
+
+async def auto_complete_intake(
+    db: AsyncSession,
+    user_id: UUID,
+    session: ChatSession,
+    extracted: dict[str, Any] | None = None,
+) -> dict | None:
+    """
+    Extract intake from the session's turns; if complete, save IntakeResult, assign a group and mark the
+    session completed. Returns the ChatSendResponse completion fields, or None if intake is not complete yet.
+    With GROUP_ASSIGNMENT=batch the group is left to the batch optimizer (no group fields in the result).
+    extracted, if given (e.g. from the combined chat+extract call), is used instead of calling extraction.
+    """
+    all_turns = await turn_cache.load(db, session.id)
+    user_turn_count = sum(1 for t in all_turns if t.get("role") == "user")
+    if extracted is None:
+        extracted = await extract_for_session(session, all_turns)
+    else:
+        extracted = dict(extracted)
+        save_extraction_state(session, all_turns, extracted)
+    # Don't trust emotional_intensity until enough turns (avoid LLM default e.g. 5 on new chat)
+    if user_turn_count < MIN_USER_TURNS_BEFORE_COMPLETE:
+        extracted["emotional_intensity"] = None
+    # Log extracted schema so far for evaluation (server console)
+    logger.info(
+        "Extracted intake schema so far (user_turns=%s, complete=%s):\n%s",
+        user_turn_count,
+        is_intake_complete(extracted),
+        json.dumps(extracted, indent=2, default=str),
+    )
+    if user_turn_count < MIN_USER_TURNS_BEFORE_COMPLETE or not is_intake_complete(extracted):
+        return None
+    session.completed = True
+    intake = IntakeResult(
+        user_id=user_id,
+        chat_session_id=session.id,
+        primary_concern=extracted.get("primary_concern"),
+        contextual_background=extracted.get("contextual_background"),
+        emotional_intensity=extracted.get("emotional_intensity"),
+        life_impact_areas=extracted.get("life_impact_areas"),
+        support_goals=extracted.get("support_goals"),
+        availability=extracted.get("availability"),
+    )
+    db.add(intake)
+    await db.flush()
+    if settings.group_assignment == "batch":
+        logger.info("Intake auto-completed; group placement queued for batch assignment", extra={"user_id": str(user_id)})
+        return {"intake_complete": True}
+    group = await matching_service.assign(db, user_id, extracted)
+    intake.group_id = group.id
+    await db.flush()
+    member_result = await db.execute(
+        select(GroupMember)
+        .where(
+            GroupMember.group_id == group.id,
+            GroupMember.user_id == user_id,
+            GroupMember.status == MEMBERSHIP_STATUS_ACTIVE,
+        )
+        .limit(1)
+    )
+    member = member_result.scalar_one_or_none()
+    logger.info(
+        "Intake auto-completed and user assigned to group",
+        extra={"user_id": str(user_id), "group_id": str(group.id)},
+    )
+    return {
+        "intake_complete": True,
+        "group_id": group.id,
+        "group_name": group.name,
+        "group_focus": group.focus,
+        "match_reason": member.match_reason if member else None,
+    }
+
+
+class IntakeCompletionService:
+    """
+    Runs auto_complete_intake off the request path, one task per chat session.
+    A turn that arrives while a session's extraction is running marks it for one more pass
+    (coalesced) instead of starting a concurrent extraction. Pending state is per process.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: dict[UUID, asyncio.Task] = {}
+        self._rerun: set[UUID] = set()
+
+    async def complete(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        session: ChatSession,
+        extracted: dict[str, Any] | None = None,
+    ) -> dict | None:
+        return await auto_complete_intake(db, user_id, session, extracted)
+
+    def schedule(self, user_id: UUID, session_id: UUID) -> None:
+        """Start (or queue a rerun of) background completion for the session. Turns must be committed."""
+        if session_id in self._tasks:
+            self._rerun.add(session_id)
+            return
+        self._tasks[session_id] = asyncio.create_task(self._run(user_id, session_id))
+
+    def is_pending(self, session_id: UUID) -> bool:
+        return session_id in self._tasks
+
+    async def _run(self, user_id: UUID, session_id: UUID) -> None:
+        try:
+            while True:
+                self._rerun.discard(session_id)
+                async with AsyncSessionLocal() as db:
+                    session = await db.get(ChatSession, session_id)
+                    if session is None or session.completed:
+                        return
+                    completion = await auto_complete_intake(db, user_id, session)
+                    await db.commit()
+                if completion or session_id not in self._rerun:
+                    return
+        except Exception:
+            logger.exception("Background intake completion failed", extra={"chat_session_id": str(session_id)})
+        finally:
+            # No await between the rerun check and this pop, so a turn scheduled meanwhile is never lost.
+            self._tasks.pop(session_id, None)
+            self._rerun.discard(session_id)
+
+    async def aclose(self) -> None:
+        """Cancel in-flight completions (app shutdown); the next turn re-runs extraction."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._rerun.clear()
+
+
+intake_completion_service = IntakeCompletionService()
@@ -1,16 +1,32 @@
 """LLM service: intake chat + output guard + extraction (no diagnosis/treatment)."""
 import asyncio
+import copy
 import json
 import logging
-from typing import Any, Optional
+import time
+from typing import Any, AsyncIterator, Optional
 
 from app.config import settings
+from app.core.cache import TTLCache, content_key
+from app.services.prompt_budget import (
+    MESSAGE_OVERHEAD_TOKENS,
+    count_message_tokens,
+    count_tokens,
+    fit_turns,
+    truncate_to_tokens,
+)
+from app.services.llm_providers import (
+    PROVIDER_GROQ,
+    PROVIDER_OPENAI,
+    LLMProvider,
+    is_transient_llm_error,
+    provider_registry,
+)
 
 logger = logging.getLogger(__name__)
 
 EXTRACTION_MAX_RETRIES = 3
 EXTRACTION_RETRY_BASE_DELAY_SEC = 1.0
-RETRYABLE_HTTP_CODES = (429, 500, 502, 503, 504)
 
 SYSTEM_PROMPT = """You are an empathetic intake assistant for a mental wellness platform. You work quietly in the background. Your only role is to listen and collect information so we can match the user to a small support group of people with similar challenges; a licensed therapist leads the group. You do NOT diagnose, treat, or give medical or clinical advice. You are an AI tool — not a human, not a replacement for professional support.
 
@@ -59,6 +75,44 @@ def _blocked_output(reply: str) -> bool:
     return False
 
 
+_MAX_BLOCK_PATTERN_LEN = max(len(p) for p in OUTPUT_BLOCK_PATTERNS)
+
+
+class StreamingOutputGuard:
+    """
+    Incremental _blocked_output for streamed replies.
+    Holds back the last (longest pattern - 1) characters so a blocked phrase split across
+    chunks is caught before any of it is emitted; only re-scans a small sliding window per chunk.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.blocked = False
+        self._sent = 0
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk; return the text that is now safe to emit ("" if held back or blocked)."""
+        if self.blocked or not chunk:
+            return ""
+        self.text += chunk
+        window_start = max(0, self._sent - _MAX_BLOCK_PATTERN_LEN + 1)
+        if _blocked_output(self.text[window_start:]):
+            self.blocked = True
+            return ""
+        safe_end = max(self._sent, len(self.text) - _MAX_BLOCK_PATTERN_LEN + 1)
+        out = self.text[self._sent:safe_end]
+        self._sent = safe_end
+        return out
+
+    def flush(self) -> str:
+        """Return the held-back tail at end of stream (already checked by feed)."""
+        if self.blocked:
+            return ""
+        out = self.text[self._sent:]
+        self._sent = len(self.text)
+        return out
+
+
 def _mock_reply(user_message: str, conversation_history: list[dict]) -> str:
     """Mock LLM for demo when no API key is set."""
     msg_lower = user_message.lower()
@@ -73,16 +127,16 @@ def _mock_reply(user_message: str, conversation_history: list[dict]) -> str:
     return "Thank you. Can you tell me a bit more about what's been on your mind lately?"
 
 
-GROQ_BASE_URL = "https://api.groq.com/openai/v1"
-
-EXTRACTION_SYSTEM = """You extract structured intake from a mental wellness intake conversation. Return ONLY a single JSON object with exactly these keys (use null for any the user has NOT clearly shared in the conversation):
-
-- primary_concern (string): main focus e.g. "Anxiety", "Stress", "Grief / loss", "General emotional support". Null if not stated.
+INTAKE_FIELDS_SPEC = """- primary_concern (string): main focus e.g. "Anxiety", "Stress", "Grief / loss", "General emotional support". Null if not stated.
 - contextual_background (string): brief context they shared (work, relationships, events). Null if not stated.
 - emotional_intensity (integer 1-5): how much it affects day-to-day, 1=a little to 5=a lot. Null if not stated.
 - life_impact_areas (array of strings): e.g. ["work", "sleep", "relationships"]. Empty array [] if not stated.
 - support_goals (string): what they want from the group. Null if not stated.
-- availability (string): e.g. "Weekday evenings", "Weekends", "Flexible". Null if not stated.
+- availability (string): e.g. "Weekday evenings", "Weekends", "Flexible". Null if not stated."""
+
+EXTRACTION_SYSTEM = f"""You extract structured intake from a mental wellness intake conversation. Return ONLY a single JSON object with exactly these keys (use null for any the user has NOT clearly shared in the conversation):
+
+{INTAKE_FIELDS_SPEC}
 
 Rules:
 - Consider the ENTIRE conversation from start to end. If the user stated something in any earlier turn, include it in your extraction. Do NOT clear or set to null a field just because the latest message did not repeat it.
@@ -92,21 +146,7 @@ Rules:
 
 def _is_retryable_extraction_error(exc: BaseException) -> bool:
     """Return True if the error is transient and worth retrying (rate limit, server, timeout, connection)."""
-    if isinstance(exc, (ConnectionError, TimeoutError, OSError)):
-        return True
-    code = getattr(exc, "status_code", None)
-    if code is not None and code in RETRYABLE_HTTP_CODES:
-        return True
-    try:
-        import openai
-        if hasattr(openai, "APIStatusError") and isinstance(exc, openai.APIStatusError):
-            return getattr(exc, "status_code", 0) in RETRYABLE_HTTP_CODES
-        if hasattr(openai, "APIConnectionError") and hasattr(openai, "APITimeoutError"):
-            if isinstance(exc, (openai.APIConnectionError, openai.APITimeoutError)):
-                return True
-    except ImportError:
-        pass
-    return False
+    return is_transient_llm_error(exc)
 
 
 def _normalize_extraction_result(result: dict[str, Any]) -> dict[str, Any]:
@@ -130,6 +170,43 @@ def _normalize_extraction_result(result: dict[str, Any]) -> dict[str, Any]:
     return normalized
 
 
+async def _extract_with_provider(provider: LLMProvider, messages: list[dict]) -> dict[str, Any] | None:
+    """Run extraction on one provider with retries on transient errors. Returns None on failure."""
+    label = "Groq" if provider.name == PROVIDER_GROQ else "OpenAI"
+    for attempt in range(EXTRACTION_MAX_RETRIES):
+        try:
+            resp = await _provider_create(
+                provider,
+                "extraction",
+                messages=messages,
+                max_tokens=400,
+                response_format={"type": "json_object"},
+            )
+            raw = (resp.choices[0].message.content or "").strip()
+            if raw:
+                result = json.loads(raw)
+                logger.info("LLM extraction done (%s)", label, extra={"primary_concern": result.get("primary_concern")})
+                return _normalize_extraction_result(result)
+        except json.JSONDecodeError as e:
+            logger.warning("Extraction: %s returned invalid JSON: %s", label, e)
+            break
+        except Exception as e:
+            if _is_retryable_extraction_error(e) and attempt < EXTRACTION_MAX_RETRIES - 1:
+                delay = EXTRACTION_RETRY_BASE_DELAY_SEC * (2 ** attempt)
+                logger.warning("Extraction: %s transient error (attempt %s/%s), retry in %.1fs: %s",
+                               label, attempt + 1, EXTRACTION_MAX_RETRIES, delay, e)
+                await asyncio.sleep(delay)
+            else:
+                logger.warning("Extraction: %s failed: %s", label, e)
+                break
+    return None
+
+
+def _extraction_turns(turns: list[dict]) -> list[dict]:
+    """Most recent turns that fit the extraction token budget (what the prompt, and the cache key, see)."""
+    return fit_turns(turns, settings.llm_extraction_token_budget)
+
+
 async def extract_intake_llm(turns: list[dict]) -> dict[str, Any] | None:
     """
     Use LLM to extract structured intake from conversation. Returns None if no API key or on failure.
@@ -138,84 +215,162 @@ async def extract_intake_llm(turns: list[dict]) -> dict[str, Any] | None:
     if not turns:
         return None
     conv_text = "\n".join(
-        f"{t['role'].upper()}: {t['content']}" for t in turns[-20:]
+        f"{t['role'].upper()}: {t['content']}" for t in _extraction_turns(turns)
     )
     user_msg = f"From this FULL conversation (all turns), extract intake. Preserve any detail the user shared in any turn; use null only for info they never mentioned. Return only valid JSON.\n\nConversation:\n{conv_text}"
     messages = [
         {"role": "system", "content": EXTRACTION_SYSTEM},
         {"role": "user", "content": user_msg},
     ]
-    last_error: Optional[BaseException] = None
+    provider = provider_registry.get(PROVIDER_GROQ) or provider_registry.get(PROVIDER_OPENAI)
+    if provider is not None:
+        return await _extract_with_provider(provider, messages)
 
-    if settings.groq_api_key:
-        import openai
-        client = openai.AsyncOpenAI(
-            api_key=settings.groq_api_key,
-            base_url=GROQ_BASE_URL,
-        )
-        for attempt in range(EXTRACTION_MAX_RETRIES):
-            try:
-                resp = await client.chat.completions.create(
-                    model=settings.groq_model,
-                    messages=messages,
-                    max_tokens=400,
-                    response_format={"type": "json_object"},
-                )
-                raw = (resp.choices[0].message.content or "").strip()
-                if raw:
-                    result = json.loads(raw)
-                    logger.info("LLM extraction done (Groq)", extra={"primary_concern": result.get("primary_concern")})
-                    return _normalize_extraction_result(result)
-            except json.JSONDecodeError as e:
-                logger.warning("Extraction: Groq returned invalid JSON: %s", e)
-                last_error = e
-                break
-            except Exception as e:
-                last_error = e
-                if _is_retryable_extraction_error(e) and attempt < EXTRACTION_MAX_RETRIES - 1:
-                    delay = EXTRACTION_RETRY_BASE_DELAY_SEC * (2 ** attempt)
-                    logger.warning("Extraction: Groq transient error (attempt %s/%s), retry in %.1fs: %s",
-                                   attempt + 1, EXTRACTION_MAX_RETRIES, delay, e)
-                    await asyncio.sleep(delay)
-                else:
-                    logger.warning("Extraction: Groq failed: %s", e)
-                    break
+    logger.warning("Extraction: No LLM API key configured (set GROQ_API_KEY or OPENAI_API_KEY)")
+    return None
+
+
+def _merge_extraction(previous: dict[str, Any], update: dict[str, Any]) -> dict[str, Any]:
+    """Overlay an incremental update on the previous state: fields the update leaves null/[] keep their value."""
+    merged = dict(previous)
+    for key, value in update.items():
+        if value is None or value == []:
+            continue
+        merged[key] = value
+    return _normalize_extraction_result(merged)
+
+
+async def extract_intake_incremental_llm(
+    previous: dict[str, Any],
+    new_turns: list[dict],
+    context_turns: list[dict] | None = None,
+) -> dict[str, Any] | None:
+    """
+    Update a previous extraction with only the turns added since it was made (prompt size stays flat as the
+    conversation grows). context_turns (e.g. the assistant question just before) are shown for reference only.
+    Returns the merged, normalized state, or None if no API key or on failure.
+    """
+    if not new_turns:
+        return _normalize_extraction_result(previous)
+    previous_json = json.dumps(_normalize_extraction_result(previous), default=str)
+    budget = settings.llm_extraction_token_budget - count_tokens(previous_json)
+    new_turns = fit_turns(new_turns, budget)
+    context_budget = budget - sum(count_tokens(t["content"]) + MESSAGE_OVERHEAD_TOKENS for t in new_turns)
+    context_turns = fit_turns(context_turns or [], context_budget)
+    context_text = "\n".join(f"{t['role'].upper()}: {t['content']}" for t in context_turns)
+    new_text = "\n".join(f"{t['role'].upper()}: {t['content']}" for t in new_turns)
+    user_msg = (
+        "Intake extracted so far from the earlier conversation (JSON):\n"
+        f"{previous_json}\n\n"
+        + (f"Earlier turns, for context only:\n{context_text}\n\n" if context_text else "")
+        + f"New turns:\n{new_text}\n\n"
+        "Return the updated intake JSON. Keep every existing value unless the new turns add to or correct it; "
+        "use null only for info never mentioned. Return only valid JSON."
+    )
+    messages = [
+        {"role": "system", "content": EXTRACTION_SYSTEM},
+        {"role": "user", "content": user_msg},
+    ]
+    provider = provider_registry.get(PROVIDER_GROQ) or provider_registry.get(PROVIDER_OPENAI)
+    if provider is None:
+        logger.warning("Extraction: No LLM API key configured (set GROQ_API_KEY or OPENAI_API_KEY)")
+        return None
+    update = await _extract_with_provider(provider, messages)
+    if update is None:
         return None
+    return _merge_extraction(previous, update)
+
+
+def _log_token_usage(task: str, provider: LLMProvider, messages: list[dict], resp: Any) -> None:
+    """Log prompt/completion tokens per request (provider-reported, plus our local estimate) for tuning budgets."""
+    usage = getattr(resp, "usage", None)
+    logger.info(
+        "LLM %s via %s: prompt_tokens=%s (local estimate %s), completion_tokens=%s",
+        task,
+        provider.name,
+        getattr(usage, "prompt_tokens", None),
+        count_message_tokens(messages),
+        getattr(usage, "completion_tokens", None),
+    )
 
-    if settings.openai_api_key:
-        import openai
-        client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
-        for attempt in range(EXTRACTION_MAX_RETRIES):
-            try:
-                resp = await client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=messages,
-                    max_tokens=400,
-                    response_format={"type": "json_object"},
-                )
-                raw = (resp.choices[0].message.content or "").strip()
-                if raw:
-                    result = json.loads(raw)
-                    logger.info("LLM extraction done (OpenAI)", extra={"primary_concern": result.get("primary_concern")})
-                    return _normalize_extraction_result(result)
-            except json.JSONDecodeError as e:
-                logger.warning("Extraction: OpenAI returned invalid JSON: %s", e)
-                last_error = e
-                break
-            except Exception as e:
-                last_error = e
-                if _is_retryable_extraction_error(e) and attempt < EXTRACTION_MAX_RETRIES - 1:
-                    delay = EXTRACTION_RETRY_BASE_DELAY_SEC * (2 ** attempt)
-                    logger.warning("Extraction: OpenAI transient error (attempt %s/%s), retry in %.1fs: %s",
-                                   attempt + 1, EXTRACTION_MAX_RETRIES, delay, e)
-                    await asyncio.sleep(delay)
+
+async def _provider_create(provider: LLMProvider, task: str, **kwargs: Any) -> Any:
+    """
+    chat.completions.create on one provider through its admission slot (circuit breaker, rate-limit bucket,
+    concurrency window), reading rate-limit headers and recording latency and token usage.
+    """
+    async with provider.slot():
+        started = time.monotonic()
+        try:
+            raw = await provider.client.chat.completions.with_raw_response.create(model=provider.model, **kwargs)
+        except asyncio.CancelledError:
+            # Lost a hedge race: the elapsed time is a lower bound, record it so the percentile isn't biased low
+            provider.record_latency(time.monotonic() - started)
+            raise
+        provider.record_latency(time.monotonic() - started)
+        provider.bucket.observe_headers(raw.headers)
+        resp = raw.parse()
+        _log_token_usage(task, provider, kwargs.get("messages") or [], resp)
+        return resp
+
+
+async def _hedged_create(task: str, **kwargs: Any) -> tuple[Any, LLMProvider]:
+    """
+    chat.completions.create on the primary provider. With hedging on and a second provider configured, the same
+    request also goes to the secondary once the primary exceeds its hedge delay (or fails); the first answer
+    wins and the other call is cancelled. Returns (response, provider that answered); raises if all fail.
+    """
+    providers = provider_registry.ordered()
+    primary = providers[0]
+    secondary = providers[1] if settings.llm_hedge_enabled and len(providers) > 1 else None
+    if secondary is None:
+        return await _provider_create(primary, task, **kwargs), primary
+    hedge_delay = provider_registry.hedge_delay(primary)
+    pending = {asyncio.create_task(_provider_create(primary, task, **kwargs)): primary}
+    hedged = False
+    errors: list[BaseException] = []
+    try:
+        while pending:
+            done, _ = await asyncio.wait(
+                pending,
+                timeout=None if hedged else hedge_delay,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for fut in done:
+                provider = pending.pop(fut)
+                exc = fut.exception()
+                if exc is None:
+                    if hedged:
+                        logger.info("Hedged LLM call answered by %s", provider.name)
+                    return fut.result(), provider
+                logger.warning("LLM call to %s failed: %s", provider.name, exc)
+                errors.append(exc)
+            if not hedged:
+                hedged = True
+                if errors:
+                    logger.info("Hedging LLM call: %s failed, trying %s", primary.name, secondary.name)
                 else:
-                    logger.warning("Extraction: OpenAI failed: %s", e)
-                    break
-        return None
+                    logger.info(
+                        "Hedging LLM call: %s no answer after %.2fs, also trying %s",
+                        primary.name, hedge_delay, secondary.name,
+                    )
+                pending[asyncio.create_task(_provider_create(secondary, task, **kwargs))] = secondary
+    finally:
+        for fut in pending:
+            fut.cancel()
+    raise errors[0]
 
-    logger.warning("Extraction: No LLM API key configured (set GROQ_API_KEY or OPENAI_API_KEY)")
-    return None
+
+CHAT_FALLBACK_REPLY = "I'm here to listen and help match you to a group—I can't give clinical advice, but a therapist will work with you once you join. What would you like to share?"
+
+
+def _chat_messages(user_message: str, conversation_history: list[dict]) -> list[dict]:
+    """System prompt + as much recent history as fits the chat token budget + the new user message."""
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    for turn in fit_turns(conversation_history, settings.llm_chat_token_budget):
+        messages.append({"role": turn["role"], "content": turn["content"]})
+    messages.append({"role": "user", "content": user_message})
+    return messages
 
 
 async def get_reply(user_message: str, conversation_history: list[dict]) -> tuple[str, str, str | None]:
@@ -226,50 +381,23 @@ async def get_reply(user_message: str, conversation_history: list[dict]) -> tupl
     """
     if not user_message or not user_message.strip():
         return "Could you say a bit more?", "mock", None
-    fallback = "I'm here to listen and help match you to a group—I can't give clinical advice, but a therapist will work with you once you join. What would you like to share?"
+    fallback = CHAT_FALLBACK_REPLY
     reply: Optional[str] = None
     source = "mock"
     error_message: str | None = None
-    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-    for turn in conversation_history[-10:]:
-        messages.append({"role": turn["role"], "content": turn["content"]})
-    messages.append({"role": "user", "content": user_message})
+    messages = _chat_messages(user_message, conversation_history)
 
-    if settings.groq_api_key:
+    provider = provider_registry.get(PROVIDER_GROQ) or provider_registry.get(PROVIDER_OPENAI)
+    if provider is not None:
         try:
-            import openai
-            client = openai.AsyncOpenAI(
-                api_key=settings.groq_api_key,
-                base_url=GROQ_BASE_URL,
-            )
-            resp = await client.chat.completions.create(
-                model=settings.groq_model,
-                messages=messages,
-                max_tokens=300,
-            )
+            resp, answered_by = await _hedged_create("chat", messages=messages, max_tokens=300)
             reply = (resp.choices[0].message.content or "").strip()
-            source = "groq"
+            source = answered_by.name
         except Exception as e:
             error_message = str(e)
-            logger.warning("Chat: Groq call failed, using mock: %s", e)
+            logger.warning("Chat: %s call failed, using mock: %s", provider.name, e)
             reply = _mock_reply(user_message, conversation_history)
-            source = "groq_failed"
-    elif settings.openai_api_key:
-        try:
-            import openai
-            client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
-            resp = await client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=messages,
-                max_tokens=300,
-            )
-            reply = (resp.choices[0].message.content or "").strip()
-            source = "openai"
-        except Exception as e:
-            error_message = str(e)
-            logger.warning("Chat: OpenAI call failed, using mock: %s", e)
-            reply = _mock_reply(user_message, conversation_history)
-            source = "openai_failed"
+            source = f"{provider.name}_failed"
     else:
         reply = _mock_reply(user_message, conversation_history)
         source = "mock_no_key"
@@ -280,6 +408,141 @@ async def get_reply(user_message: str, conversation_history: list[dict]) -> tupl
     return reply, source, error_message
 
 
+COMBINED_SYSTEM = SYSTEM_PROMPT + f"""
+## Output format
+Return ONLY a single JSON object with exactly two keys:
+- reply (string): your next message to the user, following everything above.
+- intake (object): structured intake from the ENTIRE conversation so far, including the user's latest message, with exactly these keys (use null for any the user has NOT clearly shared; do not guess or infer):
+{INTAKE_FIELDS_SPEC}
+
+No other text, only the JSON object."""
+
+
+async def get_reply_with_intake(
+    user_message: str,
+    conversation_history: list[dict],
+    previous_intake: dict[str, Any] | None = None,
+) -> tuple[str, dict[str, Any] | None, str, str | None]:
+    """
+    One structured-output call returning both the assistant reply and the updated intake (instead of get_reply
+    plus a separate extraction call). previous_intake (the session's saved extraction state) is shown to the
+    model and kept for fields the reply turn leaves null, since older turns may fall outside the chat budget.
+    Returns (reply_text, intake, source, error_message); intake is None when no structured result was
+    obtained (no key, failure, invalid JSON) and the caller should extract separately.
+    """
+    if not user_message or not user_message.strip():
+        return "Could you say a bit more?", None, "mock", None
+    provider = provider_registry.get(PROVIDER_GROQ) or provider_registry.get(PROVIDER_OPENAI)
+    if provider is None:
+        reply, source, error_message = await get_reply(user_message, conversation_history)
+        return reply, None, source, error_message
+    messages = _chat_messages(user_message, conversation_history)
+    messages[0] = {"role": "system", "content": COMBINED_SYSTEM}
+    if previous_intake:
+        previous_json = json.dumps(_normalize_extraction_result(previous_intake), default=str)
+        messages.insert(1, {
+            "role": "system",
+            "content": f"Intake extracted so far from earlier turns (keep these values unless the user corrects them):\n{previous_json}",
+        })
+    try:
+        resp, answered_by = await _hedged_create(
+            "chat_extract",
+            messages=messages,
+            max_tokens=700,
+            response_format={"type": "json_object"},
+        )
+        result = json.loads((resp.choices[0].message.content or "").strip())
+        reply = (result.get("reply") or "").strip() if isinstance(result, dict) else ""
+        intake_raw = result.get("intake") if isinstance(result, dict) else None
+    except Exception as e:
+        logger.warning("Chat+extract: %s combined call failed, using separate calls: %s", provider.name, e)
+        reply, source, error_message = await get_reply(user_message, conversation_history)
+        return reply, None, source, error_message
+    intake = None
+    if isinstance(intake_raw, dict):
+        intake = _normalize_extraction_result(intake_raw)
+        if previous_intake:
+            intake = _merge_extraction(previous_intake, intake)
+    if not reply or _blocked_output(reply):
+        reply = CHAT_FALLBACK_REPLY
+    return reply, intake, answered_by.name, None
+
+
+async def stream_reply(user_message: str, conversation_history: list[dict]) -> AsyncIterator[dict[str, Any]]:
+    """
+    Stream the assistant reply. Yields events:
+    {"type": "token", "text": ...} as guarded text becomes safe to send;
+    {"type": "replace", "text": ...} if the output guard trips (or the stream fails midway) — the client
+    should replace what it has shown with this text;
+    {"type": "end", "reply": final_text, "source": ..., "error": ...} once, last.
+    """
+    if not user_message or not user_message.strip():
+        reply = "Could you say a bit more?"
+        yield {"type": "token", "text": reply}
+        yield {"type": "end", "reply": reply, "source": "mock", "error": None}
+        return
+    guard = StreamingOutputGuard()
+    emitted = False
+    error_message: str | None = None
+    provider = provider_registry.get(PROVIDER_GROQ) or provider_registry.get(PROVIDER_OPENAI)
+    if provider is not None:
+        source = provider.name
+        try:
+            messages = _chat_messages(user_message, conversation_history)
+            async with provider.slot():
+                stream = await provider.client.chat.completions.create(
+                    model=provider.model,
+                    messages=messages,
+                    max_tokens=300,
+                    stream=True,
+                )
+                try:
+                    async for chunk in stream:
+                        if not chunk.choices:
+                            continue
+                        safe = guard.feed(chunk.choices[0].delta.content or "")
+                        if guard.blocked:
+                            break
+                        if safe:
+                            emitted = True
+                            yield {"type": "token", "text": safe}
+                finally:
+                    await stream.close()
+            logger.info(
+                "LLM chat_stream via %s: prompt_tokens (local estimate %s), completion_tokens (local estimate %s)",
+                provider.name,
+                count_message_tokens(messages),
+                count_tokens(guard.text),
+            )
+        except Exception as e:
+            error_message = str(e)
+            logger.warning("Chat stream: %s call failed: %s", provider.name, e)
+            source = f"{provider.name}_failed"
+            if not emitted:
+                guard = StreamingOutputGuard()
+                guard.feed(_mock_reply(user_message, conversation_history))
+            else:
+                guard.blocked = True
+    else:
+        source = "mock_no_key"
+        for word in _mock_reply(user_message, conversation_history).split(" "):
+            safe = guard.feed(word if not guard.text else f" {word}")
+            if safe:
+                emitted = True
+                yield {"type": "token", "text": safe}
+    tail = guard.flush()
+    reply = guard.text.strip()
+    if guard.blocked or not reply:
+        yield {"type": "replace", "text": CHAT_FALLBACK_REPLY}
+        yield {"type": "end", "reply": CHAT_FALLBACK_REPLY, "source": source, "error": error_message}
+        return
+    if not emitted:
+        yield {"type": "token", "text": reply}
+    elif tail:
+        yield {"type": "token", "text": tail}
+    yield {"type": "end", "reply": reply, "source": source, "error": error_message}
+
+
 MATCHING_SYSTEM = """You match a user to exactly one support group based on their intake. You will receive:
 1. The user's intake (primary concern, context, life impact areas, support goals).
 2. A list of groups with "focus" (unique key) and "name".
@@ -291,6 +554,18 @@ Return ONLY a JSON object with exactly two keys:
 Rules: Pick exactly one group. Use "general" only if no other group clearly fits. No other text, only the JSON object."""
 
 
+def _intake_summary(intake: dict) -> dict[str, Any]:
+    """The intake fields the matching prompt sees; free-text fields share the matching token budget."""
+    per_field = settings.llm_matching_token_budget // 3
+    return {
+        "primary_concern": truncate_to_tokens(intake.get("primary_concern") or "", per_field) or None,
+        "contextual_background": truncate_to_tokens(intake.get("contextual_background") or "", per_field) or None,
+        "life_impact_areas": intake.get("life_impact_areas"),
+        "support_goals": truncate_to_tokens(intake.get("support_goals") or "", per_field) or None,
+        "emotional_intensity": intake.get("emotional_intensity"),
+    }
+
+
 async def match_intake_to_group_llm(
     intake: dict,
     groups: list[dict],
@@ -298,13 +573,7 @@ async def match_intake_to_group_llm(
     """Use LLM to pick one group and return (focus_key, match_reason). Returns None if no API key or on failure."""
     if not groups:
         return None
-    intake_summary = {
-        "primary_concern": intake.get("primary_concern"),
-        "contextual_background": intake.get("contextual_background"),
-        "life_impact_areas": intake.get("life_impact_areas"),
-        "support_goals": intake.get("support_goals"),
-        "emotional_intensity": intake.get("emotional_intensity"),
-    }
+    intake_summary = _intake_summary(intake)
     user_msg = (
         f"Intake summary:\n{json.dumps(intake_summary, indent=2, default=str)}\n\n"
         f"Available groups (use exactly one 'focus' key):\n{json.dumps(groups, indent=2)}"
@@ -315,32 +584,14 @@ async def match_intake_to_group_llm(
     ]
     valid_foci = {g.get("focus") for g in groups if g.get("focus")}
 
-    if settings.groq_api_key:
+    for name in (PROVIDER_GROQ, PROVIDER_OPENAI):
+        provider = provider_registry.get(name)
+        if provider is None:
+            continue
         try:
-            import openai
-            client = openai.AsyncOpenAI(api_key=settings.groq_api_key, base_url=GROQ_BASE_URL)
-            resp = await client.chat.completions.create(
-                model=settings.groq_model,
-                messages=messages,
-                max_tokens=200,
-                response_format={"type": "json_object"},
-            )
-            raw = (resp.choices[0].message.content or "").strip()
-            if raw:
-                result = json.loads(raw)
-                focus = (result.get("focus") or "").strip()
-                reason = (result.get("match_reason") or "").strip() or "This group matches your intake focus."
-                if focus in valid_foci:
-                    logger.info("LLM group match", extra={"focus": focus})
-                    return focus, reason
-        except Exception as e:
-            logger.warning("LLM matching failed, will use keyword fallback: %s", e)
-    if settings.openai_api_key:
-        try:
-            import openai
-            client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
-            resp = await client.chat.completions.create(
-                model="gpt-4o-mini",
+            resp = await _provider_create(
+                provider,
+                "matching",
                 messages=messages,
                 max_tokens=200,
                 response_format={"type": "json_object"},
@@ -358,15 +609,81 @@ async def match_intake_to_group_llm(
     return None
 
 
+def _normalized_turns(turns: list[dict]) -> list[list[str]]:
+    """Turns as [role, content] with whitespace trimmed, for cache keys."""
+    return [[(t.get("role") or "").lower(), (t.get("content") or "").strip()] for t in turns]
+
+
 class LLMService:
+    """
+    Entry point for chat, extraction and matching. Extraction and matching results are cached by content
+    (hash of the normalized turns / intake summary + groups), so identical inputs skip the network.
+    Only successful results are cached; callers always get their own copy.
+    """
+
+    def __init__(self) -> None:
+        self.extraction_cache = TTLCache(settings.llm_cache_max_entries, settings.llm_cache_ttl_sec)
+        self.matching_cache = TTLCache(settings.llm_cache_max_entries, settings.llm_cache_ttl_sec)
+
     async def chat(self, user_message: str, conversation_history: list[dict]) -> tuple[str, str, str | None]:
         return await get_reply(user_message, conversation_history)
 
+    async def chat_with_intake(
+        self,
+        user_message: str,
+        conversation_history: list[dict],
+        previous_intake: dict[str, Any] | None = None,
+    ) -> tuple[str, dict[str, Any] | None, str, str | None]:
+        return await get_reply_with_intake(user_message, conversation_history, previous_intake)
+
+    def chat_stream(self, user_message: str, conversation_history: list[dict]) -> AsyncIterator[dict[str, Any]]:
+        return stream_reply(user_message, conversation_history)
+
     async def extract_intake(self, turns: list[dict]) -> dict[str, Any] | None:
-        return await extract_intake_llm(turns)
+        key = content_key("extract", _normalized_turns(_extraction_turns(turns)))
+        cached = self.extraction_cache.get(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        result = await extract_intake_llm(turns)
+        if result is not None:
+            self.extraction_cache.set(key, copy.deepcopy(result))
+        return result
+
+    async def extract_intake_incremental(
+        self,
+        previous: dict[str, Any],
+        new_turns: list[dict],
+        context_turns: list[dict] | None = None,
+    ) -> dict[str, Any] | None:
+        key = content_key(
+            "extract_incremental",
+            _normalize_extraction_result(previous),
+            _normalized_turns(new_turns),
+            _normalized_turns(context_turns or []),
+        )
+        cached = self.extraction_cache.get(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        result = await extract_intake_incremental_llm(previous, new_turns, context_turns)
+        if result is not None:
+            self.extraction_cache.set(key, copy.deepcopy(result))
+        return result
 
     async def match_intake_to_group(self, intake: dict, groups: list[dict]) -> tuple[str, str] | None:
-        return await match_intake_to_group_llm(intake, groups)
+        key = content_key("match", _intake_summary(intake), groups)
+        cached = self.matching_cache.get(key)
+        if cached is not None:
+            return cached
+        result = await match_intake_to_group_llm(intake, groups)
+        if result is not None:
+            self.matching_cache.set(key, result)
+        return result
+
+    def cache_stats(self) -> dict[str, Any]:
+        return {
+            "extraction": self.extraction_cache.stats(),
+            "matching": self.matching_cache.stats(),
+        }
 
 
 llm_service = LLMService()
@@ -0,0 +1,415 @@
+"""LLM provider registry: one long-lived, pooled client per provider (Groq, OpenAI), with per-provider
+adaptive concurrency limit, rate-limit token bucket and circuit breaker."""
+import asyncio
+import logging
+import re
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Mapping
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_GROQ = "groq"
+PROVIDER_OPENAI = "openai"
+
+OPENAI_MODEL = "gpt-4o-mini"
+
+RETRYABLE_HTTP_CODES = (429, 500, 502, 503, 504)
+OVERLOAD_HTTP_CODES = (429, 503)
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+class ProviderUnavailableError(Exception):
+    """Provider is shedding load (circuit open, rate limited or concurrency queue full); use the fallback path."""
+
+
+def is_transient_llm_error(exc: BaseException) -> bool:
+    """True if the error is transient (rate limit, server, timeout, connection)."""
+    if isinstance(exc, ProviderUnavailableError):
+        return False
+    if isinstance(exc, (ConnectionError, TimeoutError, OSError)):
+        return True
+    code = getattr(exc, "status_code", None)
+    if code is not None and code in RETRYABLE_HTTP_CODES:
+        return True
+    try:
+        import openai
+        if hasattr(openai, "APIStatusError") and isinstance(exc, openai.APIStatusError):
+            return getattr(exc, "status_code", 0) in RETRYABLE_HTTP_CODES
+        if hasattr(openai, "APIConnectionError") and hasattr(openai, "APITimeoutError"):
+            if isinstance(exc, (openai.APIConnectionError, openai.APITimeoutError)):
+                return True
+    except ImportError:
+        pass
+    return False
+
+
+def _is_overload_error(exc: BaseException) -> bool:
+    """Errors that mean "send less": 429/503 and timeouts."""
+    if getattr(exc, "status_code", None) in OVERLOAD_HTTP_CODES:
+        return True
+    if isinstance(exc, TimeoutError):
+        return True
+    try:
+        import openai
+        return isinstance(exc, openai.APITimeoutError)
+    except ImportError:
+        return False
+
+
+def parse_duration(value: str | None) -> float | None:
+    """Parse rate-limit durations like "2", "0.5s", "6ms", "1m30.5s" into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(n) * scale[unit] for n, unit in parts)
+
+
+class AIMDLimiter:
+    """Adaptive concurrency window: +1/limit per success, halved on overload; waiters queue up to max_wait."""
+
+    def __init__(self, initial: int, minimum: int, maximum: int, max_wait: float) -> None:
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            try:
+                await asyncio.wait_for(
+                    self._cond.wait_for(lambda: self.in_flight < max(1, int(self.limit))),
+                    self.max_wait,
+                )
+            except asyncio.TimeoutError:
+                raise ProviderUnavailableError("concurrency limit reached") from None
+            self.in_flight += 1
+
+    async def release(self, outcome: str) -> None:
+        """outcome is "success", "overload" or "neutral" (cancelled / non-load error)."""
+        async with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            if outcome == "success":
+                self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+            elif outcome == "overload":
+                self.limit = max(float(self.minimum), self.limit / 2)
+            self._cond.notify_all()
+
+    def stats(self) -> dict[str, Any]:
+        return {"limit": round(self.limit, 2), "in_flight": self.in_flight}
+
+
+class TokenBucket:
+    """
+    Request rate limit. rate_per_sec <= 0 means no local rate, only provider signals: rate-limit headers
+    (x-ratelimit-remaining-* / x-ratelimit-reset-*) and Retry-After pause the bucket until the reset.
+    """
+
+    def __init__(self, rate_per_sec: float, capacity: float, max_wait: float) -> None:
+        self.rate = rate_per_sec
+        self.capacity = max(1.0, capacity)
+        self.max_wait = max_wait
+        self.tokens = self.capacity
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if self.rate > 0:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _wait_time(self, now: float) -> float:
+        wait = max(0.0, self.paused_until - now)
+        if self.rate > 0 and self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self._refill(now)
+            wait = self._wait_time(now)
+            if wait <= 0:
+                if self.rate > 0:
+                    self.tokens -= 1
+                return
+            if wait > self.max_wait:
+                raise ProviderUnavailableError(f"rate limited for {wait:.1f}s")
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def observe_headers(self, headers: Mapping[str, str]) -> None:
+        retry_after = parse_duration(headers.get("retry-after"))
+        if retry_after:
+            self.pause(retry_after)
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is None:
+                continue
+            try:
+                remaining_n = float(remaining)
+            except ValueError:
+                continue
+            if kind == "requests" and self.rate > 0:
+                self.tokens = min(self.tokens, remaining_n)
+            if remaining_n <= 0:
+                reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                if reset:
+                    self.pause(reset)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "rate_per_sec": self.rate,
+            "tokens": round(self.tokens, 2) if self.rate > 0 else None,
+            "paused_for_sec": round(max(0.0, self.paused_until - time.monotonic()), 2),
+        }
+
+
+class CircuitBreaker:
+    """Opens after failure_threshold consecutive transient failures; one probe is let through after reset_timeout."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def before_call(self) -> bool:
+        """Admit a call or raise ProviderUnavailableError; True if the call is the half-open probe."""
+        if self.state == CIRCUIT_OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                raise ProviderUnavailableError("circuit open")
+            self.state = CIRCUIT_HALF_OPEN
+        if self.state == CIRCUIT_HALF_OPEN:
+            if self._probe_in_flight:
+                raise ProviderUnavailableError("circuit half-open, probe in flight")
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record(self, outcome: str, probe: bool) -> None:
+        """
+        outcome is "success", "failure" or "neutral"; probe is what before_call returned for the call. Only the
+        probe decides between closed and open again: calls admitted before the circuit opened that finish late
+        leave it as it is.
+        """
+        if probe:
+            self._probe_in_flight = False
+            if outcome == "success":
+                self.state = CIRCUIT_CLOSED
+                self.failures = 0
+            elif outcome == "failure":
+                self.failures += 1
+                self._open()
+            return
+        if self.state != CIRCUIT_CLOSED:
+            return
+        if outcome == "success":
+            self.failures = 0
+        elif outcome == "failure":
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self) -> None:
+        if self.state != CIRCUIT_OPEN:
+            logger.warning("LLM circuit opened after %s failures", self.failures)
+        self.state = CIRCUIT_OPEN
+        self.opened_at = time.monotonic()
+
+    def stats(self) -> dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self.failures}
+
+
+@dataclass
+class LLMProvider:
+    """A configured provider: name, model, its shared AsyncOpenAI client and recent call latencies."""
+    name: str
+    model: str
+    client: Any
+    latencies: deque = field(default_factory=lambda: deque(maxlen=settings.llm_latency_window))
+    limiter: AIMDLimiter = field(default_factory=lambda: AIMDLimiter(
+        settings.llm_concurrency_initial,
+        settings.llm_concurrency_min,
+        settings.llm_concurrency_max,
+        settings.llm_queue_timeout_sec,
+    ))
+    bucket: TokenBucket = field(default_factory=lambda: TokenBucket(
+        settings.llm_rate_limit_rpm / 60.0,
+        settings.llm_rate_limit_burst,
+        settings.llm_queue_timeout_sec,
+    ))
+    breaker: CircuitBreaker = field(default_factory=lambda: CircuitBreaker(
+        settings.llm_circuit_failure_threshold,
+        settings.llm_circuit_reset_sec,
+    ))
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Admit one call: circuit breaker, rate-limit bucket, then concurrency window. Raises
+        ProviderUnavailableError instead of queueing past llm_queue_timeout_sec. The outcome of the
+        wrapped call feeds back into all three; cancellation counts as neutral.
+        """
+        probe = self.breaker.before_call()
+        try:
+            await self.bucket.acquire()
+            await self.limiter.acquire()
+        except BaseException:
+            self.breaker.record("neutral", probe)
+            raise
+        outcome = "neutral"
+        try:
+            yield
+            outcome = "success"
+        except Exception as e:
+            if is_transient_llm_error(e):
+                outcome = "overload" if _is_overload_error(e) else "failure"
+            headers = getattr(getattr(e, "response", None), "headers", None)
+            if headers is not None:
+                self.bucket.observe_headers(headers)
+            raise
+        finally:
+            await self.limiter.release(outcome)
+            self.breaker.record("failure" if outcome == "overload" else outcome, probe)
+
+    def record_latency(self, seconds: float) -> None:
+        self.latencies.append(seconds)
+
+    def latency_percentile(self, q: float) -> float | None:
+        """q-quantile (0..1) of recent latencies, or None without enough samples."""
+        if len(self.latencies) < settings.llm_hedge_min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+        return ordered[index]
+
+    def latency_stats(self) -> dict[str, Any]:
+        return {
+            "samples": len(self.latencies),
+            "p50_sec": self.latency_percentile(0.5),
+            "p90_sec": self.latency_percentile(0.9),
+            "p99_sec": self.latency_percentile(0.99),
+        }
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "latency": self.latency_stats(),
+            "concurrency": self.limiter.stats(),
+            "rate_limit": self.bucket.stats(),
+            "circuit": self.breaker.stats(),
+        }
+
+
+def _http_client() -> httpx.AsyncClient:
+    """HTTP client with keep-alive pool and timeouts from settings."""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry_sec,
+        ),
+        timeout=httpx.Timeout(
+            settings.llm_timeout_sec,
+            connect=settings.llm_connect_timeout_sec,
+        ),
+    )
+
+
+class LLMProviderRegistry:
+    """Holds one client per configured provider; started and closed by the app lifespan."""
+
+    def __init__(self) -> None:
+        self._providers: dict[str, LLMProvider] = {}
+        self._started = False
+
+    def start(self) -> None:
+        """Create clients for every provider that has an API key. Safe to call more than once."""
+        if self._started:
+            return
+        import openai
+
+        timeout = httpx.Timeout(settings.llm_timeout_sec, connect=settings.llm_connect_timeout_sec)
+        if settings.groq_api_key:
+            self._providers[PROVIDER_GROQ] = LLMProvider(
+                name=PROVIDER_GROQ,
+                model=settings.groq_model,
+                client=openai.AsyncOpenAI(
+                    api_key=settings.groq_api_key,
+                    base_url=settings.groq_base_url,
+                    timeout=timeout,
+                    http_client=_http_client(),
+                ),
+            )
+        if settings.openai_api_key:
+            self._providers[PROVIDER_OPENAI] = LLMProvider(
+                name=PROVIDER_OPENAI,
+                model=OPENAI_MODEL,
+                client=openai.AsyncOpenAI(
+                    api_key=settings.openai_api_key,
+                    base_url=settings.openai_base_url or None,
+                    timeout=timeout,
+                    http_client=_http_client(),
+                ),
+            )
+        self._started = True
+        logger.info("LLM provider registry started", extra={"providers": list(self._providers)})
+
+    def get(self, name: str) -> LLMProvider | None:
+        """Return the provider by name, starting the registry lazily if needed."""
+        if not self._started:
+            self.start()
+        return self._providers.get(name)
+
+    def ordered(self) -> list[LLMProvider]:
+        """Configured providers in priority order (Groq first, then OpenAI)."""
+        return [p for p in (self.get(PROVIDER_GROQ), self.get(PROVIDER_OPENAI)) if p is not None]
+
+    def hedge_delay(self, provider: LLMProvider) -> float:
+        """How long to wait on the provider before hedging: its latency percentile, clamped to settings."""
+        observed = provider.latency_percentile(settings.llm_hedge_percentile)
+        if observed is None:
+            return settings.llm_hedge_max_delay_sec
+        return min(settings.llm_hedge_max_delay_sec, max(settings.llm_hedge_min_delay_sec, observed))
+
+    def stats(self) -> dict[str, Any]:
+        return {name: p.stats() for name, p in self._providers.items()}
+
+    async def aclose(self) -> None:
+        """Close all pooled clients (app shutdown)."""
+        for provider in self._providers.values():
+            try:
+                await provider.client.close()
+            except Exception as e:
+                logger.warning("Failed to close LLM client %s: %s", provider.name, e)
+        self._providers.clear()
+        self._started = False
+        logger.info("LLM provider registry closed")
+
+
+provider_registry = LLMProviderRegistry()
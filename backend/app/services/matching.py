@@ -2,11 +2,16 @@
 import logging
 from uuid import UUID
 
-from sqlalchemy import select, update
+from sqlalchemy import and_, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.group import Group, GroupMember, MEMBERSHIP_STATUS_ACTIVE, MEMBERSHIP_STATUS_WITHDRAWN
+from app.config import settings
+from app.database import AsyncSessionLocal
 from app.models.intake import IntakeResult
+from app.services.embedding_matcher import embedding_matcher
+from app.services.focus_classifier import focus_classifier
+from app.services.group_registry import GroupInfo, GroupSnapshot, group_registry
 from app.services.llm import llm_service
 
 logger = logging.getLogger(__name__)
@@ -27,6 +32,22 @@ DEFAULT_GROUPS = [
     ("General emotional support", FOCUS_GENERAL),
 ]
 
+# What each default group is about, for the embedding matcher (other groups: their keyword table, else focus)
+GROUP_DESCRIPTIONS = {
+    FOCUS_ANXIETY_STRESS: "Anxiety, worry, stress, feeling anxious or overwhelmed, panic attacks, racing thoughts, "
+    "nervousness, trouble relaxing or sleeping because of worry.",
+    FOCUS_GRIEF_LOSS: "Grief and bereavement after someone died or passed away, the death of a loved one, mourning, "
+    "loss of a mother, father, partner, child, friend or pet, miscarriage, crying and coping with loss.",
+    FOCUS_POSTPARTUM: "Postpartum depression and anxiety, pregnancy, new parents, a new baby, parenting stress, "
+    "exhaustion from caring for an infant or children, motherhood and fatherhood.",
+    FOCUS_RELATIONSHIP: "Relationship problems, conflict with a partner, spouse, family or friends, communication, "
+    "boundaries, breakups, divorce, loneliness, interpersonal difficulties.",
+    FOCUS_WORKPLACE_BURNOUT: "Burnout at work, job stress, career changes, workplace conflict, long hours, "
+    "imposter syndrome, unemployment, professional pressure.",
+    FOCUS_GENERAL: "General emotional support, low mood, life changes, feeling stuck, self-esteem, wanting someone "
+    "to talk to.",
+}
+
 
 async def ensure_focus_groups(db: AsyncSession) -> None:
     """Create default groups if not present (by focus key)."""
@@ -42,6 +63,15 @@ async def ensure_focus_groups(db: AsyncSession) -> None:
         logger.info("Ensured focus groups", extra={"count": len(existing_foci)})
 
 
+async def focus_groups(db: AsyncSession) -> GroupSnapshot:
+    """Group registry snapshot, after creating default groups if one is missing (normally only at startup)."""
+    snapshot = await group_registry.snapshot(db)
+    if any(focus_key not in snapshot.by_focus for _, focus_key in DEFAULT_GROUPS):
+        await ensure_focus_groups(db)
+        snapshot = await group_registry.refresh(db)
+    return snapshot
+
+
 def _text_for_matching(intake: dict) -> str:
     """Single string of intake content for keyword matching."""
     parts = [
@@ -58,29 +88,71 @@ def _text_for_matching(intake: dict) -> str:
 
 
 def _match_focus(intake: dict) -> tuple[str, str]:
-    """Return (focus_key, match_reason). Assign only to one of the six groups."""
-    concern = (intake.get("primary_concern") or "").lower()
-    text = _text_for_matching(intake)
-    primary = intake.get("primary_concern") or "your concerns"
+    """Return (focus_key, match_reason) from the weighted keyword tables (focus_classifier); general if no hits."""
+    concern = intake.get("primary_concern") or ""
+    other = _text_for_matching({**intake, "primary_concern": None})
+    primary = concern or "your concerns"
     intensity = intake.get("emotional_intensity")
     areas = intake.get("life_impact_areas")
+    best = focus_classifier.classify(concern, other)
+    if best is None:
+        return FOCUS_GENERAL, f"Primary concern: {primary}; life impact: {areas or 'general'}."
+    reason = f"Primary concern: {primary}; matched: {', '.join(best.terms[:3])}"
+    if intensity:
+        reason += f"; emotional intensity {intensity}"
+    return best.focus, f"{reason}; life impact: {areas or 'general'}."
+
+
+def _group_description(group: GroupInfo) -> str:
+    keywords = focus_classifier.tables.get(group.focus)
+    return GROUP_DESCRIPTIONS.get(group.focus) or (", ".join(keywords) if keywords else group.focus.replace("_", " "))
+
+
+def subgroup_name(base_name: str, number: int) -> str:
+    """Name of the number-th group of a focus once the first is full (e.g. "Grief & Loss Support 2")."""
+    return f"{base_name} {number}"
+
+
+async def open_group_for_focus(db: AsyncSession, focus_key: str) -> Group | None:
+    """
+    Oldest group of the focus with fewer than GROUP_CAPACITY active members; if all are full, a new sub-group
+    named after the first one. None if the focus has no group. Concurrent assignments can overshoot the cap
+    by a few (the batch optimizer keeps groups within it).
+    """
+    member_count = func.count(GroupMember.id)
+    result = await db.execute(
+        select(Group, member_count)
+        .outerjoin(GroupMember, and_(GroupMember.group_id == Group.id, GroupMember.status == MEMBERSHIP_STATUS_ACTIVE))
+        .where(Group.focus == focus_key)
+        .group_by(Group.id)
+        .order_by(Group.created_at, Group.name)
+    )
+    rows = result.all()
+    if not rows:
+        return None
+    for group, count in rows:
+        if count < settings.group_capacity:
+            return group
+    group = Group(name=subgroup_name(rows[0][0].name, len(rows) + 1), focus=focus_key)
+    db.add(group)
+    await db.flush()
+    logger.info("Opened sub-group", extra={"group_id": str(group.id), "focus": focus_key})
+    return group
 
-    if "grief" in text or "bereavement" in text or "loss" in concern or "mourn" in text:
-        return FOCUS_GRIEF_LOSS, f"Primary concern: {primary}; life impact: {areas or 'general'}."
-
-    if "postpartum" in text or "parenting" in text or "new parent" in text or "baby" in text or "exhaustion" in text and ("parent" in text or "child" in text):
-        return FOCUS_POSTPARTUM, f"Primary concern: {primary}; life impact: {areas or 'general'}."
-
-    if "relationship" in text or "communication" in text or "boundary" in text or "conflict" in text or "interpersonal" in text:
-        return FOCUS_RELATIONSHIP, f"Primary concern: {primary}; life impact: {areas or 'general'}."
-
-    if "burnout" in text or "career" in text or "professional" in text or "imposter" in text or "workplace" in text or "job" in text:
-        return FOCUS_WORKPLACE_BURNOUT, f"Primary concern: {primary}; life impact: {areas or 'general'}."
-
-    if "anxiety" in text or "anxious" in text or "stress" in text or "overwhelm" in text or "panic" in text or "racing" in text:
-        return FOCUS_ANXIETY_STRESS, f"Primary concern: {primary}; emotional intensity {intensity or 'N/A'}; life impact: {areas or 'general'}."
 
-    return FOCUS_GENERAL, f"Primary concern: {primary}; life impact: {areas or 'general'}."
+async def match_locally(intake: dict, groups: list[GroupInfo]) -> tuple[str, str, str]:
+    """(focus_key, match_reason, method): embedding similarity when available and confident, else keyword rules."""
+    match = await embedding_matcher.match(
+        _text_for_matching(intake), [(g.focus, g.name, _group_description(g)) for g in groups]
+    )
+    if match is None or match.similarity < settings.matching_min_similarity:
+        return (*_match_focus(intake), "keyword")
+    primary = intake.get("primary_concern") or "your concerns"
+    areas = intake.get("life_impact_areas")
+    closest = f"Your intake is closest to {match.name} (similarity {match.similarity:.2f}"
+    if match.runner_up:
+        closest += f"; next: {match.runner_up[0]}, {match.runner_up[1]:.2f}"
+    return match.focus, f"{closest}). Primary concern: {primary}; life impact: {areas or 'general'}.", "embedding"
 
 
 async def assign_user_to_group(
@@ -88,23 +160,23 @@ async def assign_user_to_group(
     user_id: UUID,
     intake: dict,
 ) -> Group:
-    """Assign user to a focus group; create membership with match_reason. Uses LLM if available, else keyword fallback."""
-    await ensure_focus_groups(db)
-    result = await db.execute(select(Group).order_by(Group.name))
-    groups = result.scalars().all()
-    groups_for_llm = [{"focus": g.focus, "name": g.name} for g in groups]
-    llm_result = await llm_service.match_intake_to_group(intake, groups_for_llm)
+    """
+    Assign user to a focus group; create membership with match_reason. GROUP_MATCHER=llm asks the LLM first;
+    otherwise (or if the LLM is unavailable) the local embedding matcher decides, then the keyword rules.
+    """
+    snapshot = await focus_groups(db)
+    groups = snapshot.first_per_focus()  # one candidate per focus; sub-groups are picked below
+    llm_result = None
+    if settings.group_matcher == "llm":
+        groups_for_llm = [{"focus": g.focus, "name": g.name} for g in groups]
+        llm_result = await llm_service.match_intake_to_group(intake, groups_for_llm)
     if llm_result is not None:
         focus_key, match_reason = llm_result
         logger.info("Assigned using LLM match", extra={"focus": focus_key})
     else:
-        focus_key, match_reason = _match_focus(intake)
-        logger.info("Assigned using keyword fallback", extra={"focus": focus_key})
-    result = await db.execute(select(Group).where(Group.focus == focus_key))
-    group = result.scalar_one_or_none()
-    if not group:
-        result = await db.execute(select(Group).where(Group.focus == FOCUS_GENERAL))
-        group = result.scalar_one_or_none()
+        focus_key, match_reason, method = await match_locally(intake, groups)
+        logger.info("Assigned using %s match", method, extra={"focus": focus_key})
+    group = await open_group_for_focus(db, focus_key) or await open_group_for_focus(db, FOCUS_GENERAL)
     if not group:
         result = await db.execute(select(Group).limit(1))
         group = result.scalar_one()
@@ -127,7 +199,13 @@ async def assign_user_to_group(
 
 class MatchingService:
     async def ensure_groups(self, db: AsyncSession) -> None:
-        await ensure_focus_groups(db)
+        await focus_groups(db)
+
+    async def seed(self) -> None:
+        """At startup: create missing default groups and load the group registry."""
+        async with AsyncSessionLocal() as db:
+            await focus_groups(db)
+            await db.commit()
 
     async def assign(self, db: AsyncSession, user_id: UUID, intake: dict) -> Group:
         return await assign_user_to_group(db, user_id, intake)
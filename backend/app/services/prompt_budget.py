@@ -0,0 +1,79 @@
+"""Local token counting and token-budgeted prompt assembly (oldest turns dropped / truncated first)."""
+import logging
+import math
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_OVERHEAD_TOKENS = 4  # role + separators per chat message
+CHARS_PER_TOKEN = 4.0  # heuristic when tiktoken is not installed
+MIN_TRUNCATED_TURN_TOKENS = 16  # don't keep a sliver of a turn
+
+_encoding: Any = None
+_encoding_loaded = False
+
+
+def _get_encoding() -> Any:
+    """tiktoken cl100k_base if installed (optional dependency), else None for the character heuristic."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = None
+    return _encoding
+
+
+def count_tokens(text: str | None) -> int:
+    """Approximate token count of text (exact for OpenAI models when tiktoken is installed)."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def count_message_tokens(messages: list[dict]) -> int:
+    """Approximate prompt tokens for a chat.completions messages list."""
+    return sum(count_tokens(m.get("content")) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, keep_end: bool = False) -> str:
+    """Cut text to at most max_tokens, keeping the start (or the end with keep_end)."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        kept = tokens[-max_tokens:] if keep_end else tokens[:max_tokens]
+        return encoding.decode(kept)
+    max_chars = int(max_tokens * CHARS_PER_TOKEN)
+    return text[-max_chars:] if keep_end else text[:max_chars]
+
+
+def fit_turns(turns: list[dict], budget: int) -> list[dict]:
+    """
+    Newest turns that fit in budget tokens, in original order. Older turns are dropped first; the oldest
+    kept turn may be truncated (keeping its end) so the budget is used fully.
+    """
+    kept: list[dict] = []
+    remaining = budget
+    for turn in reversed(turns):
+        cost = count_tokens(turn.get("content")) + MESSAGE_OVERHEAD_TOKENS
+        if cost <= remaining:
+            kept.append(turn)
+            remaining -= cost
+            continue
+        room = remaining - MESSAGE_OVERHEAD_TOKENS
+        if room >= MIN_TRUNCATED_TURN_TOKENS:
+            kept.append({**turn, "content": truncate_to_tokens(turn.get("content") or "", room, keep_end=True)})
+        break
+    kept.reverse()
+    if len(kept) < len(turns):
+        logger.debug("Prompt budget %s tokens: kept %s of %s turns", budget, len(kept), len(turns))
+    return kept
@@ -0,0 +1,241 @@
+"""
+Per-chat-session conversation cache, written through on commit: history and extraction input come from here
+instead of re-selecting every ChatTurn. In-process LRU; with TURN_CACHE_REDIS_URL the conversation also lives
+in Redis (optional `redis` package) so every worker sees the same turns.
+"""
+import asyncio
+import itertools
+import json
+import logging
+from datetime import timezone
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.cache import TTLCache, get_redis
+from app.models.chat import ChatTurn
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "sage:turns:"
+_REDIS_HEAD = "__head__"  # first element of every Redis list, so a loaded empty conversation still exists
+_PENDING_KEY = "turn_cache_pending"
+
+# Populate only if absent: a writer that appended meanwhile must not be overwritten by an older read.
+_POPULATE_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 0 then
+  redis.call('rpush', KEYS[1], unpack(ARGV, 2))
+  redis.call('expire', KEYS[1], ARGV[1])
+end
+return 1
+"""
+
+
+def turn_to_dict(turn: ChatTurn) -> dict[str, Any]:
+    """JSON-safe cached form of a turn; role/content are what the LLM code reads."""
+    created_at = turn.created_at
+    if created_at is not None and created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)  # just flushed (utcnow default), not yet read back
+    return {
+        "id": str(turn.id),
+        "role": turn.role,
+        "content": turn.content,
+        "created_at": created_at.isoformat() if created_at else None,
+    }
+
+
+def _pending(db: AsyncSession | Session) -> list[tuple[str, str, list[dict]]]:
+    sync_session = db.sync_session if isinstance(db, AsyncSession) else db
+    return sync_session.info.setdefault(_PENDING_KEY, [])
+
+
+class TurnCache:
+    """
+    Conversation per chat session. Writes are staged on the DB session (stage_append / stage_clear) and applied
+    only after it commits, so rolled-back turns never reach the cache; load() in the same DB session sees them.
+    Without Redis each worker has its own LRU: run one worker, or set TURN_CACHE_REDIS_URL, or disable
+    (TURN_CACHE_MAX_SESSIONS=0) when several workers serve the same users.
+    """
+
+    def __init__(self) -> None:
+        self.local = TTLCache(settings.turn_cache_max_sessions, settings.turn_cache_ttl_sec)
+        # Write counter, and its value at each session's latest write (least recently written first), so a
+        # DB read that started before a write does not populate the cache with turns older than the write
+        self._writes = 0
+        self._last_write: dict[str, int] = {}
+        self._forgotten = 0  # latest write count dropped from _last_write
+        # Turns accepted by the write-behind buffer (turn_writer) but not committed yet, per session
+        self._unflushed: dict[str, list[dict]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def _get_redis(self) -> Any:
+        return get_redis(settings.turn_cache_redis_url)
+
+    @property
+    def enabled(self) -> bool:
+        return self.local.maxsize > 0 or self._get_redis() is not None
+
+    def _bump(self, key: str) -> None:
+        self._writes += 1
+        self._last_write.pop(key, None)
+        self._last_write[key] = self._writes
+        if len(self._last_write) > 4 * max(self.local.maxsize, 1):
+            # Forget the least recently written half; sessions not listed count as written at _forgotten
+            for old in list(itertools.islice(self._last_write, len(self._last_write) // 2)):
+                self._forgotten = self._last_write.pop(old)
+
+    def _written_since(self, key: str, mark: int) -> bool:
+        return self._last_write.get(key, self._forgotten) > mark
+
+    async def get(self, session_id: UUID) -> list[dict] | None:
+        """Cached turns in order, or None on a miss."""
+        key = str(session_id)
+        cached = self.local.get(key)
+        redis = self._get_redis()
+        if redis is None:
+            return list(cached) if cached is not None else None
+        try:
+            length = await redis.llen(REDIS_KEY_PREFIX + key)
+            if length == 0:
+                self.local.delete(key)
+                return None
+            # This worker's copy may already hold turns whose RPUSHX is still in flight
+            if cached is not None and len(cached) >= length - 1:
+                return list(cached)
+            raw = await redis.lrange(REDIS_KEY_PREFIX + key, 1, -1)
+        except Exception as e:
+            logger.warning("Turn cache: Redis read failed, loading from DB: %s", e)
+            return None
+        turns = [json.loads(item) for item in raw]
+        self.local.set(key, turns)
+        return list(turns)
+
+    async def _populate(self, key: str, turns: list[dict], mark: int) -> None:
+        if self._written_since(key, mark):
+            return  # a commit for this session landed while we were reading the DB
+        self.local.set(key, list(turns))
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                await redis.eval(
+                    _POPULATE_SCRIPT,
+                    1,
+                    REDIS_KEY_PREFIX + key,
+                    int(settings.turn_cache_ttl_sec),
+                    _REDIS_HEAD,
+                    *(json.dumps(t) for t in turns),
+                )
+            except Exception as e:
+                logger.warning("Turn cache: Redis populate failed: %s", e)
+
+    async def load(self, db: AsyncSession, session_id: UUID) -> list[dict]:
+        """
+        The session's turns as dicts (id, role, content, created_at), oldest first: from the cache plus anything
+        this DB session staged but has not committed yet, else one DB query that then fills the cache.
+        """
+        key = str(session_id)
+        staged = [op for op in _pending(db) if op[1] == key]
+        if self.enabled and not any(op[0] == "clear" for op in staged):
+            cached = await self.get(session_id)
+            if cached is not None:
+                for _, _, turns in staged:
+                    cached.extend(turns)
+                return self._with_unflushed(key, cached)
+        mark = self._writes
+        result = await db.execute(
+            select(ChatTurn).where(ChatTurn.chat_session_id == session_id).order_by(ChatTurn.created_at)
+        )
+        turns = [turn_to_dict(t) for t in result.scalars().all()]
+        # Rows flushed but not committed by this DB session must not be cached yet
+        if self.enabled and not staged:
+            await self._populate(key, turns, mark)
+        return self._with_unflushed(key, turns)
+
+    def _with_unflushed(self, key: str, turns: list[dict]) -> list[dict]:
+        unflushed = self._unflushed.get(key)
+        if not unflushed:
+            return turns
+        seen = {t["id"] for t in turns}  # the writer's commit may already have appended them
+        return turns + [t for t in unflushed if t["id"] not in seen]
+
+    def hold(self, session_id: UUID, turns: list[ChatTurn]) -> None:
+        """Make turns (id/created_at set) visible to load() in this process until release()."""
+        self._unflushed.setdefault(str(session_id), []).extend(turn_to_dict(t) for t in turns)
+
+    def release(self, session_id: UUID, turn_ids: set[str]) -> None:
+        """Turns were committed (and appended via stage_append) or given up on."""
+        key = str(session_id)
+        remaining = [t for t in self._unflushed.get(key, []) if t["id"] not in turn_ids]
+        if remaining:
+            self._unflushed[key] = remaining
+        else:
+            self._unflushed.pop(key, None)
+
+    def stage_append(self, db: AsyncSession, session_id: UUID, turns: list[ChatTurn]) -> None:
+        """Append turns (already flushed, so id/created_at are set) once db commits."""
+        _pending(db).append(("append", str(session_id), [turn_to_dict(t) for t in turns]))
+
+    def stage_clear(self, db: AsyncSession, session_id: UUID) -> None:
+        """Drop the session's conversation now and again once db commits (e.g. /restart)."""
+        self._apply("clear", str(session_id), [])
+        _pending(db).append(("clear", str(session_id), []))
+
+    def _apply(self, op: str, key: str, turns: list[dict]) -> None:
+        self._bump(key)
+        if op == "clear":
+            self.local.delete(key)
+        else:
+            cached = self.local.get(key)
+            if cached is not None:
+                self.local.set(key, cached + turns)
+        redis = self._get_redis()
+        if redis is not None:
+            task = asyncio.get_running_loop().create_task(self._apply_redis(op, key, turns))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _apply_redis(self, op: str, key: str, turns: list[dict]) -> None:
+        redis_key = REDIS_KEY_PREFIX + key
+        redis = self._get_redis()
+        try:
+            if op == "clear":
+                await redis.delete(redis_key)
+            elif turns:
+                # RPUSHX: only extend a conversation that is already cached in full
+                await redis.rpushx(redis_key, *(json.dumps(t) for t in turns))
+                await redis.expire(redis_key, int(settings.turn_cache_ttl_sec))
+        except Exception as e:
+            logger.warning("Turn cache: Redis %s failed, dropping cached conversation: %s", op, e)
+            try:
+                await redis.delete(redis_key)
+            except Exception:
+                pass
+
+    def _on_commit(self, session: Session) -> None:
+        for op, key, turns in session.info.pop(_PENDING_KEY, None) or []:
+            self._apply(op, key, turns)
+
+    def stats(self) -> dict[str, Any]:
+        return {**self.local.stats(), "shared": self._get_redis() is not None}
+
+    async def aclose(self) -> None:
+        """Wait for in-flight Redis writes (app shutdown); the client itself is closed with the other Redis clients."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+turn_cache = TurnCache()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_turns(session: Session) -> None:
+    turn_cache._on_commit(session)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending_turns(session: Session, previous_transaction: Any) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,174 @@
+"""
+Chat turn persistence modes (CHAT_TURN_WRITE_MODE):
+
+- "sync" (default): turns are flushed in the request's own transaction, as before.
+- "group_commit": turns go to a shared buffer that one background task writes every
+  CHAT_TURN_FLUSH_INTERVAL_MS (or as soon as CHAT_TURN_MAX_BATCH rows are waiting) as one multi-row INSERT per
+  batch; the request waits until its batch is committed. Same durability as "sync", fewer statements and
+  transactions under load.
+- "write_behind": like group_commit, but the request does not wait. Turns accepted in the last interval are
+  lost if the process dies, and dropped (logged, counted in stats) if the insert still fails after
+  CHAT_TURN_WRITE_RETRIES retries. Until written they are visible through turn_cache in this process only, so
+  with several workers another worker may briefly serve history without them.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.chat import ChatTurn
+from app.services.turn_cache import turn_cache
+
+logger = logging.getLogger(__name__)
+
+MODE_SYNC = "sync"
+MODE_GROUP_COMMIT = "group_commit"
+MODE_WRITE_BEHIND = "write_behind"
+RETRY_BASE_DELAY_SEC = 0.1
+
+
+class TurnWriter:
+    """Buffers ChatTurn rows from many requests and inserts them in batches (see module docstring for modes)."""
+
+    def __init__(self, mode: str, interval_ms: float, max_batch: int, retries: int) -> None:
+        if mode not in (MODE_SYNC, MODE_GROUP_COMMIT, MODE_WRITE_BEHIND):
+            raise ValueError(f"Unsupported CHAT_TURN_WRITE_MODE: {mode}")
+        self.mode = mode
+        self.interval = max(0.001, interval_ms / 1000)
+        self.max_batch = max(1, max_batch)
+        self.retries = max(0, retries)
+        self._buffer: list[tuple[ChatTurn, asyncio.Future | None]] = []
+        self._wakeup: asyncio.Event | None = None
+        self._lock: asyncio.Lock | None = None
+        self._task: asyncio.Task | None = None
+        self._closing = False
+        self.batches = 0
+        self.rows = 0
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != MODE_SYNC
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._lock = asyncio.Lock()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, session_id: UUID, turns: list[ChatTurn]) -> None:
+        """
+        Queue turns of one chat session (ids and created_at are filled in here, in order). In group_commit
+        mode returns once they are committed and raises if the insert failed; in write_behind mode returns at once.
+        """
+        now = datetime.utcnow()
+        for i, turn in enumerate(turns):
+            turn.id = turn.id or uuid4()
+            turn.chat_session_id = session_id
+            turn.created_at = turn.created_at or now + timedelta(microseconds=i)
+        turn_cache.hold(session_id, turns)
+        self._ensure_started()
+        done = asyncio.get_running_loop().create_future() if self.mode == MODE_GROUP_COMMIT else None
+        self._buffer.extend((turn, done) for turn in turns)
+        if len(self._buffer) >= self.max_batch:
+            self._wakeup.set()
+        if done is not None:
+            await done
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Turn writer: flush failed")
+
+    async def flush(self) -> None:
+        """Write everything buffered so far (also used before deleting a session's turns and at shutdown)."""
+        if self._lock is None:
+            return
+        async with self._lock:
+            while self._buffer:
+                batch, self._buffer = self._buffer[:self.max_batch], self._buffer[self.max_batch:]
+                await self._write(batch)
+
+    async def _write(self, batch: list[tuple[ChatTurn, asyncio.Future | None]]) -> None:
+        turns = [turn for turn, _ in batch]
+        by_session: dict[UUID, list[ChatTurn]] = defaultdict(list)
+        for turn in turns:
+            by_session[turn.chat_session_id].append(turn)
+        rows = [
+            {
+                "id": t.id,
+                "chat_session_id": t.chat_session_id,
+                "role": t.role,
+                "content": t.content,
+                "created_at": t.created_at,
+            }
+            for t in turns
+        ]
+        error: Exception | None = None
+        for attempt in range(self.retries + 1):
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(insert(ChatTurn).values(rows))
+                    for session_id, session_turns in by_session.items():
+                        turn_cache.stage_append(db, session_id, session_turns)
+                    await db.commit()
+                error = None
+                break
+            except Exception as e:
+                error = e
+                logger.warning("Turn writer: insert of %s turns failed (attempt %s): %s", len(rows), attempt + 1, e)
+                if attempt < self.retries:
+                    await asyncio.sleep(RETRY_BASE_DELAY_SEC * 2 ** attempt)
+        for session_id, session_turns in by_session.items():
+            turn_cache.release(session_id, {str(t.id) for t in session_turns})
+        if error is None:
+            self.batches += 1
+            self.rows += len(rows)
+        else:
+            self.dropped += len(rows)
+            logger.error("Turn writer: dropped %s turns after %s attempts: %s", len(rows), self.retries + 1, error)
+        for _, done in batch:
+            if done is not None and not done.done():
+                if error is None:
+                    done.set_result(None)
+                else:
+                    done.set_exception(error)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "buffered": len(self._buffer),
+            "batches": self.batches,
+            "rows": self.rows,
+            "dropped": self.dropped,
+        }
+
+    async def aclose(self) -> None:
+        """Stop the background task after it has written what is still buffered (app shutdown)."""
+        self._closing = True
+        if self._task is not None:
+            self._wakeup.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+
+turn_writer = TurnWriter(
+    settings.chat_turn_write_mode,
+    settings.chat_turn_flush_interval_ms,
+    settings.chat_turn_max_batch,
+    settings.chat_turn_write_retries,
+)
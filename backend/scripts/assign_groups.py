@@ -0,0 +1,102 @@
+"""
+Run the batch group assignment optimizer (GROUP_ASSIGNMENT=batch) once.
+Run from backend folder:
+  python scripts/assign_groups.py [--dry-run] [--capacity 12] [--min-size 6] [--limit N]
+  python scripts/assign_groups.py --synthetic 20000   # plan random intakes in memory, no database
+--dry-run plans against the database and rolls back; --synthetic times the planner on generated intakes.
+Against the database it runs only with GROUP_ASSIGNMENT=batch (or --force), since in immediate mode an intake
+without a group was left unassigned on purpose.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import settings
+from app.models.intake import IntakeResult
+from app.services.group_assignment import GroupSlot, build_plan, run_batch_assignment
+from app.services.group_registry import GroupInfo
+from app.services.matching import DEFAULT_GROUPS
+
+CONCERNS = {
+    "anxiety_stress": ["constant worry and panic attacks", "stress at work keeps me up at night"],
+    "depression_mood": ["feeling low and hopeless for months", "no motivation, everything feels empty"],
+    "grief_loss": ["my mother died last year", "grieving the loss of my partner"],
+    "relationships": ["my marriage is falling apart", "conflict with my family all the time"],
+    "general": ["not sure what is wrong", "life feels off lately"],
+}
+AVAILABILITY = ["weekday evenings", "weekends", "Tue/Thu after 6pm", "mornings", "anytime", None]
+
+
+def synthetic_rows(count: int, seed: int) -> list[IntakeResult]:
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        concern = rng.choice(rng.choice(list(CONCERNS.values())))
+        rows.append(IntakeResult(
+            id=uuid4(),
+            user_id=uuid4(),
+            primary_concern=concern,
+            emotional_intensity=rng.randint(1, 5),
+            availability=rng.choice(AVAILABILITY),
+        ))
+    return rows
+
+
+async def run_synthetic(count: int, capacity: int, min_size: int, seed: int) -> dict:
+    groups = [GroupInfo(id=uuid4(), name=name, focus=focus, created_at=None) for name, focus in DEFAULT_GROUPS]
+    slots = [GroupSlot(focus=g.focus, name=g.name, group_id=g.id) for g in groups]
+    rows = synthetic_rows(count, seed)
+    started = time.perf_counter()
+    plan = await build_plan(rows, slots, groups, capacity, min_size)
+    summary = plan.summary()
+    summary["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    sizes = [s.size for s in slots + plan.new_groups if s.size]
+    summary["group_sizes"] = {"min": min(sizes), "max": max(sizes)} if sizes else None
+    return summary
+
+
+async def run_database(capacity: int, min_size: int, limit: int | None, dry_run: bool) -> dict | None:
+    from app.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        plan = await run_batch_assignment(db, capacity, min_size, limit, dry_run)
+        if dry_run:
+            await db.rollback()
+        else:
+            await db.commit()
+    return plan.summary() if plan is not None else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Place pending intakes into groups with the batch optimizer")
+    parser.add_argument("--capacity", type=int, default=settings.group_capacity)
+    parser.add_argument("--min-size", type=int, default=settings.group_min_size)
+    parser.add_argument("--limit", type=int, help="At most this many pending intakes")
+    parser.add_argument("--dry-run", action="store_true", help="Plan only; roll back")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="Plan N generated intakes without a database")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--force", action="store_true", help="Run even when GROUP_ASSIGNMENT is not batch")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        summary = asyncio.run(run_synthetic(args.synthetic, args.capacity, args.min_size, args.seed))
+    else:
+        if settings.group_assignment != "batch" and not (args.force or args.dry_run):
+            print("GROUP_ASSIGNMENT is not batch; use --force to place unassigned intakes anyway.", file=sys.stderr)
+            sys.exit(1)
+        summary = asyncio.run(run_database(args.capacity, args.min_size, args.limit, args.dry_run))
+        if summary is None:
+            print("Another batch assignment is running; nothing done.", file=sys.stderr)
+            sys.exit(1)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
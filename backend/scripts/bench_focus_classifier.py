@@ -0,0 +1,74 @@
+"""
+Accuracy and speed of the keyword focus classifier (matching fallback) on a labelled corpus.
+Run from backend folder:
+  python scripts/bench_focus_classifier.py [--corpus scripts/data/focus_corpus.jsonl] [--keywords FILE]
+      [--iterations 2000] [--min-accuracy 0.9] [--verbose]
+Corpus: one JSON object per line, {"focus": "<expected focus key>", "intake": {...intake fields...}}.
+Exits 1 if accuracy is below --min-accuracy (use after editing keyword tables).
+"""
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services import matching
+from app.services.focus_classifier import FocusClassifier, load_keyword_tables
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "data" / "focus_corpus.jsonl"
+
+
+def load_corpus(path: Path) -> list[tuple[str, dict]]:
+    rows = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            item = json.loads(line)
+            rows.append((item["focus"], item["intake"]))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the keyword focus classifier on a labelled corpus")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--keywords", help="Keyword tables JSON (default: MATCHING_KEYWORDS_FILE or bundled)")
+    parser.add_argument("--iterations", type=int, default=2000, help="Passes over the corpus for timing")
+    parser.add_argument("--min-accuracy", type=float, default=0.9)
+    parser.add_argument("--verbose", action="store_true", help="Print each misclassified intake")
+    args = parser.parse_args()
+
+    if args.keywords:
+        matching.focus_classifier = FocusClassifier(load_keyword_tables(args.keywords))
+    corpus = load_corpus(args.corpus)
+    confusion: Counter[tuple[str, str]] = Counter()
+    for expected, intake in corpus:
+        predicted, reason = matching._match_focus(intake)
+        confusion[(expected, predicted)] += 1
+        if predicted != expected and args.verbose:
+            print(f"MISS expected={expected} got={predicted}: {intake.get('primary_concern')!r} ({reason})")
+    correct = sum(n for (expected, predicted), n in confusion.items() if expected == predicted)
+    accuracy = correct / len(corpus) if corpus else 0.0
+
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        for _, intake in corpus:
+            matching._match_focus(intake)
+    elapsed = time.perf_counter() - started
+    per_call_us = elapsed / max(1, args.iterations * len(corpus)) * 1e6
+
+    print(f"Accuracy: {correct}/{len(corpus)} = {accuracy:.1%}")
+    for focus in sorted({expected for expected, _ in corpus}):
+        total = sum(n for (e, _), n in confusion.items() if e == focus)
+        hits = confusion[(focus, focus)]
+        wrong = ", ".join(f"{p}={n}" for (e, p), n in sorted(confusion.items()) if e == focus and p != focus)
+        print(f"  {focus}: {hits}/{total}" + (f" (misrouted: {wrong})" if wrong else ""))
+    print(f"Speed: {per_call_us:.1f} us per intake ({args.iterations * len(corpus)} classifications)")
+    if accuracy < args.min_accuracy:
+        print(f"Accuracy below {args.min_accuracy:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
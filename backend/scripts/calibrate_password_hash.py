@@ -0,0 +1,82 @@
+"""
+Measure password hashing on this host and print the cost settings that meet a target latency per hash.
+Run from backend folder (on the deployment host, with nothing else busy):
+  python scripts/calibrate_password_hash.py --target-ms 250 [--kdf pbkdf2_sha256|scrypt]
+Put the printed lines in backend/.env; existing hashes are upgraded on each user's next login.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.passwords import KDF_PBKDF2, KDF_SCRYPT, hash_password
+
+SAMPLE_PASSWORD = "calibration-password"
+PBKDF2_ROUNDING = 10_000
+PBKDF2_MIN_ITERATIONS = 100_000  # don't recommend less than the historical default
+SCRYPT_MIN_LOG2_N = 14
+SCRYPT_MAX_LOG2_N = 20
+
+
+def measure_ms(kdf: str, cost: dict[str, int], repeats: int) -> float:
+    """Median wall time of one hash in ms."""
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        hash_password(SAMPLE_PASSWORD, kdf=kdf, cost=cost)
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def calibrate_pbkdf2(target_ms: float, repeats: int) -> tuple[dict[str, int], float]:
+    probe = {"iterations": 50_000}
+    per_iteration = measure_ms(KDF_PBKDF2, probe, repeats) / probe["iterations"]
+    iterations = int(target_ms / per_iteration) // PBKDF2_ROUNDING * PBKDF2_ROUNDING
+    cost = {"iterations": max(PBKDF2_MIN_ITERATIONS, iterations)}
+    return cost, measure_ms(KDF_PBKDF2, cost, repeats)
+
+
+def calibrate_scrypt(target_ms: float, repeats: int, r: int, p: int) -> tuple[dict[str, int], float]:
+    """Largest power-of-two N (at least 2**14) whose hash stays within the target."""
+    best = {"n": 2 ** SCRYPT_MIN_LOG2_N, "r": r, "p": p}
+    best_ms = measure_ms(KDF_SCRYPT, best, repeats)
+    for log2_n in range(SCRYPT_MIN_LOG2_N + 1, SCRYPT_MAX_LOG2_N + 1):
+        cost = {"n": 2 ** log2_n, "r": r, "p": p}
+        elapsed = measure_ms(KDF_SCRYPT, cost, repeats)
+        if elapsed > target_ms:
+            break
+        best, best_ms = cost, elapsed
+    return best, best_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pick password hashing cost for a target latency on this host")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Target time per hash (default 250 ms)")
+    parser.add_argument("--kdf", choices=(KDF_PBKDF2, KDF_SCRYPT), default=KDF_PBKDF2)
+    parser.add_argument("--repeats", type=int, default=5, help="Hashes per measurement (median is used)")
+    parser.add_argument("--scrypt-r", type=int, default=8)
+    parser.add_argument("--scrypt-p", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.kdf == KDF_SCRYPT:
+        cost, elapsed = calibrate_scrypt(args.target_ms, args.repeats, args.scrypt_r, args.scrypt_p)
+        lines = [
+            f"PASSWORD_KDF={KDF_SCRYPT}",
+            f"PASSWORD_SCRYPT_N={cost['n']}",
+            f"PASSWORD_SCRYPT_R={cost['r']}",
+            f"PASSWORD_SCRYPT_P={cost['p']}",
+        ]
+    else:
+        cost, elapsed = calibrate_pbkdf2(args.target_ms, args.repeats)
+        lines = [f"PASSWORD_KDF={KDF_PBKDF2}", f"PASSWORD_PBKDF2_ITERATIONS={cost['iterations']}"]
+    print(f"Measured {elapsed:.0f} ms per hash (target {args.target_ms:.0f} ms). Suggested backend/.env:")
+    print("\n".join(lines))
+    if elapsed > args.target_ms * 1.2:
+        print("Note: the minimum recommended cost is slower than the target on this host.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible stand-in for Groq/OpenAI, for offline load testing of the real chat pipeline.
+Serves POST /v1/chat/completions (plain, response_format=json_object, and stream=true) with configurable
+latency distribution and 429/5xx error rates, and can record real upstream responses and replay them.
+
+Run from backend folder:
+  python scripts/fake_llm_server.py --port 9100 --latency-dist lognormal --latency-ms 800 --error-429 0.02
+Point the backend at it (backend/.env):
+  GROQ_API_KEY=fake
+  GROQ_BASE_URL=http://127.0.0.1:9100/v1
+
+Record against a real provider, then replay offline:
+  python scripts/fake_llm_server.py --record rec.jsonl --upstream https://api.groq.com/openai/v1 --upstream-key $KEY
+  python scripts/fake_llm_server.py --replay rec.jsonl
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.core.cache import content_key
+from app.services.llm import _mock_reply
+from app.services.prompt_budget import count_message_tokens, count_tokens
+
+SYNTHETIC_INTAKE_STEPS = [
+    ("primary_concern", "Anxiety"),
+    ("emotional_intensity", 3),
+    ("life_impact_areas", ["work", "sleep"]),
+    ("support_goals", "Feel less alone and learn coping strategies"),
+    ("availability", "Weekday evenings"),
+]
+
+
+def _request_key(body: dict) -> str:
+    """Replay key: the conversation and output format (not model, stream or max_tokens)."""
+    messages = [[m.get("role"), m.get("content")] for m in body.get("messages") or []]
+    return content_key(messages, (body.get("response_format") or {}).get("type"))
+
+
+def _synthetic_intake(steps: int) -> dict:
+    """Intake JSON with the first `steps` fields filled, so completion is reached after a few user turns."""
+    result = {key: None for key, _ in SYNTHETIC_INTAKE_STEPS}
+    result["life_impact_areas"] = []
+    for key, value in SYNTHETIC_INTAKE_STEPS[:steps]:
+        result[key] = value
+    return result
+
+
+def _filled_steps(previous_json: str) -> int:
+    previous = json.loads(previous_json)
+    return sum(1 for key, _ in SYNTHETIC_INTAKE_STEPS if previous.get(key) not in (None, []))
+
+
+def _synthetic_content(body: dict) -> str:
+    """
+    Plausible reply: chat text from the keyword mock, intake JSON filled in as the user says more, a group pick,
+    or the combined {"reply", "intake"} object.
+    """
+    messages = body.get("messages") or []
+    system = next((m.get("content") or "" for m in messages if m.get("role") == "system"), "")
+    last_user = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+    if (body.get("response_format") or {}).get("type") != "json_object":
+        return _mock_reply(last_user, messages)
+    if "match a user to exactly one support group" in system:
+        groups_text = last_user.split("Available groups", 1)[-1]
+        foci = re.findall(r'"focus":\s*"([^"]+)"', groups_text) or ["general"]
+        return json.dumps({"focus": random.choice(foci), "match_reason": "Synthetic match from the local LLM stand-in."})
+    if "- reply (string)" in system:
+        steps = sum(1 for m in messages if m.get("role") == "user")
+        for m in messages[1:]:
+            if m.get("role") == "system" and m.get("content", "").startswith("Intake extracted so far"):
+                steps = max(steps, _filled_steps(m["content"].splitlines()[1]) + 1)
+        return json.dumps({"reply": _mock_reply(last_user, messages), "intake": _synthetic_intake(steps)})
+    steps = last_user.count("USER:") or 1
+    if last_user.startswith("Intake extracted so far"):
+        steps += _filled_steps(last_user.splitlines()[1])
+    return json.dumps(_synthetic_intake(steps))
+
+
+class StandIn:
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.recorded: dict[str, str] = {}
+        self.record_file = Path(args.record) if args.record else None
+        if args.replay:
+            for line in Path(args.replay).read_text(encoding="utf-8").splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    self.recorded[entry["key"]] = entry["content"]
+            print(f"Loaded {len(self.recorded)} recorded responses from {args.replay}", flush=True)
+        self.upstream = httpx.AsyncClient(base_url=args.upstream, timeout=60.0) if args.upstream else None
+
+    def latency(self) -> float:
+        """Seconds to wait before answering (first token when streaming)."""
+        median = self.args.latency_ms / 1000.0
+        if self.args.latency_dist == "fixed":
+            return median
+        if self.args.latency_dist == "uniform":
+            return random.uniform(0, 2 * median)
+        return random.lognormvariate(math.log(max(median, 1e-6)), self.args.latency_sigma)
+
+    def injected_error(self) -> JSONResponse | None:
+        roll = random.random()
+        if roll < self.args.error_429:
+            return JSONResponse(
+                status_code=429,
+                content={"error": {"message": "Rate limit reached (stand-in)", "type": "rate_limit_exceeded"}},
+                headers={
+                    "retry-after": str(self.args.retry_after),
+                    "x-ratelimit-remaining-requests": "0",
+                    "x-ratelimit-reset-requests": f"{self.args.retry_after}s",
+                },
+            )
+        if roll < self.args.error_429 + self.args.error_5xx:
+            code = random.choice((500, 502, 503))
+            return JSONResponse(status_code=code, content={"error": {"message": f"Upstream error {code} (stand-in)"}})
+        return None
+
+    async def content_for(self, body: dict) -> str | None:
+        key = _request_key(body)
+        if key in self.recorded:
+            return self.recorded[key]
+        if self.upstream is not None:
+            payload = {**body, "stream": False}
+            headers = {"Authorization": f"Bearer {self.args.upstream_key}"}
+            resp = await self.upstream.post("/chat/completions", json=payload, headers=headers)
+            resp.raise_for_status()
+            content = resp.json()["choices"][0]["message"]["content"] or ""
+            self.recorded[key] = content
+            if self.record_file is not None:
+                with self.record_file.open("a", encoding="utf-8") as f:
+                    f.write(json.dumps({"key": key, "request": body.get("messages"), "content": content}) + "\n")
+            return content
+        if self.args.replay and self.args.replay_strict:
+            return None
+        return _synthetic_content(body)
+
+
+def build_app(stand_in: StandIn) -> FastAPI:
+    app = FastAPI(title="Sage LLM stand-in")
+
+    @app.post("/v1/chat/completions")
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        error = stand_in.injected_error()
+        if error is not None:
+            await asyncio.sleep(stand_in.latency() / 4)
+            return error
+        content = await stand_in.content_for(body)
+        if content is None:
+            return JSONResponse(status_code=404, content={"error": {"message": "No recorded response (--replay-strict)"}})
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = body.get("model") or "stand-in"
+        usage = {
+            "prompt_tokens": count_message_tokens(body.get("messages") or []),
+            "completion_tokens": count_tokens(content),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        remaining = {"x-ratelimit-remaining-requests": "1000", "x-ratelimit-reset-requests": "1s"}
+
+        if not body.get("stream"):
+            await asyncio.sleep(stand_in.latency())
+            return JSONResponse(
+                content={
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                    "usage": usage,
+                },
+                headers=remaining,
+            )
+
+        def chunk(delta: dict, finish_reason: str | None = None) -> str:
+            data = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(data)}\n\n"
+
+        async def events():
+            await asyncio.sleep(stand_in.latency())
+            yield chunk({"role": "assistant", "content": ""})
+            for piece in re.findall(r"\S+\s*", content):
+                yield chunk({"content": piece})
+                await asyncio.sleep(stand_in.args.token_delay_ms / 1000.0)
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers=remaining)
+
+    @app.on_event("shutdown")
+    async def shutdown():
+        if stand_in.upstream is not None:
+            await stand_in.upstream.aclose()
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible LLM stand-in for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-dist", choices=("fixed", "uniform", "lognormal"), default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=600.0, help="Median latency (to first token when streaming)")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Lognormal sigma (tail heaviness)")
+    parser.add_argument("--token-delay-ms", type=float, default=15.0, help="Delay between streamed chunks")
+    parser.add_argument("--error-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="Fraction of requests answered with 500/502/503")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on injected 429s")
+    parser.add_argument("--record", help="Append upstream responses to this JSONL file (needs --upstream)")
+    parser.add_argument("--upstream", help="Real OpenAI-compatible base URL to record from")
+    parser.add_argument("--upstream-key", default="", help="API key for --upstream")
+    parser.add_argument("--replay", help="JSONL file of recorded responses to serve")
+    parser.add_argument("--replay-strict", action="store_true", help="404 on replay miss instead of synthesizing")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible runs")
+    args = parser.parse_args()
+    if args.record and not args.upstream:
+        parser.error("--record needs --upstream")
+    if args.seed is not None:
+        random.seed(args.seed)
+    uvicorn.run(build_app(StandIn(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,14 +9,14 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from sqlalchemy import update
 
-from app.api.auth import _hash_password
+from app.core.passwords import hash_password
 from app.database import AsyncSessionLocal, init_db
 from app.models.user import User
 
 
 async def set_password(email: str, password: str) -> bool:
     await init_db()
-    hashed = _hash_password(password)
+    hashed = hash_password(password)
     async with AsyncSessionLocal() as session:
         result = await session.execute(update(User).where(User.email == email).values(hashed_password=hashed))
         await session.commit()
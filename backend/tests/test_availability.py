@@ -0,0 +1,75 @@
+from app.services.availability import (
+    DAYS,
+    MINUTES_PER_DAY,
+    WeeklySlot,
+    availability_buckets,
+    availability_overlap,
+    propose_weekly_slots,
+    weekly_intervals,
+)
+
+PARTS = ("morning", "afternoon", "evening")
+WEEKDAY_BUCKETS = {f"{d}_{p}" for d in DAYS[:5] for p in PARTS}
+
+
+def _days(intervals):
+    return sorted({start // MINUTES_PER_DAY for start, _ in intervals})
+
+
+def test_unknown_text_has_no_buckets():
+    assert availability_buckets(None) == frozenset()
+    assert availability_buckets("not sure yet") == frozenset()
+    assert weekly_intervals("not sure yet") == ()
+
+
+def test_named_days_and_parts():
+    assert availability_buckets("Tue/Thu evenings") == {"tue_evening", "thu_evening"}
+    assert availability_buckets("weekends") == {f"{d}_{p}" for d in ("sat", "sun") for p in PARTS}
+
+
+def test_negated_weekends_leave_weekdays():
+    for text in ("not available on weekends", "can't do weekends", "busy on weekends", "I can’t make weekends"):
+        assert availability_buckets(text) == WEEKDAY_BUCKETS, text
+        assert _days(weekly_intervals(text)) == [0, 1, 2, 3, 4], text
+
+
+def test_negation_applies_to_its_clause_only():
+    assert availability_buckets("evenings, not Fridays") == {f"{d}_evening" for d in DAYS if d != "fri"}
+    assert availability_buckets("weekdays except Wed, 6-8pm") == {f"{d}_evening" for d in ("mon", "tue", "thu", "fri")}
+    assert availability_buckets("busy on weekends, free weekday evenings") == {f"{d}_evening" for d in DAYS[:5]}
+
+
+def test_negated_part_of_day():
+    buckets = availability_buckets("no mornings")
+    assert buckets and not any(b.endswith("_morning") for b in buckets)
+    assert weekly_intervals("no mornings")[0] == (12 * 60, 22 * 60)
+
+
+def test_buckets_follow_clock_windows():
+    # "10-2pm" runs from morning into afternoon; both views must say so
+    assert availability_buckets("10-2pm weekdays") == {f"{d}_{p}" for d in DAYS[:5] for p in ("morning", "afternoon")}
+    assert weekly_intervals("10-2pm weekdays")[0] == (10 * 60, 14 * 60)
+    assert availability_buckets("Tue/Thu after 6pm") == {"tue_evening", "thu_evening"}
+
+
+def test_overlap():
+    a = availability_buckets("weekday evenings")
+    assert availability_overlap(a, a) == 1.0
+    assert availability_overlap(a, availability_buckets("weekend mornings")) == 0.0
+    assert availability_overlap(a, frozenset()) == 0.5
+
+
+def test_propose_picks_most_common_window():
+    slots = propose_weekly_slots(["Tue/Thu after 6pm", "Tue/Thu after 6pm", "weekday evenings", None], 2, 90)
+    assert slots == [WeeklySlot(1, 18 * 60, 4), WeeklySlot(3, 18 * 60, 4)]
+
+
+def test_propose_short_windows_stay_on_named_days():
+    # No window fits 90 minutes: sessions still start inside the windows members named
+    slots = propose_weekly_slots(["Mondays 7pm-8pm", "Mondays 7pm-8pm"], 3, 90)
+    assert slots == [WeeklySlot(0, 19 * 60, 2)]
+
+
+def test_propose_without_availability_falls_back():
+    slots = propose_weekly_slots([None, "no idea"], 2, 90, fallback_day=5)
+    assert [(s.day, s.minute, s.available) for s in slots] == [(5, 18 * 60, 2), (6, 18 * 60, 2)]
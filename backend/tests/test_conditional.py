@@ -0,0 +1,54 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.conditional import CACHE_CONTROL, ConditionalRequest, conditional_request, etag_matches, make_etag
+
+
+def test_make_etag_is_stable_and_quoted():
+    row_id, updated = uuid4(), datetime(2024, 5, 1, tzinfo=timezone.utc)
+    etag = make_etag(row_id, updated)
+    assert etag == make_etag(row_id, updated)
+    assert etag.startswith('"') and etag.endswith('"') and len(etag) == 34
+    assert etag != make_etag(row_id, datetime(2024, 5, 2, tzinfo=timezone.utc))
+
+
+def test_etag_matches():
+    etag = make_etag("x")
+    other = make_etag("y")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f"W/{etag}", etag)  # weak comparison
+    assert etag_matches(f"{other}, {etag}", etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(other, etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches("", etag)
+    assert not etag_matches(etag.strip('"'), etag)  # unquoted is a different tag
+
+
+def test_conditional_get_round_trip():
+    app = FastAPI()
+    state = {"version": 1}
+
+    @app.get("/item")
+    def item(cond: ConditionalRequest = Depends(conditional_request)):
+        if cond.matches("item", state["version"]):
+            return cond.not_modified()
+        return {"version": state["version"]}
+
+    client = TestClient(app)
+    first = client.get("/item")
+    assert first.status_code == 200 and first.json() == {"version": 1}
+    assert first.headers["Cache-Control"] == CACHE_CONTROL
+    etag = first.headers["ETag"]
+
+    again = client.get("/item", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["ETag"] == etag
+
+    state["version"] = 2
+    changed = client.get("/item", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.json() == {"version": 2}
+    assert changed.headers["ETag"] != etag
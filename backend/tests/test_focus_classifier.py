@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from app.services import matching
+from app.services.focus_classifier import PRIMARY_CONCERN_WEIGHT, FocusClassifier, load_keyword_tables
+
+CORPUS = Path(__file__).resolve().parent.parent / "scripts" / "data" / "focus_corpus.jsonl"
+
+
+def test_bundled_tables_classify_the_whole_corpus(monkeypatch):
+    monkeypatch.setattr(matching, "focus_classifier", FocusClassifier(load_keyword_tables()))
+    rows = [json.loads(line) for line in CORPUS.read_text(encoding="utf-8").splitlines() if line.strip()]
+    misses = [
+        (row["focus"], predicted, row["intake"].get("primary_concern"))
+        for row in rows
+        if (predicted := matching._match_focus(row["intake"])[0]) != row["focus"]
+    ]
+    assert rows and misses == []
+
+
+def test_tie_goes_to_the_focus_listed_first():
+    classifier = FocusClassifier({"grief_loss": {"loss": 1.0}, "workplace_burnout": {"work": 1.0}})
+    assert classifier.classify("loss at work", "").focus == "grief_loss"
+    reordered = FocusClassifier({"workplace_burnout": {"work": 1.0}, "grief_loss": {"loss": 1.0}})
+    assert reordered.classify("loss at work", "").focus == "workplace_burnout"
+
+
+def test_longest_keyword_wins_at_the_same_position():
+    classifier = FocusClassifier({"grief_loss": {"lost my": 3.0}, "workplace_burnout": {"lost my job": 2.0}})
+    best = classifier.classify("I lost my job in May", "")
+    assert best.focus == "workplace_burnout"
+    assert best.terms == ("lost my job",)
+    assert classifier.classify("I lost my mother", "").focus == "grief_loss"
+
+
+def test_bundled_tables_route_job_loss_to_burnout():
+    assert FocusClassifier(load_keyword_tables()).classify("I lost my job last month", "").focus == "workplace_burnout"
+
+
+def test_primary_concern_counts_more_and_prefixes_match():
+    classifier = FocusClassifier({"anxiety_stress_management": {"anxi": 1.0}, "grief_loss": {"grie": 1.5}})
+    scores = classifier.scores("anxious all the time", "grieving")
+    assert [(s.focus, s.score) for s in scores] == [
+        ("anxiety_stress_management", pytest.approx(PRIMARY_CONCERN_WEIGHT)),
+        ("grief_loss", pytest.approx(1.5)),
+    ]
+    assert classifier.classify("nothing relevant", "") is None
@@ -0,0 +1,101 @@
+import itertools
+import random
+from uuid import uuid4
+
+import pytest
+
+from app.services.availability import availability_buckets
+from app.services.group_assignment import (
+    GroupSlot,
+    PendingIntake,
+    _fill_open_seats,
+    _min_cost_transport,
+    placement_cost,
+    plan_assignments,
+)
+
+AVAILABILITY = ["weekday evenings", "weekends", "Tue/Thu after 6pm", "mornings", None]
+
+
+def _intake(focus="anxiety_stress", intensity=3, availability=None):
+    return PendingIntake(uuid4(), uuid4(), focus, "", intensity, availability_buckets(availability))
+
+
+def _group(name="G", focus="anxiety_stress", members=()):
+    slot = GroupSlot(focus=focus, name=name, group_id=uuid4())
+    for intensity, availability in members:
+        slot.add(intensity, availability_buckets(availability))
+    return slot
+
+
+def test_placement_cost_terms():
+    group = _group(members=[(3, "weekday evenings"), (3, "weekday evenings")])
+    assert placement_cost(_intake(intensity=3, availability="weekday evenings"), group, 3.0) == 0.0
+    # Intensity 5 moves the mean to 11/3; 1..5 spans 4
+    assert placement_cost(_intake(intensity=5, availability="weekday evenings"), group, 3.0) == pytest.approx(2 / 3 / 4)
+    assert placement_cost(_intake(intensity=3, availability="weekend mornings"), group, 3.0) == 1.0
+    assert placement_cost(_intake(intensity=None, availability=None), group, 3.0) == 0.5
+
+
+def test_min_cost_transport_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(50):
+        supply = [rng.randint(0, 3) for _ in range(3)]
+        seats = [rng.randint(0, 3) for _ in range(3)]
+        cost = [[rng.random() for _ in seats] for _ in supply]
+        flows = _min_cost_transport(supply, seats, cost)
+        units = [r for r, n in enumerate(supply) for _ in range(n)]
+        moved = min(len(units), sum(seats))
+        columns = [c for c, n in enumerate(seats) for _ in range(n)]
+        best = min(
+            sum(cost[r][c] for r, c in zip(rows, cols))
+            for rows in itertools.combinations(units, moved)
+            for cols in itertools.permutations(columns, moved)
+        )
+        assert sum(flows.values()) == moved
+        assert all(sum(n for (r, _), n in flows.items() if r == row) <= supply[row] for row in range(3))
+        assert all(sum(n for (_, c), n in flows.items() if c == col) <= seats[col] for col in range(3))
+        assert sum(cost[r][c] * n for (r, c), n in flows.items()) == pytest.approx(best)
+
+
+def test_fill_open_seats_is_exact_on_small_case():
+    rng = random.Random(3)
+    pool = [_intake(intensity=rng.randint(1, 5), availability=rng.choice(AVAILABILITY)) for _ in range(5)]
+    groups = [
+        _group(f"G{i}", members=[(rng.randint(1, 5), rng.choice(AVAILABILITY)) for _ in range(2)]) for i in range(3)
+    ]
+    target = 3.0
+    cost = [[placement_cost(intake, group, target) for group in groups] for intake in pool]
+    best = min(
+        sum(cost[i][g] for i, g in enumerate(choice))
+        for choice in itertools.product(range(3), repeat=len(pool))
+        if all(choice.count(g) <= 2 for g in range(3))
+    )
+    placements = []
+    assert _fill_open_seats(list(pool), groups, 4, target, placements) == []
+    assert sum(p.cost for p in placements) == pytest.approx(best)
+    assert all(g.size <= 4 for g in groups)
+
+
+def test_plan_fills_seats_then_opens_even_subgroups():
+    existing = _group("Anxiety", members=[(3, "weekday evenings")] * 10)
+    intakes = [_intake(intensity=1 + i % 5, availability="weekday evenings") for i in range(2 + 20)]
+    plan = plan_assignments(intakes, [existing], capacity=12, min_size=6)
+    assert existing.size == 12
+    assert [g.size for g in plan.new_groups] == [10, 10]
+    assert [g.name for g in plan.new_groups] == ["Anxiety 2", "Anxiety 3"]
+    assert len(plan.placements) == 22 and not plan.deferred
+
+
+def test_plan_defers_too_few_for_a_group():
+    intakes = [_intake(focus="grief_loss", availability="weekends") for _ in range(3)]
+    plan = plan_assignments(intakes, [], capacity=12, min_size=6)
+    assert not plan.placements and not plan.new_groups
+    assert len(plan.deferred) == 3
+
+
+def test_subgroups_get_a_similar_intensity_mix():
+    intakes = [_intake(intensity=1 + i % 5, availability="mornings") for i in range(20)]
+    plan = plan_assignments(intakes, [], capacity=10, min_size=6)
+    means = [g.intensity_sum / g.intensity_count for g in plan.new_groups]
+    assert len(means) == 2 and max(means) - min(means) <= 0.2
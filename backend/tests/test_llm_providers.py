@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from app.services.llm_providers import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    AIMDLimiter,
+    CircuitBreaker,
+    ProviderUnavailableError,
+    TokenBucket,
+    parse_duration,
+)
+
+
+def test_parse_duration():
+    assert parse_duration("2") == 2.0
+    assert parse_duration("6ms") == pytest.approx(0.006)
+    assert parse_duration("1m30.5s") == pytest.approx(90.5)
+    assert parse_duration("") is None
+    assert parse_duration("soon") is None
+
+
+def test_aimd_grows_additively_and_halves_on_overload():
+    async def run():
+        limiter = AIMDLimiter(initial=4, minimum=1, maximum=5, max_wait=0.01)
+        await limiter.acquire()
+        await limiter.release("success")
+        assert limiter.limit == pytest.approx(4.25)
+        await limiter.acquire()
+        await limiter.release("overload")
+        assert limiter.limit == pytest.approx(2.125)
+        await limiter.acquire()
+        await limiter.release("neutral")
+        assert limiter.limit == pytest.approx(2.125) and limiter.in_flight == 0
+        for _ in range(4):
+            await limiter.acquire()
+            await limiter.release("overload")
+        assert limiter.limit == 1.0
+
+    asyncio.run(run())
+
+
+def test_aimd_sheds_load_past_max_wait():
+    async def run():
+        limiter = AIMDLimiter(initial=1, minimum=1, maximum=4, max_wait=0.01)
+        await limiter.acquire()
+        with pytest.raises(ProviderUnavailableError):
+            await limiter.acquire()
+        await limiter.release("success")
+        await limiter.acquire()  # the window is free again
+
+    asyncio.run(run())
+
+
+def test_token_bucket_rate_and_headers():
+    async def run():
+        bucket = TokenBucket(rate_per_sec=1.0, capacity=2, max_wait=0.01)
+        await bucket.acquire()
+        await bucket.acquire()
+        with pytest.raises(ProviderUnavailableError):
+            await bucket.acquire()  # the next token is a second away
+
+        unlimited = TokenBucket(rate_per_sec=0, capacity=1, max_wait=0.01)
+        for _ in range(10):
+            await unlimited.acquire()
+        unlimited.observe_headers({"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "2s"})
+        with pytest.raises(ProviderUnavailableError):
+            await unlimited.acquire()
+
+        paused = TokenBucket(rate_per_sec=0, capacity=1, max_wait=0.01)
+        paused.observe_headers({"retry-after": "5"})
+        assert paused.stats()["paused_for_sec"] > 4
+
+    asyncio.run(run())
+
+
+def test_breaker_opens_after_threshold_and_sheds():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    for _ in range(2):
+        breaker.record("failure", breaker.before_call())
+    assert breaker.state == CIRCUIT_OPEN
+    with pytest.raises(ProviderUnavailableError):
+        breaker.before_call()
+
+
+def test_breaker_success_resets_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record("failure", breaker.before_call())
+    breaker.record("success", breaker.before_call())
+    breaker.record("failure", breaker.before_call())
+    assert breaker.state == CIRCUIT_CLOSED
+
+
+def test_breaker_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record("failure", breaker.before_call())
+    assert breaker.before_call() is True
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    with pytest.raises(ProviderUnavailableError):
+        breaker.before_call()
+    breaker.record("success", True)
+    assert breaker.state == CIRCUIT_CLOSED and breaker.failures == 0
+
+
+def test_breaker_failed_probe_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record("failure", breaker.before_call())
+    breaker.record("failure", breaker.before_call())
+    assert breaker.state == CIRCUIT_OPEN
+
+
+def test_breaker_ignores_late_calls_while_probing():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    late = breaker.before_call()  # admitted while closed, finishes after the circuit opened
+    breaker.record("failure", breaker.before_call())
+    probe = breaker.before_call()
+    breaker.record("success", late)
+    assert breaker.state == CIRCUIT_HALF_OPEN  # a late success does not close the circuit
+    with pytest.raises(ProviderUnavailableError):
+        breaker.before_call()  # and does not free the probe slot
+    breaker.record("neutral", probe)
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    breaker.record("success", breaker.before_call())
+    assert breaker.state == CIRCUIT_CLOSED
@@ -0,0 +1,40 @@
+import pytest
+
+from app.services.llm import OUTPUT_BLOCK_PATTERNS, StreamingOutputGuard
+
+
+def _stream(text: str, size: int) -> tuple[str, StreamingOutputGuard]:
+    guard = StreamingOutputGuard()
+    emitted = "".join(guard.feed(text[i:i + size]) for i in range(0, len(text), size))
+    return emitted + guard.flush(), guard
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 17, 1000])
+def test_clean_reply_passes_through_unchanged(size):
+    text = "Thanks for sharing. What parts of your day feel hardest right now?"
+    emitted, guard = _stream(text, size)
+    assert emitted == text and not guard.blocked
+
+
+@pytest.mark.parametrize("phrase", OUTPUT_BLOCK_PATTERNS)
+def test_blocked_phrase_split_anywhere_emits_none_of_it(phrase):
+    before = "It sounds really hard. A "
+    text = before + phrase.upper() + " might help. More text follows."
+    for size in range(1, len(text) + 1):
+        emitted, guard = _stream(text, size)
+        assert guard.blocked
+        assert before.startswith(emitted), (size, emitted)
+
+
+def test_nothing_is_emitted_after_blocking():
+    guard = StreamingOutputGuard()
+    guard.feed("You should take ")
+    assert guard.blocked
+    assert guard.feed("a walk and feel better") == ""
+    assert guard.flush() == ""
+
+
+def test_tail_is_held_back_until_flush():
+    guard = StreamingOutputGuard()
+    assert guard.feed("Hi") == ""
+    assert guard.flush() == "Hi"
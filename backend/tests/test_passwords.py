@@ -0,0 +1,27 @@
+import pytest
+from pydantic import ValidationError
+
+from app.config import Settings
+from app.core.passwords import KDF_PBKDF2, KDF_SCRYPT, hash_password, needs_rehash, verify_password
+
+
+def test_unknown_kdf_is_rejected_at_settings_load():
+    with pytest.raises(ValidationError):
+        Settings(_env_file=None, password_kdf="argon2")
+    assert Settings(_env_file=None, password_kdf="scrypt").password_kdf == KDF_SCRYPT
+
+
+@pytest.mark.parametrize(
+    "kdf, cost", [(KDF_PBKDF2, {"iterations": 1000}), (KDF_SCRYPT, {"n": 2**10, "r": 8, "p": 1})]
+)
+def test_hash_round_trip(kdf, cost):
+    stored = hash_password("correct horse", kdf=kdf, cost=cost)
+    assert stored.startswith(kdf + "$")
+    assert verify_password("correct horse", stored)
+    assert not verify_password("wrong horse", stored)
+    assert needs_rehash(stored)  # cheaper than the configured cost
+
+
+def test_malformed_hash_does_not_verify():
+    assert not verify_password("anything", "md5$abc")
+    assert not needs_rehash("md5$abc")
@@ -0,0 +1,155 @@
+"""
+Query-plan regression tests: seed synthetic rows into DATABASE_URL (inside a transaction that is rolled back),
+ANALYZE, then EXPLAIN the hot-path queries and fail if any of them sequentially scans a hot table.
+Skipped when Postgres at DATABASE_URL is not reachable. Run against a local/disposable database; existing
+databases need the indexes from backend/README.md ("Upgrading an existing database") first.
+"""
+import asyncio
+import json
+import uuid
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database import engine, init_db
+from app.models.chat import ChatSession, ChatTurn
+from app.models.group import GroupMember, MEMBERSHIP_STATUS_ACTIVE
+from app.models.intake import IntakeResult
+from app.models.scheduling import ScheduleSlot
+
+SEED_SIZES = {"users": 2000, "turns": 20, "groups": 50}  # turns per seeded chat session
+HOT_TABLES = {"chat_sessions", "chat_turns", "intake_results", "group_members", "schedule_slots"}
+
+SEED_SQL = [
+    """INSERT INTO users (id, email, hashed_password, role, created_at)
+       SELECT gen_random_uuid(), 'plancheck-' || g || '@example.invalid', 'x', 'client', now()
+       FROM generate_series(1, :users) g""",
+    """INSERT INTO chat_sessions (id, user_id, completed, extracted_turn_count, created_at, updated_at)
+       SELECT gen_random_uuid(), u.id, false, 0, now(), now()
+       FROM users u WHERE u.email LIKE 'plancheck-%'""",
+    """INSERT INTO chat_turns (id, chat_session_id, role, content, created_at)
+       SELECT gen_random_uuid(), s.id, CASE WHEN g % 2 = 1 THEN 'user' ELSE 'assistant' END,
+              'Seed turn ' || g, now() + g * interval '1 second'
+       FROM chat_sessions s JOIN users u ON u.id = s.user_id AND u.email LIKE 'plancheck-%',
+            generate_series(1, :turns) g""",
+    """INSERT INTO groups (id, name, focus, created_at)
+       SELECT gen_random_uuid(), 'Plan check ' || g, 'plancheck_' || g, now()
+       FROM generate_series(1, :groups) g""",
+    """INSERT INTO group_members (id, group_id, user_id, status, joined_at)
+       SELECT gen_random_uuid(), g.ids[1 + (u.n % array_length(g.ids, 1))], u.id, 'active', now()
+       FROM (SELECT id, row_number() OVER () AS n FROM users WHERE email LIKE 'plancheck-%') u,
+            (SELECT array_agg(id) AS ids FROM groups WHERE focus LIKE 'plancheck\\_%') g""",
+    """INSERT INTO intake_results (id, user_id, chat_session_id, primary_concern, life_impact_areas, created_at, updated_at)
+       SELECT gen_random_uuid(), s.user_id, s.id, 'Stress', '["work"]'::jsonb, now(), now()
+       FROM chat_sessions s JOIN users u ON u.id = s.user_id AND u.email LIKE 'plancheck-%'""",
+    """INSERT INTO schedule_slots (id, group_id, slot_at, created_at)
+       SELECT gen_random_uuid(), gr.id, now() + g * interval '1 day', now()
+       FROM groups gr, generate_series(1, 20) g WHERE gr.focus LIKE 'plancheck\\_%'""",
+    "ANALYZE users, chat_sessions, chat_turns, groups, group_members, intake_results, schedule_slots",
+]
+
+
+def hot_queries(user_id: uuid.UUID, session_id: uuid.UUID, group_id: uuid.UUID, user_ids: list[uuid.UUID]) -> dict:
+    """The statements the API runs on every chat turn / page view (same shape as in app/api)."""
+    return {
+        "latest chat session (get_or_create_chat_session)": select(ChatSession)
+        .where(ChatSession.user_id == user_id)
+        .order_by(ChatSession.created_at.desc())
+        .limit(1),
+        "session turns (history, extraction)": select(ChatTurn)
+        .where(ChatTurn.chat_session_id == session_id)
+        .order_by(ChatTurn.created_at),
+        "latest intake (/api/intake, /api/groups/my)": select(IntakeResult)
+        .where(IntakeResult.user_id == user_id)
+        .order_by(IntakeResult.updated_at.desc())
+        .limit(1),
+        "active membership (/api/groups/my)": select(GroupMember).where(
+            GroupMember.user_id == user_id, GroupMember.status == MEMBERSHIP_STATUS_ACTIVE
+        ),
+        "active group members (handoff)": select(GroupMember).where(
+            GroupMember.group_id == group_id, GroupMember.status == MEMBERSHIP_STATUS_ACTIVE
+        ),
+        "members' intakes (handoff)": select(IntakeResult).where(IntakeResult.user_id.in_(user_ids)),
+        "handoff version (handoff)": select(GroupMember.id, IntakeResult.id, IntakeResult.updated_at)
+        .outerjoin(IntakeResult, IntakeResult.user_id == GroupMember.user_id)
+        .where(GroupMember.group_id == group_id, GroupMember.status == MEMBERSHIP_STATUS_ACTIVE),
+        "participant counts (/api/handoff/groups)": select(GroupMember.group_id, func.count(GroupMember.id))
+        .where(GroupMember.group_id.in_([group_id]), GroupMember.status == MEMBERSHIP_STATUS_ACTIVE)
+        .group_by(GroupMember.group_id),
+        "members' availability (/api/scheduling/slots)": select(GroupMember.user_id, IntakeResult.availability)
+        .outerjoin(IntakeResult, IntakeResult.user_id == GroupMember.user_id)
+        .where(GroupMember.group_id == group_id, GroupMember.status == MEMBERSHIP_STATUS_ACTIVE)
+        .order_by(IntakeResult.updated_at),
+        "group slots (/api/scheduling/slots)": select(ScheduleSlot)
+        .where(ScheduleSlot.group_id == group_id)
+        .order_by(ScheduleSlot.slot_at),
+    }
+
+
+def _plan_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _summary(node: dict) -> str:
+    relation = node.get("Relation Name")
+    index = node.get("Index Name")
+    return node["Node Type"] + (f" on {relation}" if relation else "") + (f" using {index}" if index else "")
+
+
+HOT_QUERY_NAMES = list(hot_queries(uuid.uuid4(), uuid.uuid4(), uuid.uuid4(), []))
+
+
+async def _explain_hot_queries() -> dict[str, list[dict]] | None:
+    """Plan nodes per hot query, or None if the database cannot be reached."""
+    try:
+        await init_db()
+    except (OSError, SQLAlchemyError):
+        await engine.dispose()
+        return None
+    plans = {}
+    try:
+        async with engine.connect() as conn:
+            trans = await conn.begin()
+            try:
+                for sql in SEED_SQL:
+                    await conn.execute(text(sql), SEED_SIZES)
+                row = (await conn.execute(text(
+                    "SELECT s.id, s.user_id FROM chat_sessions s JOIN users u ON u.id = s.user_id "
+                    "WHERE u.email LIKE 'plancheck-%' LIMIT 1"
+                ))).one()
+                session_id, user_id = row
+                group_id = (await conn.execute(text(
+                    "SELECT group_id FROM group_members WHERE user_id = :u"), {"u": user_id})).scalar_one()
+                user_ids = list((await conn.execute(text(
+                    "SELECT user_id FROM group_members WHERE group_id = :g LIMIT 12"), {"g": group_id})).scalars())
+
+                for name, stmt in hot_queries(user_id, session_id, group_id, user_ids).items():
+                    sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+                    plan = (await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar_one()
+                    if isinstance(plan, str):
+                        plan = json.loads(plan)
+                    plans[name] = list(_plan_nodes(plan[0]["Plan"]))
+            finally:
+                await trans.rollback()
+    finally:
+        await engine.dispose()
+    return plans
+
+
+@pytest.fixture(scope="module")
+def hot_query_plans() -> dict[str, list[dict]]:
+    plans = asyncio.run(_explain_hot_queries())
+    if plans is None:
+        pytest.skip("Postgres at DATABASE_URL is not reachable")
+    return plans
+
+
+@pytest.mark.parametrize("name", HOT_QUERY_NAMES)
+def test_hot_query_does_not_seq_scan(hot_query_plans, name):
+    nodes = hot_query_plans[name]
+    seq = [n for n in nodes if n["Node Type"] == "Seq Scan" and n.get("Relation Name") in HOT_TABLES]
+    assert not seq, f"{name}: {', '.join(_summary(n) for n in nodes if 'Relation Name' in n)}"
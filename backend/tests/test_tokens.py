@@ -0,0 +1,52 @@
+import asyncio
+from uuid import uuid4
+
+from app.core import tokens
+from app.core.tokens import TokenRevocationList, decode_session_token, issue_session_token, looks_like_token
+
+
+def test_round_trip():
+    user_id = uuid4()
+    token = issue_session_token(user_id)
+    assert looks_like_token(token)
+    claims = decode_session_token(token)
+    assert claims is not None and claims.user_id == user_id
+    assert claims.expires_at > claims.issued_at
+    assert decode_session_token(issue_session_token(user_id)).token_id != claims.token_id
+
+
+def test_tampered_or_malformed_tokens_are_rejected():
+    token = issue_session_token(uuid4())
+    version, payload, signature = token.split(".")
+    other_payload = issue_session_token(uuid4()).split(".")[1]
+    assert decode_session_token(f"{version}.{other_payload}.{signature}") is None
+    assert decode_session_token(f"v0.{payload}.{signature}") is None
+    assert decode_session_token(token[:-2]) is None
+    assert decode_session_token("not-a-token") is None
+    assert not looks_like_token(str(uuid4()))
+
+
+def test_other_secret_key_rejects(monkeypatch):
+    token = issue_session_token(uuid4())
+    monkeypatch.setattr(tokens.settings, "secret_key", "another-secret")
+    assert decode_session_token(token) is None
+
+
+def test_expired_token_is_rejected(monkeypatch):
+    token = issue_session_token(uuid4())
+    expires_at = decode_session_token(token).expires_at
+    monkeypatch.setattr(tokens.time, "time", lambda: expires_at + 1)
+    assert decode_session_token(token) is None
+
+
+def test_revocation_is_local_without_redis(monkeypatch):
+    monkeypatch.setattr(tokens.settings, "auth_cache_redis_url", "")
+    revocations = TokenRevocationList()
+    claims = decode_session_token(issue_session_token(uuid4()))
+    other = decode_session_token(issue_session_token(uuid4()))
+
+    async def run():
+        await revocations.revoke(claims)
+        return await revocations.is_revoked(claims), await revocations.is_revoked(other)
+
+    assert asyncio.run(run()) == (True, False)
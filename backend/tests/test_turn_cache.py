@@ -0,0 +1,40 @@
+import asyncio
+
+from app.core.cache import TTLCache
+from app.services.turn_cache import TurnCache
+
+TURNS = [{"id": "1", "role": "user", "content": "hi", "created_at": None}]
+
+
+def _cache(maxsize=2):
+    cache = TurnCache()
+    cache.local = TTLCache(maxsize, 60)
+    return cache
+
+
+def test_populate_skipped_after_a_write_to_the_same_session():
+    cache = _cache()
+    mark = cache._writes
+    cache._bump("a")
+    asyncio.run(cache._populate("a", TURNS, mark))
+    assert cache.local.get("a") is None
+
+
+def test_write_after_pruning_still_blocks_a_stale_read():
+    cache = _cache(maxsize=2)
+    cache._bump("a")
+    mark = cache._writes  # a DB read of "a" starts here
+    for i in range(20):  # other sessions, well past the 4 x maxsize entries kept
+        cache._bump(f"other-{i}")
+    cache._bump("a")
+    asyncio.run(cache._populate("a", TURNS, mark))
+    assert cache.local.get("a") is None
+
+
+def test_populate_after_other_sessions_write():
+    cache = _cache(maxsize=2)
+    cache._bump("a")
+    mark = cache._writes
+    cache._bump("b")
+    asyncio.run(cache._populate("a", TURNS, mark))
+    assert cache.local.get("a") == TURNS
@@ -124,6 +124,17 @@ export interface ChatSendResponse {
   group_name: string | null;
   group_focus: string | null;
   match_reason: string | null;
+  intake_pending?: boolean;
+}
+
+export interface ChatIntakeStatus {
+  intake_pending: boolean;
+  intake_complete: boolean;
+  group_id: string | null;
+  group_name: string | null;
+  group_focus: string | null;
+  match_reason: string | null;
+  message: string | null;
 }
 
 export interface ChatTurn {
@@ -145,6 +156,10 @@ export const chatApi = {
     return apiFetch<{ turns: ChatTurn[] }>('/api/chat/history');
   },
 
+  intakeStatus: async () => {
+    return apiFetch<ChatIntakeStatus>('/api/chat/intake-status');
+  },
+
   complete: async () => {
     return apiFetch<{ status: string; session_id?: string; group_id?: string }>('/api/chat/complete', {
       method: 'POST',
@@ -206,7 +221,10 @@ export interface SlotResponse {
 export const schedulingApi = {
   slots: async (): Promise<SlotResponse[]> => {
     try {
-      const res = await apiFetch<{ slots: SlotResponse[] }>('/api/scheduling/slots');
+      let res = await apiFetch<{ slots: SlotResponse[]; stale?: boolean }>('/api/scheduling/slots');
+      if (res.stale) {
+        res = await apiFetch<{ slots: SlotResponse[]; stale?: boolean }>('/api/scheduling/slots/refresh', { method: 'POST' });
+      }
       return res.slots ?? [];
     } catch (e: unknown) {
       const err = e as Error & { status?: number };
@@ -15,10 +15,15 @@ import {
 } from '@/components/ui/dialog';
 import { Loader2, CheckCircle2, Sparkles, ArrowLeft, Calendar, CreditCard, RotateCcw } from 'lucide-react';
 import { useToast } from '@/hooks/use-toast';
-import { chatApi, schedulingApi } from '@/lib/api';
+import { chatApi, groupsApi, schedulingApi } from '@/lib/api';
 import type { ChatMessage as ChatMessageType } from '@/lib/api';
 
 const CONSENT_STORAGE_KEY = 'sage_chat_consent';
+const INTAKE_POLL_INTERVAL_MS = 1500;
+const INTAKE_POLL_MAX_ATTEMPTS = 20;
+// Batch group assignment (GROUP_ASSIGNMENT=batch) places users every few minutes; check for the group this often.
+const PLACEMENT_POLL_INTERVAL_MS = 30000;
+const PLACEMENT_PENDING_MESSAGE = "Your intake is complete. We'll place you in a support group shortly.";
 
 const WELCOME_MESSAGE: ChatMessageType = {
   id: 'welcome',
@@ -41,6 +46,7 @@ export default function Chat() {
     group_focus: string;
     match_reason: string | null;
   } | null>(null);
+  const [placementPending, setPlacementPending] = useState<string | null>(null);
   const [hasScheduledSlot, setHasScheduledSlot] = useState(false);
   const [restartDialogOpen, setRestartDialogOpen] = useState(false);
   const [isRestarting, setIsRestarting] = useState(false);
@@ -72,11 +78,79 @@ export default function Chat() {
     return () => { cancelled = true; };
   }, [intakeComplete, groupMatch]);
 
+  // Intake complete but the group is assigned later (batch mode): check /groups/my until it appears.
+  useEffect(() => {
+    if (!placementPending || groupMatch) return;
+    let cancelled = false;
+    const timer = setInterval(() => {
+      groupsApi.my()
+        .then((group) => {
+          if (cancelled || !group) return;
+          applyGroupMatch({
+            group_id: group.id,
+            group_name: group.name,
+            group_focus: group.focus,
+            match_reason: group.match_reason,
+          });
+        })
+        .catch(() => undefined);
+    }, PLACEMENT_POLL_INTERVAL_MS);
+    return () => {
+      cancelled = true;
+      clearInterval(timer);
+    };
+  }, [placementPending, groupMatch]);
+
   const acceptConsent = () => {
     sessionStorage.setItem(CONSENT_STORAGE_KEY, '1');
     setConsentGiven(true);
   };
 
+  const applyGroupMatch = (match: {
+    group_id: string | null;
+    group_name: string | null;
+    group_focus: string | null;
+    match_reason: string | null;
+    message?: string | null;
+  }) => {
+    if (!match.group_id || !match.group_name) {
+      // Complete, but placement is pending (batch group assignment)
+      setIntakeComplete(true);
+      setPlacementPending(match.message || PLACEMENT_PENDING_MESSAGE);
+      return;
+    }
+    setIntakeComplete(true);
+    setPlacementPending(null);
+    setShowingWaiting(true);
+    setGroupMatch({
+      group_id: match.group_id,
+      group_name: match.group_name,
+      group_focus: match.group_focus ?? '',
+      match_reason: match.match_reason ?? null,
+    });
+    toast({
+      title: 'You\'re matched to a group',
+      description: match.group_name,
+    });
+  };
+
+  // Intake extraction runs in the background after each reply; poll until it settles.
+  const pollIntakeStatus = async () => {
+    for (let attempt = 0; attempt < INTAKE_POLL_MAX_ATTEMPTS; attempt++) {
+      await new Promise((resolve) => setTimeout(resolve, INTAKE_POLL_INTERVAL_MS));
+      try {
+        const status = await chatApi.intakeStatus();
+        if (status.intake_complete) {
+          applyGroupMatch(status);
+          return;
+        }
+        if (!status.intake_pending) return;
+      } catch {
+        return;
+      }
+    }
+  };
+
   const handleSendMessage = async (content: string) => {
     const userMessage: ChatMessageType = {
       id: `user-${Date.now()}`,
@@ -95,19 +169,10 @@ export default function Chat() {
         timestamp: new Date().toISOString(),
       };
       setMessages((prev) => [...prev, aiMessage]);
-      if (res.intake_complete && res.group_id && res.group_name) {
-        setIntakeComplete(true);
-        setShowingWaiting(true);
-        setGroupMatch({
-          group_id: res.group_id,
-          group_name: res.group_name,
-          group_focus: res.group_focus ?? '',
-          match_reason: res.match_reason ?? null,
-        });
-        toast({
-          title: 'You\'re matched to a group',
-          description: res.group_name,
-        });
+      if (res.intake_complete) {
+        applyGroupMatch(res);
+      } else if (res.intake_pending) {
+        void pollIntakeStatus();
       }
     } catch (e) {
       const message = e instanceof Error ? e.message : 'Something went wrong';
@@ -124,6 +189,7 @@ export default function Chat() {
       setIntakeComplete(false);
       setShowingWaiting(false);
       setGroupMatch(null);
+      setPlacementPending(null);
       setHasScheduledSlot(false);
       setMessages([WELCOME_MESSAGE]);
       setRestartDialogOpen(false);
@@ -217,6 +283,17 @@ export default function Chat() {
                   </p>
                 </div>
               )}
+              {intakeComplete && !groupMatch && placementPending && (
+                <div className="rounded-xl border border-border bg-card p-5 animate-fade-in space-y-3">
+                  <div className="flex items-center gap-3">
+                    <CheckCircle2 className="w-5 h-5 text-success shrink-0" />
+                    <p className="text-foreground font-medium">{placementPending}</p>
+                  </div>
+                  <p className="text-sm text-muted-foreground">
+                    You can leave this page; your group will appear here and on your dashboard once you&apos;re placed.
+                  </p>
+                </div>
+              )}
               {intakeComplete && groupMatch && !showingWaiting && (
                 <div className="rounded-xl border border-border bg-card p-5 animate-fade-in space-y-4">
                   <div className="flex items-center gap-2 text-success">